@@ -0,0 +1,229 @@
+# Convolución por bloques para flujos de datos
+# Autor: Adrián Silva Palafox
+
+import numpy as np
+
+from tools.dconv import choose_method, _next_pow2, _transformadas, _FACTOR_BLOQUE
+
+
+class BlockConvolver:
+    """
+    Filtro FIR con estado que procesa una señal por bloques (overlap-save).
+
+    El filtro se fija una sola vez y la señal llega en bloques de cualquier
+    tamaño mediante process(). Entre llamadas solo se guardan las últimas
+    M-1 muestras de entrada, así que la memoria es constante sin importar
+    la longitud del flujo. La concatenación de las salidas de process()
+    seguida de flush() es igual a dconv(h, x) sobre la señal completa.
+
+    Ejemplo:
+        conv = BlockConvolver(h)
+        for bloque in bloques:
+            y = conv.process(bloque)   # len(y) == len(bloque)
+        cola = conv.flush()            # últimas M-1 muestras
+    """
+
+    def __init__(self, h, method='auto'):
+        """
+        Parámetros:
+        h (array): Coeficientes del filtro.
+        method (str): 'auto', 'direct' u 'overlap-save'. En 'auto' se
+            consulta choose_method() con el tamaño de cada bloque.
+        """
+        self.h = np.asarray(h)
+        if self.h.ndim != 1 or len(self.h) == 0:
+            raise ValueError("El filtro debe ser un arreglo unidimensional no vacío")
+        if method not in ('auto', 'direct', 'overlap-save'):
+            raise ValueError(f"Método '{method}' no reconocido")
+
+        self.method = method
+        self.M = len(self.h)
+
+        # Tamaño de la FFT y muestras nuevas por segmento de overlap-save
+        self.nfft = _next_pow2(_FACTOR_BLOQUE * self.M)
+        self.L = self.nfft - self.M + 1
+
+        self._espectros = {}  # Respuesta en frecuencia por tipo (real/complejo)
+        self.reset()
+
+    def reset(self):
+        """Borra el estado interno (historia de entrada)."""
+        self._historia = np.zeros(self.M - 1, dtype=self.h.dtype)
+
+    def _espectro(self, complejo):
+        """Respuesta en frecuencia del filtro, calculada una sola vez."""
+        if complejo not in self._espectros:
+            fwd, _ = _transformadas(complejo)
+            self._espectros[complejo] = fwd(self.h, self.nfft)
+        return self._espectros[complejo]
+
+    def _overlap_save(self, ext, n_salida):
+        """Salida 'valid' de ext (n_salida muestras) por segmentos FFT."""
+        complejo = np.iscomplexobj(ext) or np.iscomplexobj(self.h)
+        fwd, inv = _transformadas(complejo)
+
+        n_bloques = -(-n_salida // self.L)
+        ext_pad = np.zeros(n_bloques * self.L + self.M - 1, dtype=ext.dtype)
+        ext_pad[:len(ext)] = ext
+
+        # Segmentos de nfft muestras que se traslapan M-1 muestras
+        segmentos = np.lib.stride_tricks.sliding_window_view(ext_pad, self.nfft)[::self.L]
+        salida = inv(fwd(segmentos, self.nfft) * self._espectro(complejo), self.nfft)
+
+        # Las primeras M-1 muestras de cada segmento tienen aliasing circular
+        return salida[:, self.M - 1:].ravel()[:n_salida]
+
+    def process(self, chunk):
+        """
+        Filtra un bloque de la señal.
+
+        Parámetros:
+        chunk (array): Nuevas muestras de entrada (cualquier tamaño).
+
+        Retorna:
+        np.ndarray: Misma cantidad de muestras de salida que de entrada.
+        """
+        chunk = np.asarray(chunk)
+        if chunk.ndim != 1:
+            raise ValueError("Los bloques deben ser unidimensionales")
+
+        ext = np.concatenate((self._historia, chunk))
+        n_salida = len(chunk)
+
+        method = self.method
+        if method == 'auto':
+            method = 'direct' if choose_method(self.M, len(ext)) == 'direct' else 'overlap-save'
+
+        if n_salida == 0:
+            y = np.zeros(0, dtype=np.result_type(ext, self.h))
+        elif method == 'direct':
+            y = np.convolve(ext, self.h, mode='valid')
+        else:
+            y = self._overlap_save(ext, n_salida)
+
+        if self.M > 1:
+            self._historia = ext[len(ext) - (self.M - 1):]
+        return y
+
+    def flush(self):
+        """
+        Vacía el filtro: retorna las M-1 muestras finales de la convolución
+        completa y reinicia el estado.
+        """
+        y = self.process(np.zeros(self.M - 1, dtype=self._historia.dtype))
+        self.reset()
+        return y
+
+
+class PartitionedConvolver:
+    """
+    Convolución FFT uniformemente particionada (overlap-save) para filtros
+    FIR largos con baja latencia.
+
+    El filtro se divide en P = ceil(M/B) particiones de B coeficientes. Cada
+    bloque de B muestras de entrada se transforma una sola vez (FFT de 2B
+    puntos) y se guarda en una línea de retardo en frecuencia; la salida del
+    bloque es la suma de los P espectros retrasados multiplicados por el
+    espectro de cada partición. La latencia es de B muestras en lugar de
+    ~M como en overlap-save con un solo bloque.
+
+    process() acepta bloques de cualquier tamaño y retorna las muestras de
+    salida de los bloques de B completados hasta ese momento (múltiplo de B).
+    La concatenación de todas las salidas más flush() es igual a dconv(h, x).
+    """
+
+    def __init__(self, h, block_size=64):
+        """
+        Parámetros:
+        h (array): Coeficientes reales del filtro.
+        block_size (int): Tamaño de bloque B (latencia en muestras). Se
+            recomienda una potencia de 2, desde 32.
+        """
+        self.h = np.asarray(h, dtype=float)
+        if self.h.ndim != 1 or len(self.h) == 0:
+            raise ValueError("El filtro debe ser un arreglo unidimensional no vacío")
+        if int(block_size) < 1:
+            raise ValueError("block_size debe ser positivo")
+
+        self.B = int(block_size)
+        self.M = len(self.h)
+        self.P = -(-self.M // self.B)  # Número de particiones
+        self.nfft = 2 * self.B
+
+        # Espectro de cada partición del filtro: (P, B+1)
+        particiones = np.zeros((self.P, self.B))
+        particiones.ravel()[:self.M] = self.h
+        self._H = np.fft.rfft(particiones, self.nfft)
+
+        self.reset()
+
+    @property
+    def latency(self):
+        """Latencia algorítmica en muestras."""
+        return self.B
+
+    def reset(self):
+        """Borra la línea de retardo y las muestras pendientes."""
+        # Espectros de los P-1 bloques anteriores, del más viejo al más nuevo
+        self._fdl = np.zeros((self.P - 1, self.B + 1), dtype=complex)
+        self._anterior = np.zeros(self.B)     # Último bloque de entrada completo
+        self._pendiente = np.zeros(0)         # Muestras que aún no llenan un bloque
+        self._n_entrada = 0
+        self._n_salida = 0
+
+    def _procesar_bloques(self, bloques):
+        """Filtra K bloques completos (K, B) y actualiza la línea de retardo."""
+        K = len(bloques)
+
+        # Segmentos de 2B muestras: bloque anterior + bloque actual
+        previos = np.vstack((self._anterior[np.newaxis, :], bloques[:-1]))
+        X = np.fft.rfft(np.hstack((previos, bloques)), self.nfft)
+
+        # Línea de retardo extendida con los K espectros nuevos
+        E = np.vstack((self._fdl, X))
+        Y = np.zeros((K, self.B + 1), dtype=complex)
+        for p in range(self.P):
+            inicio = self.P - 1 - p
+            Y += E[inicio:inicio + K] * self._H[p]
+
+        self._fdl = E[len(E) - (self.P - 1):] if self.P > 1 else self._fdl
+        self._anterior = bloques[-1].copy()
+
+        return np.fft.irfft(Y, self.nfft)[:, self.B:].ravel()
+
+    def process(self, chunk):
+        """
+        Agrega muestras de entrada y filtra los bloques completos.
+
+        Parámetros:
+        chunk (array): Nuevas muestras de entrada (cualquier tamaño).
+
+        Retorna:
+        np.ndarray: Salida de los bloques completados (puede estar vacía).
+        """
+        chunk = np.asarray(chunk, dtype=float)
+        if chunk.ndim != 1:
+            raise ValueError("Los bloques deben ser unidimensionales")
+
+        datos = np.concatenate((self._pendiente, chunk))
+        K = len(datos) // self.B
+        self._pendiente = datos[K * self.B:]
+        self._n_entrada += len(chunk)
+
+        if K == 0:
+            return np.zeros(0)
+
+        y = self._procesar_bloques(datos[:K * self.B].reshape(K, self.B))
+        self._n_salida += len(y)
+        return y
+
+    def flush(self):
+        """
+        Vacía el filtro: retorna las muestras que faltan para completar la
+        convolución completa (N + M - 1) y reinicia el estado.
+        """
+        faltantes = self._n_entrada + self.M - 1 - self._n_salida
+        relleno = -(-(len(self._pendiente) + self.M - 1) // self.B) * self.B - len(self._pendiente)
+        y = self.process(np.zeros(relleno))[:faltantes]
+        self.reset()
+        return y
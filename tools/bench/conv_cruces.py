@@ -0,0 +1,47 @@
+"""
+Mide los puntos de cruce entre los métodos de convolución de tools.dconv.
+
+Para cada par (M, N) se cronometran la forma directa, la FFT completa y
+overlap-add, y se imprime el método más rápido. Con esta tabla se ajusta
+_CRUCE_DIRECTO y _RAZON_OVERLAP_ADD en tools/dconv.py.
+
+Uso (desde la raíz del repositorio):
+    python -m tools.bench.conv_cruces
+"""
+# Autor: Adrián Silva Palafox
+
+import timeit
+import numpy as np
+
+from tools.dconv import dconv, choose_method
+
+M_VALORES = [8, 16, 32, 64, 101, 128, 256, 512, 1024, 4096]
+N_VALORES = [1024, 4096, 16384, 40000, 65536, 262144]
+METODOS = ['direct', 'overlap-add', 'fft']
+
+
+def cronometrar(h, x, method, repeticiones=5):
+    """Tiempo mínimo (s) de una convolución con el método indicado."""
+    t = timeit.repeat(lambda: dconv(h, x, method), number=3, repeat=repeticiones)
+    return min(t) / 3
+
+
+def main():
+    rng = np.random.default_rng(0)
+
+    print(f"{'M':>6} {'N':>8} | " + " ".join(f"{m:>12}" for m in METODOS) + " | mejor        auto")
+    for M in M_VALORES:
+        for N in N_VALORES:
+            if N < M:
+                continue
+            h = rng.standard_normal(M)
+            x = rng.standard_normal(N)
+            tiempos = {m: cronometrar(h, x, m) for m in METODOS}
+            mejor = min(tiempos, key=tiempos.get)
+            print(f"{M:>6} {N:>8} | "
+                  + " ".join(f"{tiempos[m] * 1e6:>10.0f}us" for m in METODOS)
+                  + f" | {mejor:<12} {choose_method(M, N)}")
+
+
+if __name__ == "__main__":
+    main()
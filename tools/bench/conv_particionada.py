@@ -0,0 +1,107 @@
+"""
+Latencia y rendimiento de la convolución particionada frente a la forma
+directa, para los filtros pasabanda DTMF de 101 coeficientes y filtros más
+largos.
+
+Cada método procesa 5 s de audio a 8 kHz entregado en bloques de B muestras,
+como llegaría de la tarjeta de sonido o del puerto serial:
+- directa: BlockConvolver(h, 'direct'), np.convolve por bloque.
+- overlap-save: BlockConvolver(h, 'overlap-save'), una FFT de ~4M puntos por bloque.
+- particionada: PartitionedConvolver(h, B).
+- overlap-save (L): overlap-save alimentado con su bloque eficiente L ~ 3M,
+  que es la latencia que necesita para no desperdiciar la FFT.
+
+La latencia es el tiempo para juntar un bloque. La columna de MACs es una
+estimación por muestra para el firmware: M en la forma directa y
+~4·log2(B) + 4·P en la particionada (dos FFT reales de 2B puntos más P
+productos complejos por bin). En NumPy la forma directa suele ganar en
+rendimiento por el costo fijo de cada llamada; la ventaja de la particionada
+está en el número de operaciones con latencias de pocas decenas de muestras.
+
+Uso (desde la raíz del repositorio):
+    python -m tools.bench.conv_particionada
+"""
+# Autor: Adrián Silva Palafox
+
+import time
+import numpy as np
+from scipy import signal
+
+from tools.bconv import BlockConvolver, PartitionedConvolver
+
+FS = 8000
+DURACION = 5.0
+BLOQUES = [32, 64, 128, 256]
+LONGITUDES = [101, 301, 1001]
+
+
+def filtro_dtmf(M, centro=697, ancho=30):
+    """Pasabanda FIR como DTMFFilterGenerator.design_fir_bandpass."""
+    nyq = FS / 2
+    return signal.firwin(M, [(centro - ancho / 2) / nyq, (centro + ancho / 2) / nyq],
+                         window='hamming', pass_zero=False)
+
+
+def macs_por_muestra(nombre, M, B):
+    """Estimación de multiplicaciones-acumulaciones reales por muestra."""
+    if nombre == 'directa':
+        return M
+    if nombre == 'particionada':
+        P = -(-M // B)
+        return 4 * np.log2(B) + 4 * P
+    # Overlap-save con FFT de nfft puntos para cada bloque de B muestras
+    nfft = 1 << (4 * M - 1).bit_length()
+    return (2 * nfft * np.log2(nfft / 2) + 2 * nfft) / min(B, nfft - M + 1)
+
+
+def medir(conv, x, B):
+    """Procesa x en bloques de B muestras; retorna (segundos, salida)."""
+    salidas = []
+    inicio = time.perf_counter()
+    for i in range(0, len(x), B):
+        salidas.append(conv.process(x[i:i + B]))
+    salidas.append(conv.flush())
+    return time.perf_counter() - inicio, np.concatenate(salidas)
+
+
+def imprimir_fila(M, B, nombre, latencia, macs, tasa):
+    """Imprime una fila de la tabla de resultados."""
+    print(f"{M:>5} {B:>5} {nombre:<17} "
+          f"{latencia:>6} ({latencia / FS * 1e3:6.1f} ms) {macs:>13.0f} "
+          f"{tasa:>12.0f} {tasa / FS:>14.1f}")
+
+
+def main():
+    rng = np.random.default_rng(0)
+    x = rng.standard_normal(int(FS * DURACION))
+
+    print(f"Señal: {DURACION} s a {FS} Hz ({len(x)} muestras)\n")
+    print(f"{'M':>5} {'B':>5} {'método':<17} {'latencia':>16} {'MACs/muestra':>13} "
+          f"{'muestras/s':>12} {'x tiempo real':>14}")
+
+    for M in LONGITUDES:
+        h = filtro_dtmf(M)
+        referencia = np.convolve(h, x)
+        for B in BLOQUES:
+            ols = BlockConvolver(h, 'overlap-save')
+            metodos = [
+                ('directa', BlockConvolver(h, 'direct'), B),
+                ('overlap-save', ols, B),
+                ('particionada', PartitionedConvolver(h, B), B),
+            ]
+            for nombre, conv, bloque in metodos:
+                segundos, y = medir(conv, x, bloque)
+                assert np.allclose(y, referencia), nombre
+                imprimir_fila(M, B, nombre, bloque, macs_por_muestra(nombre, M, bloque), len(x) / segundos)
+
+        # Overlap-save con su bloque natural: buen rendimiento, latencia ~3M
+        conv = BlockConvolver(h, 'overlap-save')
+        segundos, y = medir(conv, x, conv.L)
+        assert np.allclose(y, referencia)
+        imprimir_fila(M, conv.L, 'overlap-save (L)', conv.L,
+                      macs_por_muestra('overlap-save', M, conv.L), len(x) / segundos)
+        print()
+
+
+if __name__ == "__main__":
+    main()
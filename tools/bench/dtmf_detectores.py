@@ -0,0 +1,319 @@
+"""
+Precisión contra costo de los detectores DTMF: bancos FIR
+(DTMFFilterGenerator), bancos IIR Butterworth y Goertzel.
+
+Todas las familias corren sobre el mismo corpus sintético etiquetado
+(tools.dtmf_synth) y usan la máquina de estados de DTMFDecoder (umbral,
+twist, energía relativa y antirrebote). Cambia cómo se obtiene la energía
+de cada bloque en cada frecuencia:
+- goertzel: goertzel_energy sobre bloques de B muestras.
+- fir: 8 pasabanda firwin de M coeficientes y ancho BW (dconv_bank); la
+  energía del bloque es sqrt(B/2 · Σ y²), que para una senoidal coincide
+  con la escala de Goertzel (A·B/2).
+- iir: 8 pasabanda Butterworth de orden n (n secciones de segundo orden,
+  sosfilt) con la misma energía por bloque.
+
+Los umbrales de decisión por defecto de DTMFDecoder (energía relativa de
+6 dB, twist de 8/4 dB) están pensados para Goertzel. Las faldas anchas de
+un FIR corto o de un IIR de banda ancha dejan pasar energía a los bins
+vecinos y fallan esa prueba aunque el filtro sí vea el tono. Por eso cada
+detector calibra sus umbrales en los primeros archivos del corpus
+(--calib-files). Se elige la combinación de UMBRALES con mayor detección y
+a lo más MAX_FALSAS_MIN falsas alarmas por minuto. Las métricas se miden en
+los archivos restantes. Con --shared-thresholds todos usan los umbrales por
+defecto; así se ve cuánto castiga la regla de Goertzel a FIR e IIR.
+
+Para cada punto de la malla se mide:
+- detección: fracción de teclas etiquetadas con un 'press' de la misma
+  tecla dentro de su intervalo (más el retardo de grupo del filtro);
+- falsas alarmas por minuto: 'press' que no corresponden a ninguna etiqueta;
+- MACs por muestra (estimación para el firmware): 8 por Goertzel, 8·M en
+  FIR y 8·5·n en IIR, más la energía de cada bloque;
+- rendimiento: segundos de audio por segundo de cómputo en NumPy.
+
+Al final imprime la tabla ordenada por costo, marca el frente de Pareto
+(ningún otro punto es más barato, más preciso y con menos falsas alarmas a
+la vez) y, con --plot, guarda la gráfica MACs vs. detección.
+
+Uso (desde la raíz del repositorio):
+    python -m tools.bench.dtmf_detectores
+    python -m tools.bench.dtmf_detectores --files 20 --duration 20 --snr 0 20 --plot pareto.png
+    python -m tools.bench.dtmf_detectores --shared-thresholds
+"""
+# Autor: Adrián Silva Palafox
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import matplotlib.pyplot as plt
+from scipy import signal
+
+from tools.dconv import dconv_bank
+from tools.dtmf import DTMFDecoder
+from tools.dtmf_synth import make_schedule, iter_signal
+from tools.goertzel import goertzel_energy, frame_blocks, to_adc_counts, DTMF_FREQS, FS, \
+    DETECTION_THRESHOLD
+
+# DTMFFilterGenerator vive junto a los scripts de prueba de filtros
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', 'universidad',
+                                             'proyectos_finales', 'testeo_filtros', 'test_filters',
+                                             'pyton_scritp')))
+from filter_gen import DTMFFilterGenerator
+
+BLOQUES = [128, 205, 256]
+ORDENES_FIR = [31, 65, 101]
+ORDENES_IIR = [1, 2, 3]
+ANCHOS = [30, 60, 100]
+TOLERANCIA = 0.04  # s de margen al emparejar eventos con etiquetas
+
+# Malla de umbrales de decisión que se calibra por detector:
+# (energía relativa mínima en dB, twist máximo, twist inverso máximo).
+# El umbral de energía no se calibra: con la escala de Goertzel ningún
+# detector de la malla cambia al bajarlo.
+UMBRALES = [(ratio, twist, inverso)
+            for ratio in (6.0, 4.5, 3.0, 2.0, 1.5, 1.0, 0.5)
+            for twist, inverso in ((8.0, 4.0), (12.0, 12.0))]
+UMBRALES_DTMF = (6.0, 8.0, 4.0)  # valores por defecto de DTMFDecoder
+MAX_FALSAS_MIN = 1.0
+
+
+def generar_corpus(n_archivos, duracion, snr_db, semilla):
+    """Lista de (señal en cuentas del ADC, agenda de etiquetas)."""
+    rng = np.random.default_rng(semilla)
+    corpus = []
+    for _ in range(n_archivos):
+        agenda = make_schedule(rng, duracion, FS)
+        snr = float(rng.uniform(*snr_db))
+        x = np.concatenate(list(iter_signal(agenda, rng, snr)))
+        corpus.append((to_adc_counts(x), agenda))
+    return corpus
+
+
+def energia_bloques(y, B):
+    """Energía por bloque de las salidas filtradas y (8, N) -> (nb, 8)."""
+    n_bloques = len(y[0]) // B
+    bloques = y[:, :n_bloques * B].reshape(len(y), n_bloques, B)
+    return np.sqrt(B / 2 * np.sum(bloques ** 2, axis=-1)).T
+
+
+class Detector:
+    """Punto de la malla: familia, parámetros y cómo obtener energías."""
+
+    def __init__(self, familia, B, orden=None, ancho=None):
+        self.familia = familia
+        self.B = B
+        self.orden = orden
+        self.ancho = ancho
+        self.retardo = 0.0
+        generador = DTMFFilterGenerator()
+        if familia == 'fir':
+            self.h = np.array([generador.design_fir_bandpass(f, ancho, orden)[0] for f in DTMF_FREQS])
+            self.retardo = (self.h.shape[1] - 1) / 2 / FS
+        elif familia == 'iir':
+            # Mismas frecuencias de corte que design_iir_bandpass, en secciones
+            # de segundo orden para que los órdenes altos sean estables
+            nyq = FS / 2
+            self.sos = [signal.butter(orden, [(f - ancho / 2) / nyq, (f + ancho / 2) / nyq],
+                                      btype='band', output='sos') for f in DTMF_FREQS]
+            self.retardo = orden / (np.pi * ancho)  # retardo de grupo aproximado en el centro
+
+    @property
+    def nombre(self):
+        if self.familia == 'goertzel':
+            return f"goertzel B={self.B}"
+        return f"{self.familia} n={self.orden} BW={self.ancho} B={self.B}"
+
+    def macs_por_muestra(self):
+        """Estimación de multiplicaciones-acumulaciones por muestra."""
+        if self.familia == 'goertzel':
+            return 8 + 8 * 3 / self.B
+        por_filtro = len(self.h[0]) if self.familia == 'fir' else 5 * self.orden
+        return 8 * por_filtro + 8  # filtro más el cuadrado acumulado de la energía
+
+    def energias(self, x):
+        """Energías (nb, 8) de la señal x."""
+        if self.familia == 'goertzel':
+            return goertzel_energy(frame_blocks(x, self.B))
+        x = x.astype(float)
+        if self.familia == 'fir':
+            y = dconv_bank(x, self.h)[0, :, :len(x)]
+        else:
+            y = np.array([signal.sosfilt(sos, x) for sos in self.sos])
+        return energia_bloques(y, self.B)
+
+
+def _energias_corpus(detector, corpus):
+    """Energías de cada archivo: lista de (e (nb, 8), agenda, segundos)."""
+    return [(detector.energias(x), agenda, len(x) / FS) for x, agenda in corpus]
+
+
+def _puntuar(detector, energias, umbrales):
+    """
+    Decide con unos umbrales y empareja los eventos con las etiquetas.
+
+    Parámetros:
+    energias (list): Salida de _energias_corpus.
+    umbrales (tuple): (energía relativa dB, twist dB, twist inverso dB).
+
+    Retorna:
+    tuple: (detección, falsas alarmas por minuto).
+    """
+    B = detector.B
+    ratio, twist, inverso = umbrales
+    bloques_on = max(1, int(round(0.032 * FS / B)))
+    aciertos = etiquetas = falsas = 0
+    audio = 0.0
+    for e, agenda, segundos in energias:
+        decoder = DTMFDecoder(block_size=B, threshold=DETECTION_THRESHOLD * B / 256,
+                              max_twist_db=twist, max_reverse_twist_db=inverso,
+                              min_peak_ratio_db=ratio, min_on_blocks=bloques_on,
+                              min_off_blocks=bloques_on)
+        eventos = decoder.decide(e[:, None, :], np.arange(len(e))) + decoder.flush()
+        presiones = [ev for ev in eventos if ev.kind == 'press']
+
+        # Emparejamiento tecla a tecla (cada etiqueta se usa una sola vez)
+        inicio = agenda['start'] / FS - TOLERANCIA
+        fin = (agenda['start'] + agenda['length']) / FS + TOLERANCIA + detector.retardo
+        usada = np.zeros(len(inicio), dtype=bool)
+        for ev in presiones:
+            candidatas = np.flatnonzero((agenda['key'] == ev.key) & (inicio <= ev.time)
+                                        & (ev.time <= fin) & ~usada)
+            if len(candidatas):
+                usada[candidatas[0]] = True
+            else:
+                falsas += 1
+        aciertos += int(usada.sum())
+        etiquetas += len(usada)
+        audio += segundos
+    return aciertos / max(etiquetas, 1), falsas / (audio / 60)
+
+
+def calibrar(detector, corpus):
+    """
+    Umbrales de UMBRALES con mayor detección y a lo más MAX_FALSAS_MIN
+    falsas alarmas por minuto (si ninguno cumple, los de menos falsas).
+    """
+    energias = _energias_corpus(detector, corpus)
+    puntos = [(_puntuar(detector, energias, u), u) for u in UMBRALES]
+    validos = [p for p in puntos if p[0][1] <= MAX_FALSAS_MIN]
+    if validos:
+        return max(validos, key=lambda p: (p[0][0], -p[0][1]))[1]
+    return min(puntos, key=lambda p: (p[0][1], -p[0][0]))[1]
+
+
+def evaluar(detector, corpus, umbrales=UMBRALES_DTMF):
+    """Corre un detector sobre el corpus; retorna un dict con las métricas."""
+    t0 = time.perf_counter()
+    energias = _energias_corpus(detector, corpus)
+    deteccion, falsas_min = _puntuar(detector, energias, umbrales)
+    t = time.perf_counter() - t0
+    audio = sum(segundos for _, _, segundos in energias)
+
+    return {
+        'detector': detector.nombre, 'familia': detector.familia,
+        'umbrales': umbrales,
+        'deteccion': deteccion,
+        'falsas_min': falsas_min,
+        'macs': detector.macs_por_muestra(),
+        'tiempo_real': audio / t,
+    }
+
+
+def malla(bloques=BLOQUES, ordenes_fir=ORDENES_FIR, ordenes_iir=ORDENES_IIR, anchos=ANCHOS):
+    """Todos los detectores de la malla."""
+    detectores = [Detector('goertzel', B) for B in bloques]
+    for B in bloques:
+        for ancho in anchos:
+            detectores += [Detector('fir', B, M, ancho) for M in ordenes_fir]
+            detectores += [Detector('iir', B, n, ancho) for n in ordenes_iir]
+    return detectores
+
+
+def pareto(resultados):
+    """Marca los puntos que ningún otro domina en (macs, detección, falsas)."""
+    for r in resultados:
+        r['pareto'] = not any(
+            o['macs'] <= r['macs'] and o['deteccion'] >= r['deteccion'] and o['falsas_min'] <= r['falsas_min']
+            and (o['macs'], o['deteccion'], o['falsas_min']) != (r['macs'], r['deteccion'], r['falsas_min'])
+            for o in resultados)
+    return resultados
+
+
+def imprimir_tabla(resultados):
+    print(f"\n{'detector':28s} {'MACs/muestra':>12s} {'detección':>10s} {'falsas/min':>11s} "
+          f"{'x tiempo real':>14s}  {'umbrales':16s} Pareto")
+    for r in sorted(resultados, key=lambda r: (r['macs'], -r['deteccion'])):
+        ratio, twist, inverso = r['umbrales']
+        umbrales = f"{ratio:g} dB, {twist:g}/{inverso:g} dB"
+        print(f"{r['detector']:28s} {r['macs']:12.1f} {100 * r['deteccion']:9.1f}% "
+              f"{r['falsas_min']:11.2f} {r['tiempo_real']:14.0f}  {umbrales:16s} {'*' if r['pareto'] else ''}")
+    print("\numbrales: energía relativa mínima y twist/twist inverso máximos")
+
+
+def graficar(resultados, ruta):
+    colores = {'goertzel': 'tab:green', 'fir': 'tab:blue', 'iir': 'tab:red'}
+    fig, ax = plt.subplots(figsize=(10, 6))
+    for familia, color in colores.items():
+        puntos = [r for r in resultados if r['familia'] == familia]
+        ax.scatter([r['macs'] for r in puntos], [100 * r['deteccion'] for r in puntos],
+                   c=color, label=familia, alpha=0.6)
+    frente = sorted((r for r in resultados if r['pareto']), key=lambda r: r['macs'])
+    ax.plot([r['macs'] for r in frente], [100 * r['deteccion'] for r in frente], 'k--', lw=1,
+            label='frente de Pareto')
+    for r in frente:
+        ax.annotate(r['detector'], (r['macs'], 100 * r['deteccion']), fontsize=7,
+                    xytext=(4, -10), textcoords='offset points')
+    ax.set_xscale('log')
+    ax.set_xlabel('MACs por muestra')
+    ax.set_ylabel('Detección (%)')
+    ax.set_title('Detectores DTMF: precisión contra costo')
+    ax.grid(True, alpha=0.3)
+    ax.legend()
+    fig.tight_layout()
+    fig.savefig(ruta, dpi=150)
+    print(f"\nGráfica guardada en {ruta}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Precisión contra costo de detectores DTMF.")
+    parser.add_argument('--files', type=int, default=8, help="Archivos del corpus")
+    parser.add_argument('--duration', type=float, default=15.0, help="Duración de cada archivo (s)")
+    parser.add_argument('--snr', type=float, nargs=2, default=(5.0, 30.0), metavar=('MIN', 'MAX'))
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--calib-files', type=int, default=2,
+                        help="Archivos reservados para calibrar los umbrales de cada detector")
+    parser.add_argument('--shared-thresholds', action='store_true',
+                        help="Sin calibración: todos con los umbrales por defecto de DTMFDecoder")
+    parser.add_argument('--plot', default=None, help="Guardar la gráfica de Pareto (PNG)")
+    args = parser.parse_args()
+
+    corpus = generar_corpus(args.files, args.duration, args.snr, args.seed)
+    calibracion, prueba = [], corpus
+    if not args.shared_thresholds:
+        if not 0 < args.calib_files < args.files:
+            parser.error("--calib-files debe estar entre 1 y --files - 1")
+        calibracion, prueba = corpus[:args.calib_files], corpus[args.calib_files:]
+    n_teclas = sum(len(agenda['key']) for _, agenda in prueba)
+    print(f"Corpus: {args.files} archivos de {args.duration:.0f} s, SNR {args.snr[0]:.0f}-{args.snr[1]:.0f} dB; "
+          f"{len(calibracion)} para calibrar, {len(prueba)} de prueba ({n_teclas} teclas)")
+    if args.shared_thresholds:
+        print("Umbrales compartidos (por defecto de DTMFDecoder, pensados para Goertzel): "
+              "los puntos FIR e IIR quedan castigados por la prueba de energía relativa")
+    else:
+        print(f"Umbrales calibrados por detector: mayor detección con a lo más "
+              f"{MAX_FALSAS_MIN:g} falsas alarmas por minuto en los archivos de calibración")
+
+    resultados = []
+    for detector in malla():
+        umbrales = UMBRALES_DTMF if args.shared_thresholds else calibrar(detector, calibracion)
+        resultados.append(evaluar(detector, prueba, umbrales))
+    imprimir_tabla(pareto(resultados))
+    if args.plot:
+        graficar(resultados, args.plot)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,326 @@
+# Canalizador polifásico (banco de filtros DFT uniforme) para DTMF
+# Autor: Adrián Silva Palafox
+#
+# En lugar de 8 pasabanda FIR independientes (8 x 101 MACs por muestra), un
+# solo filtro prototipo pasabajas h de L = K·P coeficientes se modula a K
+# canales equiespaciados fs/K. Cada D muestras de entrada:
+#   1. u[l] = h[l]·x[n-l], l = 0..L-1             (L MACs)
+#   2. v[r] = Σ_p u[r + p·K], r = 0..K-1          (plegado polifásico)
+#   3. Y[k] = Σ_r v[r]·e^{-j2πkr/K}               (una FFT real de K puntos)
+# El canal k es h filtrado y desplazado a k·fs/K, así que cada tono DTMF se
+# mide en el canal más cercano. Como solo interesa la energía, la salida se
+# puede diezmar por D sin afectar la medición de un tono.
+
+import time
+
+import numpy as np
+from scipy import signal
+
+from tools.dft import dft
+from tools.fft import rfft
+from tools.goertzel import DTMF_FREQS, FS, BLOCK_SIZE
+
+# Desviación de frecuencia tolerada al medir el aislamiento (± %)
+TOLERANCIA_PCT = 1.5
+
+
+class PolyphaseChannelizer:
+    """
+    Banco de análisis DFT uniforme con prototipo polifásico.
+
+    Ejemplo:
+        canal = dtmf_channelizer()
+        Y = canal.process(x)                   # (n_salidas, 8) complejos
+        E = canal.block_energies(Y)            # (n_bloques, 8), escala de Goertzel
+    """
+
+    def __init__(self, n_channels=256, taps_per_channel=4, decimation=None, cutoff=None,
+                 fs=FS, channels=None, window='hamming'):
+        """
+        Parámetros:
+        n_channels (int): K, número de canales (separación fs/K).
+        taps_per_channel (int): P, coeficientes por rama polifásica
+            (el prototipo tiene L = K·P).
+        decimation (int): D, muestras de entrada por salida. Por defecto K/2.
+        cutoff (float): Corte del prototipo en Hz. Por defecto 1.25·fs/K.
+        fs (float): Frecuencia de muestreo (Hz).
+        channels (array): Índices k de los canales que se entregan. Por
+            defecto todos los de frecuencia no negativa.
+        window (str): Ventana para firwin.
+        """
+        self.K = int(n_channels)
+        self.P = int(taps_per_channel)
+        self.L = self.K * self.P
+        self.D = int(decimation) if decimation is not None else self.K // 2
+        if self.D < 1:
+            raise ValueError(f"Diezmado no válido: {decimation}")
+        self.fs = fs
+        self.cutoff = cutoff if cutoff is not None else 1.25 * fs / self.K
+        self.channels = np.arange(self.K // 2 + 1) if channels is None else np.asarray(channels, dtype=int)
+        if np.any(self.channels < 0) or np.any(self.channels > self.K // 2):
+            raise ValueError(f"Los canales deben estar en [0, {self.K // 2}]")
+
+        # Prototipo pasabajas con ganancia 1 en DC
+        self.h = signal.firwin(self.L, self.cutoff, window=window, fs=fs)
+        self.reset()
+
+    def reset(self):
+        """Borra la historia de entrada."""
+        self._historia = np.zeros(self.L - 1)
+        self._pendiente = np.zeros(0)
+        self._n_salidas = 0
+
+    @property
+    def channel_frequencies(self):
+        """Frecuencia central de cada canal entregado (Hz)."""
+        return self.channels * self.fs / self.K
+
+    @property
+    def latency(self):
+        """Retardo de grupo del prototipo (muestras)."""
+        return (self.L - 1) / 2
+
+    def macs_per_sample(self, dft_directa=True):
+        """
+        MACs reales por muestra de entrada.
+
+        Con dft_directa se evalúan solo los canales entregados (2·K MACs por
+        canal, como en el encabezado para el ESP32); si no, una FFT real de
+        K puntos (~K·log2(K) MACs).
+        """
+        transformada = 2 * self.K * len(self.channels) if dft_directa else self.K * np.log2(self.K)
+        return (self.L + transformada) / self.D
+
+    def process(self, chunk):
+        """
+        Agrega muestras y entrega las salidas de cada grupo de D completado.
+
+        Parámetros:
+        chunk (array): Nuevas muestras reales (cualquier tamaño).
+
+        Retorna:
+        np.ndarray: (n_salidas, len(channels)) complejos.
+        """
+        chunk = np.asarray(chunk, dtype=float)
+        if chunk.ndim != 1:
+            raise ValueError("Los bloques deben ser unidimensionales")
+        datos = np.concatenate((self._pendiente, chunk))
+        n = len(datos) // self.D
+        self._pendiente = datos[n * self.D:]
+        if n == 0:
+            return np.zeros((0, len(self.channels)), dtype=complex)
+
+        nuevos = datos[:n * self.D]
+        ext = np.concatenate((self._historia, nuevos))
+        self._historia = ext[-(self.L - 1):] if self.L > 1 else np.zeros(0)
+
+        # Ventana que termina en cada salida, de la más antigua a la más reciente
+        ventanas = np.lib.stride_tricks.sliding_window_view(ext, self.L)[self.D - 1::self.D]
+        # u[l] = h[l]·x[n-l]; x[n-l] es ventana[L-1-l]
+        u = (ventanas * self.h[::-1])[:, ::-1]
+        v = u.reshape(n, self.P, self.K).sum(axis=1)
+        self._n_salidas += n
+        return rfft(v)[:, self.channels]
+
+    def block_energies(self, outputs, block_size=BLOCK_SIZE):
+        """
+        Energía por bloque en la escala de goertzel_energy (A·B/2 para un
+        tono de amplitud A).
+
+        Parámetros:
+        outputs (array): Salidas de process(), (n_salidas, C).
+        block_size (int): Muestras por bloque; múltiplo de D.
+
+        Retorna:
+        np.ndarray: (n_bloques, C).
+        """
+        if block_size % self.D:
+            raise ValueError(f"block_size ({block_size}) debe ser múltiplo de D ({self.D})")
+        por_bloque = block_size // self.D
+        n_bloques = len(outputs) // por_bloque
+        y = np.abs(outputs[:n_bloques * por_bloque]) ** 2
+        potencia = y.reshape(n_bloques, por_bloque, -1).mean(axis=1)
+        # |Y| = A/2 para un tono centrado en su canal
+        return block_size * np.sqrt(potencia)
+
+    def channel_response(self, i, freqs):
+        """|H(f)| del i-ésimo canal entregado en las frecuencias dadas."""
+        centro = self.channel_frequencies[i]
+        return np.abs(dft(self.h, freqs=np.asarray(freqs, dtype=float) - centro, fs=self.fs))
+
+    def c_header(self, nombre='dtmf_channelizer'):
+        """
+        Encabezado C para el ESP32: prototipo polifásico, canales y tablas de
+        giro de la DFT directa de los canales entregados.
+        """
+        macro = nombre.upper()
+        C = len(self.channels)
+        polifase = self.h.reshape(self.P, self.K)
+        r = np.arange(self.K)
+        fase = 2 * np.pi * np.outer(self.channels, r) / self.K
+
+        def tabla(valores, sangria='    '):
+            filas = []
+            for i in range(0, len(valores), 8):
+                filas.append(sangria + ', '.join(f"{v:12.8f}f" for v in valores[i:i + 8]))
+            return ',\n'.join(filas)
+
+        def matriz(M):
+            return ',\n'.join('    {\n' + tabla(fila, '        ') + '\n    }' for fila in M)
+
+        freqs = ', '.join(f"{f:.2f}" for f in self.channel_frequencies)
+        return f"""#ifndef {macro}_H
+#define {macro}_H
+
+//==============================================================================
+// CANALIZADOR POLIFÁSICO DTMF (BANCO DFT UNIFORME)
+//==============================================================================
+// Frecuencia de muestreo: {self.fs} Hz
+// Canales: {self.K} (separación {self.fs / self.K:.4f} Hz), prototipo de {self.L} coeficientes
+// Diezmado: una salida cada {self.D} muestras
+// Frecuencias de los canales entregados: {freqs} Hz
+// Costo estimado: {self.macs_per_sample():.1f} MACs por muestra
+//
+// Cada CH_DECIMATION muestras, con hist[CH_LENGTH] (hist[CH_LENGTH-1] es la
+// más reciente):
+//   v[r] = sum_p ch_prototype[p][r] * hist[CH_LENGTH - 1 - r - p*CH_NUM_CHANNELS]
+//   Y[i] = sum_r v[r] * (ch_cos[i][r] - j*ch_sin[i][r])
+// y la energía del canal i es |Y[i]|^2 (ver ch_step).
+
+#include <stdint.h>
+
+#define CH_NUM_CHANNELS {self.K}
+#define CH_TAPS_PER_CHANNEL {self.P}
+#define CH_LENGTH {self.L}
+#define CH_DECIMATION {self.D}
+#define CH_NUM_BINS {C}
+
+// Canal k de cada frecuencia entregada
+const uint16_t ch_bins[CH_NUM_BINS] = {{ {', '.join(str(k) for k in self.channels)} }};
+
+// Prototipo en forma polifásica: ch_prototype[p][r] = h[r + p*CH_NUM_CHANNELS]
+const float ch_prototype[CH_TAPS_PER_CHANNEL][CH_NUM_CHANNELS] = {{
+{matriz(polifase)}
+}};
+
+// Tablas de giro de la DFT directa: cos/sin(2*pi*k*r/CH_NUM_CHANNELS)
+const float ch_cos[CH_NUM_BINS][CH_NUM_CHANNELS] = {{
+{matriz(np.cos(fase))}
+}};
+const float ch_sin[CH_NUM_BINS][CH_NUM_CHANNELS] = {{
+{matriz(np.sin(fase))}
+}};
+
+// Calcula la potencia |Y[i]|^2 de cada canal a partir de la historia
+static inline void ch_step(const float *hist, float *power)
+{{
+    static float v[CH_NUM_CHANNELS];
+    for (int r = 0; r < CH_NUM_CHANNELS; r++) {{
+        float acc = 0.0f;
+        for (int p = 0; p < CH_TAPS_PER_CHANNEL; p++)
+            acc += ch_prototype[p][r] * hist[CH_LENGTH - 1 - r - p * CH_NUM_CHANNELS];
+        v[r] = acc;
+    }}
+    for (int i = 0; i < CH_NUM_BINS; i++) {{
+        float re = 0.0f, im = 0.0f;
+        for (int r = 0; r < CH_NUM_CHANNELS; r++) {{
+            re += v[r] * ch_cos[i][r];
+            im -= v[r] * ch_sin[i][r];
+        }}
+        power[i] = re * re + im * im;
+    }}
+}}
+
+#endif // {macro}_H
+"""
+
+
+def dtmf_channelizer(n_channels=256, taps_per_channel=4, decimation=128, fs=FS, **opciones):
+    """
+    Canalizador con un canal por frecuencia DTMF (el más cercano).
+
+    Con K = 256 (31.25 Hz por canal) cada tono queda a menos de 12 Hz del
+    centro de su canal y los 8 canales son distintos.
+    """
+    canales = np.round(np.asarray(DTMF_FREQS) * n_channels / fs).astype(int)
+    if len(set(canales)) != len(canales):
+        raise ValueError(f"Con {n_channels} canales dos tonos DTMF caen en el mismo canal")
+    return PolyphaseChannelizer(n_channels, taps_per_channel, decimation, fs=fs,
+                                channels=canales, **opciones)
+
+
+def band_isolation(respuesta, fs=FS, tolerancia_pct=TOLERANCIA_PCT):
+    """
+    Aislamiento de cada banda DTMF.
+
+    Parámetros:
+    respuesta (callable): respuesta(i, freqs) -> |H_i(f)| del filtro i.
+
+    Retorna:
+    tuple: (ganancia mínima propia, peor ganancia en otro tono) en dB, por
+    filtro. Ambas consideran desviaciones de ± tolerancia_pct.
+    """
+    tonos = np.asarray(DTMF_FREQS, dtype=float)
+    desvios = 1 + np.array([-1, 0, 1]) * tolerancia_pct / 100
+    propia, otras = [], []
+    for i, f in enumerate(tonos):
+        ganancia = 20 * np.log10(respuesta(i, np.outer(tonos, desvios).ravel()) + 1e-12).reshape(len(tonos), 3)
+        propia.append(ganancia[i].min())
+        otras.append(np.delete(ganancia, i, axis=0).max())
+    return np.array(propia), np.array(otras)
+
+
+def fir_bank(order=101, bandwidth=30, fs=FS):
+    """Banco de 8 pasabanda como DTMFFilterGenerator.design_fir_bandpass."""
+    nyq = fs / 2
+    return np.array([signal.firwin(order, [(f - bandwidth / 2) / nyq, (f + bandwidth / 2) / nyq],
+                                   window='hamming', pass_zero=False) for f in DTMF_FREQS])
+
+
+def main():
+    from tools.dtmf import DTMFDecoder, keys_from_events
+    from tools.goertzel import read_wav_adc, DETECTION_THRESHOLD
+    import glob
+    import os
+
+    banco = fir_bank()
+    canal = dtmf_channelizer()
+
+    print("Costo y aislamiento (tonos con ±1.5 % de desviación)\n")
+    print(f"{'':34s} {'MACs/muestra':>12s} {'latencia':>10s} {'ganancia propia':>16s} {'peor vecino':>12s}")
+    filas = [
+        ("8 FIR pasabanda de 101 coef.", 8 * banco.shape[1], (banco.shape[1] - 1) / 2,
+         band_isolation(lambda i, f: np.abs(dft(banco[i], freqs=f, fs=FS)))),
+        (f"canalizador K={canal.K} L={canal.L} D={canal.D}", canal.macs_per_sample(), canal.latency,
+         band_isolation(canal.channel_response)),
+    ]
+    for nombre, macs, latencia, (propia, otras) in filas:
+        print(f"{nombre:34s} {macs:12.1f} {latencia / FS * 1e3:8.1f}ms {propia.min():14.1f}dB "
+              f"{otras.max():10.1f}dB")
+
+    # Decodificación de tonos_teclas con las energías del canalizador
+    carpeta = os.path.join(os.path.dirname(__file__), '..', 'universidad', 'proyectos_finales',
+                           'tonos_sinteticos', 'tonos_teclas')
+    aciertos, total, audio = 0, 0, 0.0
+    t0 = time.perf_counter()
+    for archivo in sorted(glob.glob(os.path.join(carpeta, '*.wav'))):
+        _, x = read_wav_adc(archivo)
+        # Silencio al final para vaciar el retardo de grupo del prototipo
+        x = np.concatenate((x, np.zeros(2 * BLOCK_SIZE)))
+        canal.reset()
+        E = canal.block_energies(canal.process(x))
+        decoder = DTMFDecoder(threshold=DETECTION_THRESHOLD, min_on_blocks=1, min_off_blocks=1)
+        teclas = keys_from_events(decoder.decide(E[:, None, :], np.arange(len(E))))
+        esperada = os.path.basename(archivo).rsplit('_', 1)[-1][:-4]
+        aciertos += teclas == esperada
+        total += 1
+        audio += len(x) / FS
+    t = time.perf_counter() - t0
+    print(f"\ntonos_teclas con el canalizador: {aciertos}/{total} correctos ({audio / t:.0f}x tiempo real)")
+
+    print(f"\nEncabezado para el ESP32: {len(canal.c_header())} caracteres (DTMFFilterGenerator"
+          f".generate_dtmf_filter_set(filter_type='channelizer') lo escribe en disco)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,194 @@
+# Transformada chirp-Z (CZT) y espectro con zoom
+# Autor: Adrián Silva Palafox
+#
+# La CZT evalúa la transformada Z en M puntos de una espiral
+# z_k = A·W^{-k}. Con |A| = |W| = 1 los puntos caen sobre el círculo
+# unitario entre f1 y f2, es decir, un "zoom" del espectro con la
+# resolución que se quiera, sin rellenar con ceros toda la FFT.
+#
+# Se calcula con el algoritmo de Bluestein: nk = (n² + k² - (k-n)²)/2
+# convierte la suma en una convolución que se resuelve con FFTs de
+# L >= N + M - 1 puntos, así que el costo es O((N+M) log(N+M)).
+
+import functools
+import time
+
+import numpy as np
+
+from tools.fft import fft, ifft, _next_pow2
+
+
+class CZTPlan:
+    """
+    Precálculo de la CZT para una longitud de entrada n, m puntos de
+    salida y parámetros (w, a) fijos.
+
+    Guarda los chirps y el espectro del núcleo de la convolución, así que
+    ejecutar el plan cuesta dos FFTs y una IFFT de L puntos.
+    """
+
+    def __init__(self, n, m, w, a):
+        self.n = int(n)
+        self.m = int(m)
+        self.w = complex(w)
+        self.a = complex(a)
+        self.L = _next_pow2(self.n + self.m - 1)
+
+        # W^{k²/2} y A^{-n}·W^{n²/2}; k²/2 se toma como k·k/2 para que el
+        # exponente sea exacto en enteros pequeños
+        k = np.arange(max(self.n, self.m))
+        log_w = np.log(self.w)
+        chirp = np.exp(log_w * (k * k / 2))
+        self.chirp_salida = chirp[:self.m]
+        self.chirp_entrada = self.a ** -np.arange(self.n) * chirp[:self.n]
+
+        # Núcleo W^{-j²/2} para j = -(n-1)..(m-1), dispuesto circularmente
+        nucleo = np.zeros(self.L, dtype=complex)
+        nucleo[:self.m] = 1 / chirp[:self.m]
+        if self.n > 1:
+            nucleo[-(self.n - 1):] = 1 / chirp[1:self.n][::-1]
+        self.espectro_nucleo = fft(nucleo)
+
+    def execute(self, x):
+        """
+        CZT sobre el último eje de x (longitud n).
+
+        Retorna:
+        np.ndarray: m valores complejos X_k = Σ x[n]·A^{-n}·W^{nk}.
+        """
+        y = fft(x * self.chirp_entrada, self.L)
+        g = ifft(y * self.espectro_nucleo)
+        return g[..., :self.m] * self.chirp_salida
+
+    def __repr__(self):
+        return f"CZTPlan(n={self.n}, m={self.m}, L={self.L})"
+
+
+@functools.lru_cache(maxsize=16)
+def get_czt_plan(n, m, w, a):
+    """Plan de la CZT desde un caché LRU (ver CZTPlan)."""
+    return CZTPlan(n, m, w, a)
+
+
+def czt(x, m=None, w=None, a=1.0, axis=-1):
+    """
+    Transformada chirp-Z.
+
+    Parámetros:
+    x (array): Señal de entrada (1-D o N-D).
+    m (int): Número de puntos de salida. Por defecto la longitud de x.
+    w (complex): Razón entre puntos. Por defecto e^{-j2π/m}, con lo que la
+        CZT coincide con la DFT de m puntos.
+    a (complex): Punto inicial de la espiral.
+    axis (int): Eje a transformar (por defecto el último).
+
+    Retorna:
+    np.ndarray: X_k = Σ_n x[n]·a^{-n}·w^{nk}, k = 0..m-1.
+    """
+    x = np.moveaxis(np.asarray(x), axis, -1)
+    if x.ndim == 0 or x.shape[-1] == 0:
+        raise ValueError("La entrada debe tener al menos una muestra")
+    n = x.shape[-1]
+    m = n if m is None else int(m)
+    if m < 1:
+        raise ValueError(f"Número de puntos no válido: {m}")
+    if w is None:
+        w = np.exp(-2j * np.pi / m)
+
+    X = get_czt_plan(n, m, complex(w), complex(a)).execute(x)
+    return np.moveaxis(X, -1, axis)
+
+
+def zoom_frequencies(f1, f2, m):
+    """Malla de m frecuencias entre f1 y f2 (ambos incluidos)."""
+    return np.linspace(f1, f2, m)
+
+
+def _parametros_zoom(f1, f2, m, fs):
+    """(w, a) de la CZT para m puntos entre f1 y f2 sobre el círculo unitario."""
+    paso = (f2 - f1) / (m - 1) if m > 1 else 0.0
+    w = np.exp(-2j * np.pi * paso / fs)
+    a = np.exp(2j * np.pi * f1 / fs)
+    return w, a
+
+
+def zoom_fft(x, f1, f2, m, fs=2.0, axis=-1):
+    """
+    Espectro de alta resolución en la banda [f1, f2].
+
+    Equivale a evaluar la DTFT de x en m frecuencias equiespaciadas entre
+    f1 y f2, pero en O((N+m) log(N+m)) en lugar de rellenar con ceros la
+    FFT hasta fs/paso puntos.
+
+    Parámetros:
+    x (array): Señal de entrada (1-D o N-D).
+    f1, f2 (float): Límites de la banda (Hz), f1 < f2.
+    m (int): Número de bins en la banda.
+    fs (float): Frecuencia de muestreo (Hz). Por defecto 2, es decir,
+        frecuencias normalizadas a Nyquist.
+    axis (int): Eje del tiempo (por defecto el último).
+
+    Retorna:
+    tuple: (f, X) con las m frecuencias y los bins complejos.
+    """
+    if not f1 < f2:
+        raise ValueError(f"Se requiere f1 < f2 (f1={f1}, f2={f2})")
+    w, a = _parametros_zoom(f1, f2, m, fs)
+    return zoom_frequencies(f1, f2, m), czt(x, m, w, a, axis=axis)
+
+
+def zoom_freqz(b, a=1, f1=0.0, f2=None, m=512, fs=2.0):
+    """
+    Respuesta en frecuencia H(f) = B(f)/A(f) solo en la banda [f1, f2].
+
+    Sustituye a signal.freqz con miles de puntos cuando solo interesa una
+    banda angosta (p. ej. ±200 Hz alrededor de un tono DTMF).
+
+    Parámetros:
+    b, a (array): Coeficientes del numerador y denominador.
+    f1, f2 (float): Límites de la banda (Hz). f2 por defecto fs/2.
+    m (int): Número de puntos en la banda.
+    fs (float): Frecuencia de muestreo (Hz).
+
+    Retorna:
+    tuple: (f, H) con las m frecuencias y la respuesta compleja.
+    """
+    if f2 is None:
+        f2 = fs / 2
+    f, B = zoom_fft(np.atleast_1d(b), f1, f2, m, fs)
+    A = zoom_fft(np.atleast_1d(a), f1, f2, m, fs)[1]
+    return f, B / A
+
+
+def main():
+    # Comparación contra la DTFT directa y contra rellenar la FFT con ceros
+    fs = 1000
+    t = np.arange(fs) / fs
+    x = np.cos(2 * np.pi * 100 * t) + 0.1 * np.cos(2 * np.pi * 105 * t)
+
+    f1, f2, m = 90.0, 115.0, 501
+    f, X = zoom_fft(x, f1, f2, m, fs)
+    n = np.arange(len(x))
+    referencia = np.exp(-2j * np.pi * np.outer(f, n) / fs) @ x
+    print(f"Error vs DTFT directa: {np.max(np.abs(X - referencia)) / np.max(np.abs(referencia)):.2e}")
+
+    # Misma resolución (0.05 Hz) con una FFT rellenada con ceros
+    n_fft = int(fs / (f[1] - f[0]))
+    t0 = time.perf_counter()
+    for _ in range(10):
+        np.fft.rfft(x, n_fft)
+    t_fft = (time.perf_counter() - t0) / 10
+    t0 = time.perf_counter()
+    for _ in range(10):
+        zoom_fft(x, f1, f2, m, fs)
+    t_czt = (time.perf_counter() - t0) / 10
+    print(f"Resolución {f[1] - f[0]:.3f} Hz: zoom_fft {t_czt * 1e3:.2f} ms, "
+          f"FFT rellenada de {n_fft} puntos {t_fft * 1e3:.2f} ms")
+
+    for tono in (100, 105):
+        k = np.argmin(np.abs(f - tono))
+        print(f"Amplitud en {f[k]:.2f} Hz: {2 * np.abs(X[k]) / len(x):.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,41 +2,180 @@
 # Autor: Adrián Silva Palafox
 # Fecha: 2025-4-4
 
+import numpy as np
 import matplotlib.pyplot as plt
 
 # Señales de entrada
 h_filter = [0.5,1,0.5]  
 x_signal = [2,1,0,1,2]
 
+# Tabla de cruce medida con tools/bench/conv_cruces.py (NumPy 2.x, x86-64).
+# Cada entrada es (M máximo, N mínimo): si la señal corta tiene a lo más M
+# muestras se usa la forma directa, salvo que la larga tenga N o más muestras.
+# None indica que la forma directa gana para cualquier N medido.
+_CRUCE_DIRECTO = (
+    (64, None),
+    (128, 32768),
+    (256, 2048),
+    (512, 1024),
+)
+
+# A partir de esta razón N/M conviene overlap-add en lugar de una sola FFT.
+_RAZON_OVERLAP_ADD = 4
+
+# La FFT de cada bloque de overlap-add mide la potencia de 2 >= M * este factor.
+_FACTOR_BLOQUE = 4
+
+
+def _next_pow2(n):
+    """Potencia de 2 mayor o igual a n."""
+    return 1 << (int(n) - 1).bit_length()
+
+
+def choose_method(len_h, len_x):
+    """
+    Elige el método de convolución según las longitudes de las señales.
+
+    Parámetros:
+    len_h (int): Longitud del filtro.
+    len_x (int): Longitud de la señal de entrada.
+
+    Retorna:
+    str: 'direct', 'overlap-add' o 'fft'.
+    """
+    M = min(len_h, len_x)
+    N = max(len_h, len_x)
+
+    for m_max, n_min in _CRUCE_DIRECTO:
+        if M <= m_max:
+            if n_min is None or N < n_min:
+                return 'direct'
+            break
+
+    if N >= _RAZON_OVERLAP_ADD * M:
+        return 'overlap-add'
+    return 'fft'
+
+
+def _transformadas(complejo):
+    """Par (directa, inversa) de FFT adecuado al tipo de dato."""
+    if complejo:
+        return np.fft.fft, lambda X, n: np.fft.ifft(X, n)
+    return np.fft.rfft, np.fft.irfft
+
+
+def _fft_conv(h, x):
+    """Convolución lineal completa con una sola FFT."""
+    len_y = len(h) + len(x) - 1
+    nfft = _next_pow2(len_y)
+    fwd, inv = _transformadas(np.iscomplexobj(h) or np.iscomplexobj(x))
+    return inv(fwd(h, nfft) * fwd(x, nfft), nfft)[:len_y]
+
+
+def _overlap_add_conv(h, x):
+    """
+    Convolución por bloques (overlap-add) con todos los bloques en una sola
+    FFT por lotes. h debe ser la señal corta.
+    """
+    M = len(h)
+    N = len(x)
+    nfft = _next_pow2(_FACTOR_BLOQUE * M)
+    L = nfft - M + 1  # Muestras nuevas por bloque
+    n_bloques = -(-N // L)
+
+    fwd, inv = _transformadas(np.iscomplexobj(h) or np.iscomplexobj(x))
+    dtype = np.result_type(h, x, np.float64)
+
+    # Partir la señal en bloques de L muestras (el último se rellena con ceros)
+    bloques = np.zeros((n_bloques, L), dtype=dtype)
+    bloques.ravel()[:N] = x
+
+    salida = inv(fwd(bloques, nfft) * fwd(h, nfft), nfft)
+
+    # Cada bloque aporta L muestras propias y una cola de M-1 (M-1 < L)
+    y = np.zeros((n_bloques + 1) * L, dtype=salida.dtype)
+    y[:n_bloques * L] += salida[:, :L].ravel()
+    colas = np.zeros((n_bloques, L), dtype=salida.dtype)
+    colas[:, :M - 1] = salida[:, L:]
+    y[L:] += colas.ravel()
+
+    return y[:N + M - 1]
+
+
 # Convolución discreta
-def dconv(h, x):
+def dconv(h, x, method='auto'):
     """
     Realiza la convolución discreta entre dos señales.
+
+    Según las longitudes de las señales usa la forma directa (vectorizada),
+    overlap-add o una FFT completa; ver choose_method().
     
     Parámetros:
     h (list): Primer señal (filtro).
     x (list): Segunda señal (entrada).
+    method (str): 'auto', 'direct', 'overlap-add' o 'fft'.
     
     Retorna:
-    list: Resultado de la convolución.
+    list: Resultado de la convolución. Si alguna entrada es un arreglo de
+    NumPy se retorna un np.ndarray. Si alguna señal está vacía el resultado
+    son len(h) + len(x) - 1 ceros (ninguno si ambas lo están).
     """
-    # Longitudes de las señales
-    len_h = len(h)
-    len_x = len(x)
-    
-    # Longitud de la señal resultante
-    len_y = len_h + len_x - 1
-    
-    # Inicializar la señal resultante
-    y = [0] * len_y
-    
-    # Realizar la convolución
-    for n in range(len_y):
-        for k in range(len_h):
-            if n - k >= 0 and n - k < len_x:
-                y[n] += h[k] * x[n - k]
-    
-    return y
+    como_lista = not isinstance(h, np.ndarray) and not isinstance(x, np.ndarray)
+    h_arr = np.asarray(h)
+    x_arr = np.asarray(x)
+
+    if h_arr.ndim != 1 or x_arr.ndim != 1:
+        raise ValueError("dconv solo acepta señales unidimensionales")
+    if len(h_arr) == 0 or len(x_arr) == 0:
+        # Como la versión original: ceros de longitud len(h) + len(x) - 1
+        y = np.zeros(max(len(h_arr) + len(x_arr) - 1, 0), dtype=np.result_type(h_arr, x_arr))
+        return y.tolist() if como_lista else y
+
+    if method == 'auto':
+        method = choose_method(len(h_arr), len(x_arr))
+
+    if method == 'direct':
+        y = np.convolve(h_arr, x_arr)
+    elif method == 'fft':
+        y = _fft_conv(h_arr, x_arr)
+    elif method == 'overlap-add':
+        corta, larga = (h_arr, x_arr) if len(h_arr) <= len(x_arr) else (x_arr, h_arr)
+        y = _overlap_add_conv(corta, larga)
+    else:
+        raise ValueError(f"Método de convolución '{method}' no reconocido")
+
+    return y.tolist() if como_lista else y
+
+def dconv_bank(x, h):
+    """
+    Convoluciona un conjunto de señales con un banco de filtros en una sola
+    operación vectorizada.
+
+    Se calcula una sola FFT directa por señal y por filtro; los productos de
+    todas las combinaciones señal-filtro se invierten juntos.
+
+    Parámetros:
+    x (array): Señales de entrada, forma (S, N) o (N,) para una sola señal.
+    h (array): Banco de filtros, forma (F, M) o (M,) para un solo filtro.
+
+    Retorna:
+    np.ndarray: Forma (S, F, N+M-1); y[s, f] == dconv(h[f], x[s]).
+    """
+    x_arr = np.atleast_2d(np.asarray(x))
+    h_arr = np.atleast_2d(np.asarray(h))
+
+    if x_arr.ndim != 2 or h_arr.ndim != 2:
+        raise ValueError("x y h deben ser arreglos de 1 o 2 dimensiones")
+    if x_arr.shape[1] == 0 or h_arr.shape[1] == 0:
+        raise ValueError("Las señales no pueden estar vacías")
+
+    len_y = x_arr.shape[1] + h_arr.shape[1] - 1
+    nfft = _next_pow2(len_y)
+    fwd, inv = _transformadas(np.iscomplexobj(x_arr) or np.iscomplexobj(h_arr))
+
+    X = fwd(x_arr, nfft)  # (S, K)
+    H = fwd(h_arr, nfft)  # (F, K)
+    return inv(X[:, np.newaxis, :] * H[np.newaxis, :, :], nfft)[..., :len_y]
 
 def main():
     # Realizar la convolución
@@ -61,4 +200,4 @@ def main():
 
 if __name__ == "__main__":
     main()
-# Resultado esperado: [1.0, 2.0, 2.0, 2.0, 1.0]
\ No newline at end of file
+# Resultado esperado: [1.0, 2.0, 2.0, 2.0, 1.0]
@@ -2,9 +2,26 @@
 # Autor: Adrián Silva Palafox
 # Fecha: 2025-4-4
 
+import functools
+
 import numpy as np
 import matplotlib.pyplot as plt
 
+from tools.fft import fft, ifft, rfft, irfft
+from tools.goertzel import _recursion
+
+# Evaluación de bins sueltos (dft(x, bins=...) / dft(x, freqs=..., fs=...)):
+# la señal se parte en bloques de _BLOQUE_BINS muestras y cada bloque se
+# multiplica por una tabla (B x K) de exponenciales. La contribución de cada
+# bloque solo difiere por un giro e^{-jωn0}, así que la tabla se reutiliza.
+# Con más de _BINS_FFT bins enteros conviene la FFT completa.
+# La recursión de Goertzel (method='goertzel') solo se usa si se pide: recorre
+# las N muestras en Python y midió de 5 a 100 veces más lenta que el producto
+# por bloques (N = 64..8192, 1..1024 tramas, 1..8 bins), así que no hay cruce
+# a su favor en tiempo; su ventaja es la memoria O(K) por trama.
+_BLOQUE_BINS = 256
+_BINS_FFT = 32
+
 # señal
 # x = [2,1,0,1,2]
 #x = [1,1,1,1,0,0,0,0] #examen
@@ -14,43 +31,208 @@ x = list(np.array(np.cos((np.pi/3)*n)))
 # n = np.arange(0, 8)  # Vector de tiempo discreto 6 puntos
 # x = list(0.8**n)  # Genera una onda sinusoidal como array
 
-print("x:", x)
+def _longitud_dft(N, padding):
+    """
+    Longitud de la transformada: la siguiente potencia de 2 si padding es
+    None; nunca menor que la señal.
+    """
+    if padding is None:
+        next_pow2 = 1 << (N - 1).bit_length()  # N si ya es potencia de 2
+    else:
+        next_pow2 = padding
+    return max(N, next_pow2)
 
-def dft(x, padding=None):
+@functools.lru_cache(maxsize=32)
+def _tabla_bins(B, omegas):
+    """Tabla e^{-jωn} (B x K) para n = 0..B-1; de solo lectura."""
+    fase = np.outer(np.arange(B), omegas)
+    tabla = np.cos(fase) - 1j * np.sin(fase)
+    tabla.flags.writeable = False
+    return tabla
+
+def _dft_bins(a, omegas):
+    """
+    X(ω) = Σ a[n]·e^{-jωn} sobre el último eje de a, para cada ω.
+
+    Costo O(N·K) por trama y memoria O(B·K), sin calcular los N bins.
+    """
+    N = a.shape[-1]
+    B = min(_BLOQUE_BINS, N)
+    n_bloques = -(-N // B)
+    if n_bloques * B != N:
+        relleno = np.zeros(a.shape[:-1] + (n_bloques * B - N,), dtype=a.dtype)
+        a = np.concatenate((a, relleno), axis=-1)
+    bloques = a.reshape(a.shape[:-1] + (n_bloques, B))
+
+    tabla = _tabla_bins(B, tuple(omegas))
+    if np.iscomplexobj(bloques):
+        parciales = bloques @ tabla
+    else:
+        # Dos productos reales son más rápidos que convertir a complejo
+        parciales = bloques @ tabla.real + 1j * (bloques @ tabla.imag)
+
+    # Giro de cada bloque según su muestra inicial n0 = b·B
+    giro = np.exp(-1j * np.outer(np.arange(n_bloques) * B, omegas))
+    return np.einsum('...bk,bk->...k', parciales, giro)
+
+def _goertzel_bins(a, omegas):
+    """
+    X(ω) con la recursión de Goertzel (tools.goertzel) sobre el último eje.
+
+    Tras N muestras, con q1 = s[N-1] y q2 = s[N-2]:
+    X(ω) = e^{-jω(N-1)}·(q1 - e^{-jω}·q2). Una pasada por muestra para
+    todas las tramas y bins a la vez; memoria O(K) por trama.
+    """
+    N = a.shape[-1]
+    omegas = np.asarray(omegas, dtype=float)
+    filas = a.reshape(-1, N)
+    q1 = np.zeros((filas.shape[0], len(omegas)), dtype=np.result_type(filas, float))
+    q2 = np.zeros_like(q1)
+    q1, q2 = _recursion(filas, 2 * np.cos(omegas), q1, q2)
+    X = np.exp(-1j * omegas * (N - 1)) * (q1 - np.exp(-1j * omegas) * q2)
+    return X.reshape(a.shape[:-1] + (len(omegas),))
+
+def choose_bins_method(n_bins, enteros):
+    """
+    Elige cómo evaluar n_bins bins de la DFT.
+
+    Nunca elige 'goertzel': en las mediciones el producto por bloques le
+    ganó en todos los casos.
+
+    Parámetros:
+    n_bins (int): Número de bins pedidos.
+    enteros (bool): True si todos los bins caen en la malla k·fs/N.
+
+    Retorna:
+    str: 'fft' (transformada completa y selección) o 'direct' (producto
+    por bloques, admite bins fraccionarios).
+    """
+    if enteros and n_bins > _BINS_FFT:
+        return 'fft'
+    return 'direct'
+
+def dft(x, padding=None, axis=-1, out=None, bins=None, freqs=None, fs=None, method=None):
     """
     Realiza la transformada discreta de Fourier (DFT) de una señal.
+
+    El cálculo se hace con la FFT de tools.fft (O(N log N)); la señal de
+    entrada no se modifica. Con un arreglo (F x N) se transforman todas las
+    tramas en una sola llamada vectorizada.
     
     Parámetros:
-    x (list): Señal de entrada.
-    padding (int): Longitud deseada de la señal. Si es None, se ajusta a la longitud de la señal.
+    x (list o np.ndarray): Señal de entrada, o varias apiladas.
+    padding (int): Longitud deseada de la señal. Si es None, se rellena con
+    ceros hasta la siguiente potencia de 2. Si es menor que la señal, se ignora.
+    axis (int): Eje del tiempo (por defecto el último).
+    out (np.ndarray): Buffer complejo preasignado para el resultado; útil
+    para reutilizar memoria trama tras trama.
+    bins (array): Si se da, solo se calculan estos bins k (pueden ser
+    fraccionarios), con la misma numeración que la DFT completa de
+    longitud N (después del padding).
+    freqs (array): Alternativa a bins: frecuencias en Hz, requiere fs.
+    fs (float): Frecuencia de muestreo para freqs.
+    method (str): Con bins o freqs: 'fft', 'direct' o 'goertzel'
+    (recursión de tools.goertzel, memoria O(K) por trama). Si es None lo
+    elige choose_bins_method().
 
     Retorna:
-    list: Resultado de la DFT.
+    np.ndarray: Resultado de la DFT (complejo; out si se proporcionó). Con
+    bins o freqs el eje transformado tiene un valor por bin pedido.
     """
 
     # Longitud de la señal
-    N = len(x)
-    if padding is None:
-        if N & (N - 1) != 0:  # Verifica si N no es potencia de 2
-            next_pow2 = 1 << (N - 1).bit_length()
+    N = np.shape(x)[axis]
+    Nfft = _longitud_dft(N, padding)
+
+    if bins is None and freqs is None:
+        # Padding para que la longitud sea una potencia de 2
+        return fft(x, Nfft, axis=axis, out=out)
+
+    if bins is not None and freqs is not None:
+        raise ValueError("Use bins o freqs, no ambos")
+    if freqs is not None:
+        if fs is None:
+            raise ValueError("freqs requiere la frecuencia de muestreo fs")
+        bins = np.asarray(freqs, dtype=float) * Nfft / fs
+    bins = np.atleast_1d(np.asarray(bins, dtype=float))
+    if bins.ndim != 1:
+        raise ValueError("bins debe ser unidimensional")
+
+    enteros = bool(np.all(bins == np.round(bins)))
+    if method is None:
+        method = choose_bins_method(len(bins), enteros)
+    if method not in ('fft', 'direct', 'goertzel'):
+        raise ValueError(f"Método desconocido: {method}")
+    if method == 'fft' and not enteros:
+        raise ValueError("method='fft' requiere bins enteros")
+
+    if method == 'fft':
+        X = fft(x, Nfft, axis=axis)
+        X = np.take(X, np.round(bins).astype(int) % Nfft, axis=axis)
     else:
-        next_pow2 = padding
+        a = np.moveaxis(np.asarray(x), axis, -1)
+        if not np.issubdtype(a.dtype, np.inexact):
+            a = a.astype(float)
+        evaluar = _goertzel_bins if method == 'goertzel' else _dft_bins
+        X = np.moveaxis(evaluar(a, 2 * np.pi * bins / Nfft), -1, axis)
+
+    if out is None:
+        return X
+    if out.shape != X.shape:
+        raise ValueError(f"out tiene forma {out.shape}; se esperaba {X.shape}")
+    out[...] = X
+    return out
 
-    # Padding para que la longitud sea una potencia de 2
-    x += [0] * (next_pow2 - N)
-    N = len(x)
+def idft(X, n=None, axis=-1, out=None):
+    """
+    Transformada inversa de dft().
 
-    # Inicializar la señal resultante
-    X = [0] * N
+    Parámetros:
+    X (array): Coeficientes de la DFT (1-D o F x N).
+    n (int): Longitud de la señal de salida. Por defecto la de X.
+    axis (int): Eje de frecuencia (por defecto el último).
+    out (np.ndarray): Buffer complejo preasignado para el resultado.
 
-    # Realizar la DFT
-    for k in range(N):
-        for n in range(N):
-            X[k] += x[n] * (np.e ** (-2j * np.pi * k * n / N))
-    
-    return X
+    Retorna:
+    np.ndarray: Señal en el tiempo (compleja; out si se proporcionó).
+    """
+    return ifft(X, n, axis=axis, out=out)
+
+def rdft(x, padding=None, axis=-1, out=None):
+    """
+    DFT de una señal real: solo los bins de frecuencia no negativa.
+
+    Parámetros:
+    x (list o np.ndarray): Señal de entrada real (1-D o F x N).
+    padding (int): Igual que en dft().
+    axis (int): Eje del tiempo (por defecto el último).
+    out (np.ndarray): Buffer complejo preasignado de N//2 + 1 bins por trama.
+
+    Retorna:
+    np.ndarray: Bins X[0..N/2] (N//2 + 1 valores complejos), donde N es la
+    longitud después del padding.
+    """
+    N = np.shape(x)[axis]
+    return rfft(x, _longitud_dft(N, padding), axis=axis, out=out)
+
+def irdft(X, n=None, axis=-1, out=None):
+    """
+    Transformada inversa de rdft().
+
+    Parámetros:
+    X (array): Bins de frecuencia no negativa.
+    n (int): Longitud de la señal original. Por defecto 2*(len(X) - 1).
+    axis (int): Eje de frecuencia (por defecto el último).
+    out (np.ndarray): Buffer real preasignado de n muestras por trama.
+
+    Retorna:
+    np.ndarray: Señal real reconstruida.
+    """
+    return irfft(X, n, axis=axis, out=out)
 
 def main():
+    print("x:", x)
+
     # Realizar la DFT
     X = dft(x, 5)
     
@@ -70,4 +252,4 @@ def main():
 
 if __name__ == "__main__":
     main()
-# Convolución discreta algoritmo
\ No newline at end of file
+# Convolución discreta algoritmo
@@ -1,4 +1,5 @@
-from dft import dft
+from tools.dft import rdft
+from tools.generators import MultiTone
 import matplotlib.pyplot as plt
 import numpy as np
 
@@ -8,7 +9,8 @@ signal_duration = 10  # Duración de la señal en segundos
 fs = freq * 10  # Frecuencia de muestreo (Hz)
 Ts = np.arange(0, signal_duration, 1/fs)  # Vector de tiempo
 
-x = np.array([np.sin(2 * np.pi * freq * t) + np.cos(2 * np.pi * freq/3 * t) for t in Ts])  # Genera una onda sinusoidal como array
+# Seno de freq más coseno de freq/3 (seno desfasado π/2), vectorizado
+x = MultiTone([freq, freq / 3], phases=[0, np.pi / 2], fs=fs).array(signal_duration)
 #x = 0.8 ** Ts # Genera una señal exponencial
 
 def main():
@@ -16,17 +18,16 @@ def main():
     Este programa genera una señal compuesta por una suma de una onda sinusoidal y una cosenoidal,
     calcula su Transformada Discreta de Fourier (DFT) y grafica la magnitud y la fase de la DFT.
     """
-    # Calcula la DFT de la señal
-    X = dft(list(x))
+    # Calcula la DFT de la señal (solo frecuencias no negativas, la señal es real)
+    X = rdft(x)
+    N = 2 * (len(X) - 1)  # Longitud después del padding
     
     # Magnitud y fase
     magnitude = np.abs(X)
     phase = np.angle(X)
 
     # Vector de frecuencias
-    freqs = [0] * len(X)
-    for k in range(len(X)):
-        freqs[k] = (k * fs) / len(X)
+    freqs = np.arange(len(X)) * fs / N
 
     # Grafica la señal original
     plt.figure(figsize=(10, 5))
@@ -40,7 +41,7 @@ def main():
 
     # Grafica la magnitud
     plt.figure(figsize=(10, 5))
-    plt.plot(freqs[:len(freqs)//2], magnitude[:len(magnitude)//2])
+    plt.plot(freqs[:N//2], magnitude[:N//2])
     plt.title("Magnitud de la DFT")
     plt.xlabel("Frecuencia (Hz)")
     plt.ylabel("Magnitud")
@@ -48,7 +49,7 @@ def main():
 
     # Grafica la fase
     plt.figure(figsize=(10, 5))
-    plt.plot(freqs[:len(freqs)//2], phase[:len(phase)//2])
+    plt.plot(freqs[:N//2], phase[:N//2])
     plt.title("Fase de la DFT")
     plt.xlabel("Frecuencia (Hz)")
     plt.ylabel("Fase (radianes)")
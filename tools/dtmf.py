@@ -0,0 +1,276 @@
+# Decodificador DTMF en flujo continuo con eventos de tecla
+# Autor: Adrián Silva Palafox
+#
+# Usa GoertzelBank (tools.goertzel) para conservar el estado de cada bin
+# entre trozos de audio. Sobre cada bloque de 256 muestras aplica:
+# - umbral absoluto en ambos grupos (como el firmware),
+# - twist: diferencia máxima en dB entre el tono bajo y el alto,
+# - energía relativa: el pico de cada grupo debe superar por cierto margen
+#   al segundo bin más fuerte del mismo grupo,
+# y una máquina de estados con antirrebote que emite eventos 'press' y
+# 'release' con su instante. La latencia queda acotada a min_on_blocks
+# bloques después del inicio del tono.
+
+import time
+
+import numpy as np
+
+from tools.goertzel import (GoertzelBank, DTMF_FREQS, DTMF_KEYS, FS, BLOCK_SIZE,
+                            DETECTION_THRESHOLD)
+
+_TECLAS = ''.join(''.join(fila) for fila in DTMF_KEYS)  # índice = 4·bajo + alto
+
+
+class KeyEvent:
+    """Evento de tecla: kind es 'press' o 'release'; time en segundos."""
+
+    __slots__ = ('kind', 'key', 'time', 'stream')
+
+    def __init__(self, kind, key, time, stream=0):
+        self.kind = kind
+        self.key = key
+        self.time = time
+        self.stream = stream
+
+    def __repr__(self):
+        return f"KeyEvent({self.kind!r}, {self.key!r}, t={self.time:.3f}s, stream={self.stream})"
+
+
+class DTMFDecoder:
+    """
+    Decodificador DTMF para uno o varios flujos de audio a 8 kHz.
+
+    Cada flujo pasa por una máquina de estados:
+    - reposo: se espera un bloque con tecla válida;
+    - candidato: la misma tecla debe repetirse min_on_blocks bloques
+      seguidos para emitir 'press' (con el instante del primer bloque);
+    - presionada: tras min_off_blocks bloques sin esa tecla se emite
+      'release'.
+
+    Ejemplo:
+        decoder = DTMFDecoder()
+        for trozo in captura:
+            for evento in decoder.process(trozo):
+                print(evento)
+        decoder.flush()
+    """
+
+    def __init__(self, n_streams=1, fs=FS, block_size=BLOCK_SIZE, threshold=DETECTION_THRESHOLD,
+                 max_twist_db=8.0, max_reverse_twist_db=4.0, min_peak_ratio_db=6.0,
+                 min_on_blocks=2, min_off_blocks=2, t0=0.0):
+        """
+        Parámetros:
+        n_streams (int): Número de flujos independientes.
+        fs (float): Frecuencia de muestreo (Hz).
+        block_size (int): Muestras por bloque de análisis.
+        threshold (float): Energía mínima de cada tono (unidades de
+            goertzel_energy; 30 con cuentas del ADC, como el firmware).
+        max_twist_db (float): Cuánto puede superar el tono bajo al alto.
+        max_reverse_twist_db (float): Cuánto puede superar el tono alto al bajo.
+        min_peak_ratio_db (float): Margen del pico sobre el segundo bin
+            más fuerte de su grupo.
+        min_on_blocks (int): Bloques seguidos para confirmar una tecla.
+        min_off_blocks (int): Bloques sin la tecla para soltarla.
+        t0 (float): Instante del primer muestreo (p. ej. time.time()).
+        """
+        if min_on_blocks < 1 or min_off_blocks < 1:
+            raise ValueError("min_on_blocks y min_off_blocks deben ser al menos 1")
+        self.n_streams = int(n_streams)
+        self.fs = fs
+        self.block_size = int(block_size)
+        self.threshold = threshold
+        self.max_twist_db = max_twist_db
+        self.max_reverse_twist_db = max_reverse_twist_db
+        self.min_peak_ratio_db = min_peak_ratio_db
+        self.min_on_blocks = int(min_on_blocks)
+        self.min_off_blocks = int(min_off_blocks)
+        self.t0 = t0
+
+        self.bank = GoertzelBank(DTMF_FREQS, fs, self.block_size, self.n_streams)
+        self.reset()
+
+    def reset(self):
+        """Reinicia el estado de Goertzel y las máquinas de estado."""
+        self.bank.reset()
+        S = self.n_streams
+        self._candidata = np.full(S, -1)      # tecla en observación (-1 = ninguna)
+        self._racha = np.zeros(S, dtype=int)  # bloques seguidos de la candidata
+        self._inicio = np.zeros(S, dtype=int)  # primer bloque de la candidata
+        self._presionada = np.full(S, -1)     # tecla emitida y no soltada
+        self._ausente = np.zeros(S, dtype=int)  # bloques sin la tecla presionada
+        self.last_energies = np.zeros((S, len(DTMF_FREQS)))
+        self._bloques = 0  # bloques decididos desde reset()
+
+    def _tiempo(self, bloque):
+        """Instante (s) del inicio de un bloque."""
+        return self.t0 + bloque * self.block_size / self.fs
+
+    def classify(self, energies):
+        """
+        Tecla válida de cada fila de energías, o -1.
+
+        Parámetros:
+        energies (array): (..., 8) energías de Goertzel.
+
+        Retorna:
+        np.ndarray: Índice en '123A456B789C*0#D' por fila (-1 si no pasa
+        las pruebas).
+        """
+        e = np.asarray(energies, dtype=float)
+        bajos = np.sort(e[..., :4], axis=-1)
+        altos = np.sort(e[..., 4:], axis=-1)
+        baja = np.argmax(e[..., :4], axis=-1)
+        alta = np.argmax(e[..., 4:], axis=-1)
+        pico_bajo, pico_alto = bajos[..., -1], altos[..., -1]
+
+        # Bloques sin energía en algún grupo (silencio digital, WAV con
+        # ceros) se descartan antes de los cocientes: 0/0 daría NaN. El
+        # segundo bin sí puede ser cero (margen infinito, tono limpio).
+        con_energia = (pico_bajo > 0) & (pico_alto > 0)
+        pico_bajo = np.where(con_energia, pico_bajo, 1.0)
+        pico_alto = np.where(con_energia, pico_alto, 1.0)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            twist = 20 * np.log10(pico_bajo / pico_alto)
+            margen_bajo = 20 * np.log10(pico_bajo / bajos[..., -2])
+            margen_alto = 20 * np.log10(pico_alto / altos[..., -2])
+
+        valida = (con_energia & (pico_bajo > self.threshold) & (pico_alto > self.threshold)
+                  & (twist <= self.max_twist_db) & (twist >= -self.max_reverse_twist_db)
+                  & (margen_bajo >= self.min_peak_ratio_db)
+                  & (margen_alto >= self.min_peak_ratio_db))
+        return np.where(valida, 4 * baja + alta, -1)
+
+    def _actualizar(self, s, tecla, bloque, eventos):
+        """Avanza la máquina de estados del flujo s con la tecla de un bloque."""
+        # Suelta la tecla presionada tras min_off_blocks bloques sin ella
+        if self._presionada[s] >= 0:
+            if tecla == self._presionada[s]:
+                self._ausente[s] = 0
+                return
+            self._ausente[s] += 1
+            if self._ausente[s] < self.min_off_blocks:
+                return
+            liberada = bloque - self.min_off_blocks + 1
+            eventos.append(KeyEvent('release', _TECLAS[self._presionada[s]], self._tiempo(liberada), s))
+            self._presionada[s] = -1
+            self._ausente[s] = 0
+
+        if tecla < 0:
+            self._candidata[s] = -1
+            self._racha[s] = 0
+            return
+        if tecla != self._candidata[s]:
+            self._candidata[s] = tecla
+            self._racha[s] = 0
+            self._inicio[s] = bloque
+        self._racha[s] += 1
+
+        if self._racha[s] >= self.min_on_blocks:
+            eventos.append(KeyEvent('press', _TECLAS[tecla], self._tiempo(self._inicio[s]), s))
+            self._presionada[s] = tecla
+            self._candidata[s] = -1
+            self._racha[s] = 0
+
+    def process(self, chunk):
+        """
+        Agrega audio y retorna los eventos de los bloques completados.
+
+        Parámetros:
+        chunk (array): (L,) con un solo flujo, o (S, L).
+
+        Retorna:
+        list: KeyEvent ordenados por instante.
+        """
+        return self.decide(*self.bank.process(chunk))
+
+    def decide(self, energies, indices):
+        """
+        Pruebas y máquina de estados sobre energías ya calculadas.
+
+        Permite usar el mismo criterio de decisión con otros detectores
+        (p. ej. bancos de filtros FIR o IIR) que entreguen una energía por
+        bloque y frecuencia en la escala de goertzel_energy.
+
+        Parámetros:
+        energies (array): (nb, S, 8) energías por bloque y flujo.
+        indices (array): Índice global de cada bloque (nb,).
+
+        Retorna:
+        list: KeyEvent ordenados por instante.
+        """
+        if len(energies) == 0:
+            return []
+        self.last_energies = energies[-1]
+        self._bloques = int(indices[-1]) + 1
+        teclas = self.classify(energies)  # (nb, S)
+
+        eventos = []
+        for fila, bloque in zip(teclas, indices):
+            if not np.any(fila >= 0) and not np.any(self._presionada >= 0) \
+                    and not np.any(self._candidata >= 0):
+                continue  # silencio en todos los flujos
+            for s in range(self.n_streams):
+                self._actualizar(s, fila[s], bloque, eventos)
+        eventos.sort(key=lambda ev: ev.time)
+        return eventos
+
+    def flush(self):
+        """
+        Fin del flujo: suelta las teclas todavía presionadas y reinicia.
+
+        Retorna:
+        list: Eventos 'release' pendientes.
+        """
+        fin = self._tiempo(max(self._bloques, self.bank.blocks_done))
+        eventos = [KeyEvent('release', _TECLAS[k], fin, s)
+                   for s, k in enumerate(self._presionada) if k >= 0]
+        self.reset()
+        return eventos
+
+
+def keys_from_events(events):
+    """Cadena de teclas a partir de los eventos 'press'."""
+    return ''.join(ev.key for ev in events if ev.kind == 'press')
+
+
+def main():
+    # Secuencia sintética: tonos de 80 ms con 60 ms de silencio, ruido y
+    # twist de 3 dB; se alimenta en trozos de tamaño irregular
+    rng = np.random.default_rng(0)
+    secuencia = '*159#0D'
+    t_tono, t_pausa = int(0.08 * FS), int(0.06 * FS)
+    n = np.arange(t_tono)
+    partes = [np.zeros(t_pausa)]
+    for tecla in secuencia:
+        i = _TECLAS.index(tecla)
+        f_baja, f_alta = DTMF_FREQS[i // 4], DTMF_FREQS[4 + i % 4]
+        tono = 150 * np.sin(2 * np.pi * f_baja * n / FS) + 106 * np.sin(2 * np.pi * f_alta * n / FS)
+        partes += [tono, np.zeros(t_pausa)]
+    x = np.concatenate(partes) + rng.normal(0, 10, sum(len(p) for p in partes))
+
+    decoder = DTMFDecoder()
+    eventos = []
+    pos = 0
+    while pos < len(x):
+        L = int(rng.integers(1, 400))
+        eventos += decoder.process(x[pos:pos + L])
+        pos += L
+    eventos += decoder.flush()
+    for ev in eventos:
+        print(ev)
+    print(f"\nEsperada: {secuencia}  Decodificada: {keys_from_events(eventos)}")
+
+    # Muchos flujos simultáneos en un solo núcleo
+    for S in (1, 16, 128):
+        decoder = DTMFDecoder(n_streams=S)
+        flujos = np.tile(x, (S, 1))
+        t0 = time.perf_counter()
+        for pos in range(0, flujos.shape[1], 160):  # trozos de 20 ms
+            decoder.process(flujos[:, pos:pos + 160])
+        t = time.perf_counter() - t0
+        tiempo_real = S * flujos.shape[1] / FS / t
+        print(f"{S:4d} flujos: {tiempo_real:8.0f} s de audio por segundo ({tiempo_real / S:.0f}x tiempo real por flujo)")
+
+
+if __name__ == "__main__":
+    main()
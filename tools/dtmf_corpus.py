@@ -0,0 +1,133 @@
+# Decodificación DTMF de un corpus de archivos WAV en paralelo
+# Autor: Adrián Silva Palafox
+#
+# Uso (desde la raíz del repositorio):
+#   python -m tools.dtmf_corpus universidad/proyectos_finales/tonos_sinteticos/tonos_teclas
+#   python -m tools.dtmf_corpus corpus/ -o resultados.csv -j 8
+#
+# Recorre el directorio (y subdirectorios) buscando *.wav, decodifica cada
+# archivo con DTMFDecoder en un pool de procesos y escribe un CSV con una
+# fila por archivo. Al final reporta archivos/s, segundos de audio por
+# segundo y la utilización de cada proceso.
+
+import argparse
+import csv
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from tools.dtmf import DTMFDecoder, keys_from_events
+from tools.goertzel import read_wav_adc, FS
+
+CAMPOS = ('archivo', 'teclas', 'inicios_s', 'duracion_s', 'error')
+
+
+def find_wavs(directorio):
+    """Rutas de todos los .wav bajo directorio, en orden alfabético."""
+    rutas = []
+    for raiz, _, archivos in os.walk(directorio):
+        rutas += [os.path.join(raiz, a) for a in archivos if a.lower().endswith('.wav')]
+    return sorted(rutas)
+
+
+def decode_file(ruta, opciones=None):
+    """
+    Decodifica un archivo WAV completo.
+
+    Parámetros:
+    ruta (str): Archivo WAV mono a 8 kHz.
+    opciones (dict): Argumentos extra para DTMFDecoder.
+
+    Retorna:
+    dict: Fila del CSV más 'pid' y 'ocupado_s' (tiempo de cómputo).
+    """
+    t0 = time.perf_counter()
+    fila = {'archivo': ruta, 'teclas': '', 'inicios_s': '', 'duracion_s': 0.0, 'error': ''}
+    try:
+        fs, x = read_wav_adc(ruta)
+        fila['duracion_s'] = len(x) / fs
+        if fs != FS:
+            raise ValueError(f"fs = {fs} Hz; el detector trabaja a {FS} Hz")
+        decoder = DTMFDecoder(fs=fs, **(opciones or {}))
+        eventos = decoder.process(x) + decoder.flush()
+        presiones = [ev for ev in eventos if ev.kind == 'press']
+        fila['teclas'] = keys_from_events(presiones)
+        fila['inicios_s'] = ' '.join(f"{ev.time:.3f}" for ev in presiones)
+    except Exception as e:  # un archivo dañado no detiene el corpus
+        fila['error'] = f"{type(e).__name__}: {e}"
+    fila['pid'] = os.getpid()
+    fila['ocupado_s'] = time.perf_counter() - t0
+    return fila
+
+
+def decode_corpus(rutas, workers=None, opciones=None, chunksize=None):
+    """
+    Decodifica una lista de archivos en un pool de procesos.
+
+    Con chunksize None se reparten ~4 tareas por proceso, para que los
+    corpus pequeños también usen todos los procesos.
+
+    Retorna:
+    tuple: (filas en el orden de rutas, tiempo total en segundos).
+    """
+    t0 = time.perf_counter()
+    if workers == 1:
+        filas = [decode_file(r, opciones) for r in rutas]
+    else:
+        if chunksize is None:
+            chunksize = max(1, len(rutas) // (4 * (workers or os.cpu_count() or 1)))
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            filas = list(pool.map(decode_file, rutas, [opciones] * len(rutas), chunksize=chunksize))
+    return filas, time.perf_counter() - t0
+
+
+def write_csv(filas, salida):
+    """Escribe una fila por archivo con las columnas de CAMPOS."""
+    with open(salida, 'w', newline='', encoding='utf-8') as f:
+        escritor = csv.DictWriter(f, fieldnames=CAMPOS, extrasaction='ignore')
+        escritor.writeheader()
+        for fila in filas:
+            escritor.writerow(dict(fila, duracion_s=f"{fila['duracion_s']:.3f}"))
+
+
+def report(filas, t_total):
+    """Imprime el rendimiento global y la utilización de cada proceso."""
+    audio = sum(f['duracion_s'] for f in filas)
+    errores = sum(1 for f in filas if f['error'])
+    print(f"\n{len(filas)} archivos ({errores} con error), {audio:.1f} s de audio en {t_total:.2f} s")
+    print(f"  {len(filas) / t_total:10.1f} archivos/s")
+    print(f"  {audio / t_total:10.1f} s de audio por segundo ({audio / t_total:.0f}x tiempo real)")
+
+    ocupado = {}
+    for f in filas:
+        n, t = ocupado.get(f['pid'], (0, 0.0))
+        ocupado[f['pid']] = (n + 1, t + f['ocupado_s'])
+    print("\nProceso   archivos   ocupado (s)   utilización")
+    for pid, (n, t) in sorted(ocupado.items()):
+        print(f"{pid:7d} {n:10d} {t:13.2f} {100 * t / t_total:12.1f}%")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Decodifica DTMF en todos los WAV de un directorio.")
+    parser.add_argument('directorio', help="Directorio con archivos .wav (se recorre recursivamente)")
+    parser.add_argument('-o', '--salida', default='dtmf_corpus.csv', help="CSV de resultados")
+    parser.add_argument('-j', '--workers', type=int, default=None,
+                        help="Procesos del pool (por defecto, todos los núcleos; 1 = sin pool)")
+    parser.add_argument('--chunksize', type=int, default=None,
+                        help="Archivos por tarea del pool (por defecto ~4 tareas por proceso)")
+    parser.add_argument('--threshold', type=float, default=None, help="Umbral de energía del detector")
+    args = parser.parse_args()
+
+    rutas = find_wavs(args.directorio)
+    if not rutas:
+        parser.error(f"No hay archivos .wav en {args.directorio}")
+
+    opciones = {} if args.threshold is None else {'threshold': args.threshold}
+    filas, t_total = decode_corpus(rutas, args.workers, opciones, args.chunksize)
+    write_csv(filas, args.salida)
+    print(f"Resultados en {args.salida}")
+    report(filas, t_total)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,350 @@
+# Generador de corpus DTMF sintéticos para pruebas de estrés
+# Autor: Adrián Silva Palafox
+#
+# Uso (desde la raíz del repositorio):
+#   python -m tools.dtmf_synth corpus/ --files 200 --duration 30 --snr 5 30 --seed 1
+#
+# Cada archivo es una secuencia aleatoria de teclas con duraciones de tono
+# y pausa variables, twist, desviación de frecuencia, ruido blanco con una
+# SNR objetivo y recorte. Primero se arma la "agenda" de segmentos (unos
+# pocos números por tecla) y después el audio se genera por trozos de
+# chunk_size muestras directamente al WAV, así que un corpus de varias
+# horas no se guarda completo en memoria.
+#
+# Por cada WAV se escribe un CSV con las etiquetas (inicio, fin, tecla,
+# frecuencias, twist y si es decodificable) y en el directorio un
+# manifiesto con la secuencia esperada de cada archivo.
+#
+# Tonos y pausas duran al menos MIN_SEGMENT_MS (70 ms), por encima del
+# antirrebote de DTMFDecoder por defecto (2 bloques de 32 ms = 64 ms); es
+# la separación usual entre detectar (>= 40 ms, ITU-T Q.24) y aceptar una
+# tecla (65-70 ms). Aun así, la desviación de frecuencia y el twist se
+# sortean hasta el borde de lo que el decodificador acepta, así que algunas
+# teclas del corpus no pasan sus pruebas ni en la señal limpia. Por eso cada
+# etiqueta lleva 'decodificable': si DTMFDecoder por defecto la detecta en
+# la señal sin ruido. El manifiesto guarda también la secuencia de las
+# teclas decodificables, que es la referencia para medir el ruido.
+
+import argparse
+import csv
+import os
+import time
+import wave
+
+import numpy as np
+
+from tools.dtmf import DTMFDecoder
+from tools.goertzel import DTMF_LOW, DTMF_HIGH, DTMF_KEYS, FS, to_adc_counts
+
+TECLAS = ''.join(DTMF_KEYS)
+CHUNK_SIZE = 1 << 16  # muestras por trozo al escribir
+MIN_SEGMENT_MS = 70  # duración mínima de tonos y pausas (> antirrebote de 64 ms)
+TOLERANCIA_S = 0.04  # margen al emparejar una detección con su etiqueta
+
+
+def key_frequencies(keys):
+    """
+    Frecuencias (baja, alta) de cada tecla.
+
+    Retorna:
+    tuple: (f_baja, f_alta) como arreglos.
+    """
+    indices = np.array([TECLAS.index(k) for k in keys], dtype=int)
+    if len(indices) == 0:
+        return np.zeros(0), np.zeros(0)
+    return np.asarray(DTMF_LOW, dtype=float)[indices // 4], np.asarray(DTMF_HIGH, dtype=float)[indices % 4]
+
+
+def _amplitudes(nivel, twist_db):
+    """Amplitud de cada tono para un nivel medio y twist = 20·log10(a_baja/a_alta)."""
+    factor = 10 ** (np.asarray(twist_db, dtype=float) / 40)
+    return nivel * factor, nivel / factor
+
+
+def make_schedule(rng, duration_s, fs=FS, tone_ms=(MIN_SEGMENT_MS, 200), pause_ms=(MIN_SEGMENT_MS, 200),
+                  twist_db=(-4.0, 8.0), offset_pct=1.5, level_dbfs=(-12.0, -3.0)):
+    """
+    Agenda aleatoria de teclas que llena duration_s segundos.
+
+    Parámetros:
+    rng (np.random.Generator): Generador de números aleatorios.
+    duration_s (float): Duración total del archivo.
+    fs (float): Frecuencia de muestreo (Hz).
+    tone_ms, pause_ms (tuple): Rango (mín, máx) de la duración de tonos y
+        pausas. Con mínimos por debajo de MIN_SEGMENT_MS el decodificador
+        por defecto pierde teclas por antirrebote.
+    twist_db (tuple): Rango del twist, 20·log10(a_baja/a_alta).
+    offset_pct (float): Desviación máxima de cada frecuencia (± %).
+    level_dbfs (tuple): Rango del nivel de pico de cada tono (dBFS).
+
+    Retorna:
+    dict: Arreglos por tecla ('key', 'start', 'length', 'f_low', 'f_high',
+    'a_low', 'a_high', 'twist_db') y 'n_samples' del archivo.
+    """
+    total = int(round(duration_s * fs))
+
+    # Se sortean más teclas de las necesarias y se recortan las que no caben
+    media = (np.mean(tone_ms) + np.mean(pause_ms)) / 1000 * fs
+    n = int(total / media * 1.5) + 2
+    tonos = np.round(rng.uniform(*tone_ms, n) / 1000 * fs).astype(int)
+    pausas = np.round(rng.uniform(*pause_ms, n) / 1000 * fs).astype(int)
+    inicios = np.cumsum(pausas) + np.concatenate(([0], np.cumsum(tonos)[:-1]))
+    caben = inicios + tonos <= total
+    tonos, inicios = tonos[caben], inicios[caben]
+    n = len(inicios)
+
+    teclas = rng.choice(list(TECLAS), n)
+    f_baja, f_alta = key_frequencies(teclas)
+    desvio = 1 + rng.uniform(-offset_pct, offset_pct, (2, n)) / 100
+    twist = rng.uniform(*twist_db, n)
+    # El pico de la suma es a_baja + a_alta; el nivel reparte ese pico
+    nivel = 10 ** (rng.uniform(*level_dbfs, n) / 20) / 2
+    a_baja, a_alta = _amplitudes(nivel, twist)
+
+    return {
+        'key': teclas, 'start': inicios, 'length': tonos,
+        'f_low': f_baja * desvio[0], 'f_high': f_alta * desvio[1],
+        'a_low': a_baja, 'a_high': a_alta, 'twist_db': twist,
+        'n_samples': total,
+    }
+
+
+def render(schedule, inicio, fin, fs=FS):
+    """
+    Señal limpia de la agenda en las muestras [inicio, fin).
+
+    Cada tono arranca con fase cero en su primera muestra, así que un
+    trozo se puede generar sin conocer los anteriores.
+    """
+    y = np.zeros(fin - inicio)
+    arranques = schedule['start']
+    finales = arranques + schedule['length']
+    i0 = np.searchsorted(finales, inicio, side='right')
+    i1 = np.searchsorted(arranques, fin, side='left')
+    if i0 >= i1:
+        return y
+
+    seg = np.arange(i0, i1)
+    desde = np.maximum(arranques[seg], inicio)
+    hasta = np.minimum(finales[seg], fin)
+    largos = hasta - desde
+
+    # Índices absolutos de todas las muestras con tono, sin ciclo por tecla
+    cuenta = np.repeat(seg, largos)
+    n = np.arange(largos.sum()) - np.repeat(np.cumsum(largos) - largos, largos) + np.repeat(desde, largos)
+    t = (n - arranques[cuenta]) / fs
+    y[n - inicio] = (schedule['a_low'][cuenta] * np.sin(2 * np.pi * schedule['f_low'][cuenta] * t)
+                     + schedule['a_high'][cuenta] * np.sin(2 * np.pi * schedule['f_high'][cuenta] * t))
+    return y
+
+
+def tone_power(schedule):
+    """Potencia media de la señal durante los tonos (para fijar la SNR)."""
+    if len(schedule['length']) == 0:
+        return 0.0
+    potencia = (schedule['a_low'] ** 2 + schedule['a_high'] ** 2) / 2
+    return float(np.average(potencia, weights=schedule['length']))
+
+
+def iter_signal(schedule, rng, snr_db=None, clip=1.0, chunk_size=CHUNK_SIZE, fs=FS):
+    """
+    Genera la señal de la agenda por trozos.
+
+    Parámetros:
+    schedule (dict): Agenda de make_schedule().
+    rng (np.random.Generator): Generador para el ruido.
+    snr_db (float): SNR objetivo respecto a la potencia de los tonos
+        (None = sin ruido).
+    clip (float): Nivel de recorte como fracción de la escala completa.
+    chunk_size (int): Muestras por trozo.
+
+    Produce:
+    np.ndarray: Trozos flotantes en [-clip, clip].
+    """
+    sigma = 0.0
+    if snr_db is not None:
+        sigma = np.sqrt(tone_power(schedule) / 10 ** (snr_db / 10))
+    for inicio in range(0, schedule['n_samples'], chunk_size):
+        fin = min(inicio + chunk_size, schedule['n_samples'])
+        y = render(schedule, inicio, fin, fs)
+        if sigma > 0:
+            y += rng.normal(0.0, sigma, len(y))
+        yield np.clip(y, -clip, clip)
+
+
+def tone_schedule(keys, tone_s, pause_s=0.0, fs=FS, amplitude=0.5, twist_db=0.0):
+    """
+    Agenda determinista: cada tecla dura tone_s y la sigue una pausa de
+    pause_s. Mismo formato que make_schedule().
+
+    Parámetros:
+    keys (str): Teclas en orden.
+    tone_s, pause_s (float): Duración de cada tono y de la pausa que lo sigue.
+    fs (float): Frecuencia de muestreo (Hz).
+    amplitude (float): Amplitud de cada senoidal con twist de 0 dB.
+    twist_db (float): 20·log10(a_baja/a_alta).
+    """
+    n_tono, n_pausa = int(fs * tone_s), int(round(fs * pause_s))
+    n = len(keys)
+    f_baja, f_alta = key_frequencies(keys)
+    a_baja, a_alta = _amplitudes(amplitude, np.full(n, twist_db))
+    return {
+        'key': np.array(list(keys)), 'start': np.arange(n) * (n_tono + n_pausa),
+        'length': np.full(n, n_tono), 'f_low': f_baja, 'f_high': f_alta,
+        'a_low': a_baja, 'a_high': a_alta, 'twist_db': np.full(n, twist_db),
+        'n_samples': n * (n_tono + n_pausa),
+    }
+
+
+def dtmf_tones(keys, tone_s, pause_s=0.0, fs=FS, amplitude=0.5, twist_db=0.0):
+    """
+    Secuencia DTMF determinista en un solo arreglo (sin ruido). Los
+    parámetros son los de tone_schedule().
+
+    Retorna:
+    np.ndarray: Señal flotante.
+    """
+    schedule = tone_schedule(keys, tone_s, pause_s, fs, amplitude, twist_db)
+    return render(schedule, 0, schedule['n_samples'], fs)
+
+
+def decodable_keys(schedule, fs=FS, chunk_size=CHUNK_SIZE, **opciones):
+    """
+    Teclas que DTMFDecoder detecta en la señal limpia (sin ruido ni
+    recorte) de la agenda.
+
+    Parámetros:
+    schedule (dict): Agenda de make_schedule().
+    opciones: Argumentos de DTMFDecoder (por defecto, los del firmware).
+
+    Retorna:
+    np.ndarray: Booleano por tecla: hay un 'press' de la misma tecla entre
+    su inicio y su fin (± TOLERANCIA_S).
+    """
+    decoder = DTMFDecoder(fs=fs, **opciones)
+    eventos = []
+    for inicio in range(0, schedule['n_samples'], chunk_size):
+        fin = min(inicio + chunk_size, schedule['n_samples'])
+        eventos += decoder.process(to_adc_counts(render(schedule, inicio, fin, fs)))
+    eventos += decoder.flush()
+
+    desde = schedule['start'] / fs - TOLERANCIA_S
+    hasta = (schedule['start'] + schedule['length']) / fs + TOLERANCIA_S
+    detectada = np.zeros(len(desde), dtype=bool)
+    for ev in eventos:
+        if ev.kind != 'press':
+            continue
+        candidatas = np.flatnonzero((schedule['key'] == ev.key) & (desde <= ev.time)
+                                    & (ev.time <= hasta) & ~detectada)
+        if len(candidatas):
+            detectada[candidatas[0]] = True
+    return detectada
+
+
+def write_labels(schedule, ruta, fs=FS):
+    """CSV de etiquetas: una fila por tecla."""
+    decodificable = schedule.get('decodable')
+    with open(ruta, 'w', newline='', encoding='utf-8') as f:
+        escritor = csv.writer(f)
+        escritor.writerow(('inicio_s', 'fin_s', 'tecla', 'f_baja_hz', 'f_alta_hz', 'twist_db',
+                           'decodificable'))
+        for i in range(len(schedule['key'])):
+            inicio = schedule['start'][i]
+            escritor.writerow((f"{inicio / fs:.4f}", f"{(inicio + schedule['length'][i]) / fs:.4f}",
+                               schedule['key'][i], f"{schedule['f_low'][i]:.2f}",
+                               f"{schedule['f_high'][i]:.2f}", f"{schedule['twist_db'][i]:.2f}",
+                               '' if decodificable is None else int(decodificable[i])))
+
+
+def write_wav(ruta, trozos, fs=FS):
+    """
+    Escribe trozos flotantes en [-1, 1] como WAV int16 mono.
+
+    Retorna:
+    int: Muestras recortadas a escala completa.
+    """
+    recortadas = 0
+    with wave.open(ruta, 'wb') as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(int(fs))
+        for y in trozos:
+            y = np.round(y * 32767)
+            recortadas += int(np.count_nonzero(np.abs(y) >= 32767))
+            wav.writeframes(np.clip(y, -32768, 32767).astype('<i2').tobytes())
+    return recortadas
+
+
+def write_corpus(directorio, n_files, duration_s, seed=None, snr_db=(10.0, 40.0), clip=1.0,
+                 chunk_size=CHUNK_SIZE, fs=FS, **opciones):
+    """
+    Genera n_files archivos WAV con sus etiquetas y un manifiesto.
+
+    Parámetros:
+    directorio (str): Carpeta de salida (se crea si no existe).
+    n_files (int): Número de archivos.
+    duration_s (float): Duración de cada archivo.
+    seed (int): Semilla; la misma semilla reproduce el mismo corpus.
+    snr_db (tuple): Rango de la SNR de cada archivo (None = sin ruido).
+    clip (float): Nivel de recorte como fracción de la escala completa.
+    opciones: Argumentos de make_schedule() (tone_ms, pause_ms, twist_db,
+        offset_pct, level_dbfs).
+
+    Retorna:
+    str: Ruta del manifiesto.
+    """
+    os.makedirs(directorio, exist_ok=True)
+    rng = np.random.default_rng(seed)
+    manifiesto = os.path.join(directorio, 'manifiesto.csv')
+    with open(manifiesto, 'w', newline='', encoding='utf-8') as f:
+        escritor = csv.writer(f)
+        escritor.writerow(('archivo', 'teclas', 'teclas_decodificables', 'duracion_s', 'snr_db',
+                           'muestras_recortadas'))
+        for i in range(n_files):
+            schedule = make_schedule(rng, duration_s, fs, **opciones)
+            schedule['decodable'] = decodable_keys(schedule, fs, chunk_size)
+            snr = None if snr_db is None else float(rng.uniform(*snr_db))
+            nombre = f"dtmf_{i:05d}"
+            recortadas = write_wav(os.path.join(directorio, nombre + '.wav'),
+                                   iter_signal(schedule, rng, snr, clip, chunk_size, fs), fs)
+            write_labels(schedule, os.path.join(directorio, nombre + '.csv'), fs)
+            escritor.writerow((nombre + '.wav', ''.join(schedule['key']),
+                               ''.join(schedule['key'][schedule['decodable']]), f"{duration_s:.3f}",
+                               '' if snr is None else f"{snr:.1f}", recortadas))
+    return manifiesto
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Genera un corpus DTMF sintético con etiquetas.")
+    parser.add_argument('directorio', help="Carpeta de salida")
+    parser.add_argument('--files', type=int, default=100, help="Número de archivos")
+    parser.add_argument('--duration', type=float, default=10.0, help="Duración de cada archivo (s)")
+    parser.add_argument('--seed', type=int, default=None, help="Semilla")
+    parser.add_argument('--snr', type=float, nargs=2, default=(10.0, 40.0), metavar=('MIN', 'MAX'),
+                        help="Rango de SNR en dB")
+    parser.add_argument('--clean', action='store_true', help="Sin ruido")
+    parser.add_argument('--twist', type=float, nargs=2, default=(-4.0, 8.0), metavar=('MIN', 'MAX'),
+                        help="Rango de twist en dB (tono bajo sobre tono alto)")
+    parser.add_argument('--tone-ms', type=float, nargs=2, default=(MIN_SEGMENT_MS, 200), metavar=('MIN', 'MAX'))
+    parser.add_argument('--pause-ms', type=float, nargs=2, default=(MIN_SEGMENT_MS, 200), metavar=('MIN', 'MAX'))
+    parser.add_argument('--offset-pct', type=float, default=1.5, help="Desviación de frecuencia (± %%)")
+    parser.add_argument('--level', type=float, nargs=2, default=(-12.0, -3.0), metavar=('MIN', 'MAX'),
+                        help="Rango del nivel de pico en dBFS")
+    parser.add_argument('--clip', type=float, default=1.0,
+                        help="Nivel de recorte (fracción de la escala completa)")
+    args = parser.parse_args()
+
+    t0 = time.perf_counter()
+    manifiesto = write_corpus(args.directorio, args.files, args.duration, args.seed,
+                              None if args.clean else tuple(args.snr), args.clip,
+                              tone_ms=tuple(args.tone_ms), pause_ms=tuple(args.pause_ms),
+                              twist_db=tuple(args.twist), offset_pct=args.offset_pct,
+                              level_dbfs=tuple(args.level))
+    t = time.perf_counter() - t0
+    audio = args.files * args.duration
+    print(f"{args.files} archivos ({audio:.0f} s de audio) en {t:.2f} s ({audio / t:.0f}x tiempo real)")
+    print(f"Manifiesto: {manifiesto}")
+
+
+if __name__ == "__main__":
+    main()
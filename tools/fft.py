@@ -0,0 +1,566 @@
+# Transformada rápida de Fourier (FFT)
+# Autor: Adrián Silva Palafox
+#
+# Implementación propia de la FFT en NumPy, vectorizada sobre todas las filas:
+# - Radix-2 iterativa (Cooley-Tukey con permutación bit-reversa) para N = 2^k.
+# - Mixed-radix (Cooley-Tukey con factores primos pequeños) para N compuesto.
+# - Bluestein (chirp-z) cuando N tiene un factor primo mayor que _RADIX_MAX.
+#
+# Todo lo que depende solo de (N, dtype) -factores de giro, permutación
+# bit-reversa, chirps de Bluestein- se precalcula en un FFTPlan. Los planes se
+# guardan en un caché LRU acotado que fft() e ifft() consultan solos.
+
+import functools
+import time
+import numpy as np
+
+# Mayor factor primo que se resuelve con una DFT directa de r puntos
+_RADIX_MAX = 16
+
+# Número máximo de planes en el caché (ver set_plan_cache_size)
+PLAN_CACHE_SIZE = 32
+
+
+def _es_potencia_de_2(n):
+    return n > 0 and n & (n - 1) == 0
+
+
+def _next_pow2(n):
+    return 1 << (int(n) - 1).bit_length()
+
+
+def _factorizar(n):
+    """
+    Factores primos de n (los pares de 2 se agrupan en 4).
+
+    Retorna None si n tiene un factor primo mayor que _RADIX_MAX.
+    """
+    factores = []
+    while n % 4 == 0:
+        factores.append(4)
+        n //= 4
+    p = 2
+    while n > 1:
+        if p > _RADIX_MAX:
+            return None
+        while n % p == 0:
+            factores.append(p)
+            n //= p
+        p += 1
+    return factores
+
+
+def _bit_reversa(n):
+    """Permutación bit-reversa de los índices 0..n-1 (n potencia de 2)."""
+    bits = n.bit_length() - 1
+    idx = np.arange(n)
+    rev = np.zeros(n, dtype=np.intp)
+    for _ in range(bits):
+        rev = (rev << 1) | (idx & 1)
+        idx >>= 1
+    return rev
+
+
+class FFTPlan:
+    """
+    Plan precalculado para FFTs de n puntos con un tipo complejo dado.
+
+    Atributos:
+    n (int): Número de puntos.
+    dtype (np.dtype): complex64 o complex128.
+    algoritmo (str): 'trivial', 'radix-2', 'mixed-radix' o 'bluestein'.
+    """
+
+    def __init__(self, n, dtype=np.complex128):
+        self.n = int(n)
+        self.dtype = np.dtype(dtype)
+        if self.n < 1:
+            raise ValueError(f"Número de puntos no válido: {n}")
+
+        if self.n == 1:
+            self.algoritmo = 'trivial'
+        elif _es_potencia_de_2(self.n):
+            self.algoritmo = 'radix-2'
+            self._preparar_radix2()
+        else:
+            factores = _factorizar(self.n)
+            if factores is not None:
+                self.algoritmo = 'mixed-radix'
+                self._preparar_mixed_radix(factores)
+            else:
+                self.algoritmo = 'bluestein'
+                self._preparar_bluestein()
+
+    def __repr__(self):
+        return f"FFTPlan(n={self.n}, dtype={self.dtype}, algoritmo='{self.algoritmo}')"
+
+    # --- Precálculo -----------------------------------------------------
+
+    def _preparar_radix2(self):
+        self.permutacion = _bit_reversa(self.n)
+        # Un vector de giros por etapa: exp(-j*pi*k/h), k < h
+        self.giros = []
+        h = 1
+        while h < self.n:
+            self.giros.append(np.exp(-1j * np.pi * np.arange(h) / h).astype(self.dtype))
+            h *= 2
+
+    def _preparar_mixed_radix(self, factores):
+        self.factores = factores
+        self.matrices = {}
+        self.giros = []
+        n_actual = self.n
+        for r in factores:
+            if r not in self.matrices and r != 2:
+                k = np.arange(r)
+                self.matrices[r] = np.exp(-2j * np.pi * np.outer(k, k) / r).astype(self.dtype)
+            m = n_actual // r
+            giro = np.exp(-2j * np.pi * np.outer(np.arange(r), np.arange(m)) / n_actual)
+            self.giros.append(giro.astype(self.dtype))
+            n_actual = m
+
+    def _preparar_bluestein(self):
+        n = self.n
+        self.m = _next_pow2(2 * n - 1)
+        self.plan_m = get_plan(self.m, self.dtype)
+
+        # k^2 mod 2n evita perder precisión en la fase para n grande
+        k = np.arange(n)
+        self.chirp = np.exp(-1j * np.pi * ((k * k) % (2 * n)) / n).astype(self.dtype)
+
+        b = np.zeros(self.m, dtype=self.dtype)
+        b[:n] = np.conj(self.chirp)
+        b[self.m - n + 1:] = np.conj(self.chirp[1:])[::-1]
+        self.espectro_chirp = self.plan_m.execute(b)
+
+    # --- Ejecución ------------------------------------------------------
+
+    def _radix2(self, a, out=None):
+        lote = a.shape[:-1]
+        if out is not None and out.flags.c_contiguous:
+            # Las mariposas se hacen directamente sobre el buffer del usuario
+            a = np.take(a, self.permutacion, axis=-1, out=out)
+        else:
+            a = a[..., self.permutacion]
+
+        # Mariposas: en cada etapa se combinan DFTs de h puntos en DFTs de 2h
+        for w in self.giros:
+            h = len(w)
+            etapa = a.reshape(lote + (self.n // (2 * h), 2, h))
+            t = etapa[..., 1, :] * w
+            etapa[..., 1, :] = etapa[..., 0, :] - t
+            etapa[..., 0, :] += t
+        return a
+
+    def _mixed_radix(self, a):
+        """
+        Con n = r*m, la entrada se ve como una matriz (r, m) con x[m*n1 + n2];
+        se aplica una DFT de r puntos sobre n1, los factores de giro
+        W_n^(k1*n2) y una FFT de m puntos sobre n2. X[k1 + r*k2] queda en la
+        posición (k1, k2), por lo que al final basta una transposición.
+        """
+        lote = a.shape[:-1]
+        a = a.reshape(-1, self.n)
+
+        for r, giro in zip(self.factores, self.giros):
+            m = giro.shape[1]
+            a = a.reshape(-1, r, m)
+            if r == 2:
+                a = np.stack((a[:, 0] + a[:, 1], a[:, 0] - a[:, 1]), axis=1)
+            else:
+                a = np.matmul(self.matrices[r], a)
+            a = (a * giro).reshape(-1, m)
+
+        L = len(self.factores)
+        a = a.reshape((-1,) + tuple(self.factores))
+        a = a.transpose((0,) + tuple(range(L, 0, -1)))
+        return a.reshape(lote + (self.n,))
+
+    def _bluestein(self, a):
+        """
+        La DFT se reescribe como una convolución con un chirp, que se calcula
+        con FFTs radix-2 de longitud m >= 2n-1.
+        """
+        A = np.zeros(a.shape[:-1] + (self.m,), dtype=self.dtype)
+        A[..., :self.n] = a * self.chirp
+        conv = self.plan_m.inverse(self.plan_m.execute(A) * self.espectro_chirp)
+        return conv[..., :self.n] * self.chirp
+
+    def execute(self, a, out=None):
+        """
+        FFT sobre el último eje de a (longitud n, tipo self.dtype).
+
+        Parámetros:
+        a (np.ndarray): Entrada; no se modifica.
+        out (np.ndarray): Buffer opcional para el resultado, misma forma y
+            tipo que a.
+
+        Retorna:
+        np.ndarray: El espectro (out si se proporcionó).
+        """
+        if self.algoritmo == 'radix-2':
+            X = self._radix2(a, out)
+        elif self.algoritmo == 'mixed-radix':
+            X = self._mixed_radix(a)
+        elif self.algoritmo == 'bluestein':
+            X = self._bluestein(a)
+        else:
+            X = a.copy() if out is None else a
+
+        if out is not None and X is not out:
+            out[...] = X
+            return out
+        return X
+
+    def inverse(self, X, out=None):
+        """
+        FFT inversa sobre el último eje: conj(FFT(conj(X))) / n.
+
+        Parámetros y retorno como en execute().
+        """
+        x = self.execute(np.conj(X), out)
+        np.conjugate(x, out=x)
+        x /= self.n
+        return x
+
+
+class RealFFTPlan:
+    """
+    Plan para la FFT de señales reales de n puntos: solo se calculan los
+    n//2 + 1 bins de frecuencia no negativa.
+
+    Para n par, las muestras pares e impares se empacan en una señal compleja
+    z[m] = x[2m] + j*x[2m+1] de n/2 puntos; una sola FFT de n/2 puntos y un
+    paso de separación con los giros exp(-j*2*pi*k/n) dan el medio espectro.
+    Para n impar se usa la FFT compleja completa.
+
+    Atributos:
+    n (int): Número de puntos de la señal real.
+    dtype (np.dtype): Tipo complejo del espectro (complex64 o complex128).
+    """
+
+    def __init__(self, n, dtype=np.complex128):
+        self.n = int(n)
+        self.dtype = np.dtype(dtype)
+        if self.n < 1:
+            raise ValueError(f"Número de puntos no válido: {n}")
+
+        self.n_bins = self.n // 2 + 1
+        self.empacado = self.n % 2 == 0
+        if self.empacado:
+            h = self.n // 2
+            self.plan_medio = get_plan(h, self.dtype)
+            k = np.arange(h + 1)
+            self.giro = np.exp(-2j * np.pi * k / self.n).astype(self.dtype)
+            self.indice = k % h            # Z[k], con Z[h] = Z[0]
+            self.indice_espejo = (-k) % h  # Z[h-k]
+        else:
+            self.plan_completo = get_plan(self.n, self.dtype)
+
+    def __repr__(self):
+        return f"RealFFTPlan(n={self.n}, dtype={self.dtype})"
+
+    def execute(self, a, out=None):
+        """
+        Medio espectro de a (reales, último eje de longitud n).
+
+        Parámetros:
+        a (np.ndarray): Entrada real; no se modifica.
+        out (np.ndarray): Buffer opcional para los n//2 + 1 bins.
+
+        Retorna:
+        np.ndarray: n//2 + 1 bins complejos (out si se proporcionó).
+        """
+        if not self.empacado:
+            X = self.plan_completo.execute(a.astype(self.dtype))[..., :self.n_bins]
+            if out is None:
+                return X
+            out[...] = X
+            return out
+
+        z = np.empty(a.shape[:-1] + (self.n // 2,), dtype=self.dtype)
+        z.real = a[..., 0::2]
+        z.imag = a[..., 1::2]
+        Z = self.plan_medio.execute(z)
+
+        Zk = Z[..., self.indice]
+        Zc = np.conj(Z[..., self.indice_espejo])
+        pares = (Zk + Zc) / 2
+        impares = (Zk - Zc) / 2j
+        return np.add(pares, self.giro * impares, out=out)
+
+    def inverse(self, X, out=None):
+        """
+        Señal real de n puntos a partir de sus n//2 + 1 bins.
+
+        Parámetros:
+        X (np.ndarray): Medio espectro; no se modifica.
+        out (np.ndarray): Buffer real opcional de n muestras.
+
+        Retorna:
+        np.ndarray: Señal real, float32 o float64 según dtype (out si se
+        proporcionó).
+        """
+        real = np.float32 if self.dtype == np.complex64 else np.float64
+
+        # En una señal real X[0] (y X[n/2] si n es par) son reales; como en
+        # NumPy, se descarta su parte imaginaria.
+        X = X.copy()
+        X[..., 0] = X[..., 0].real
+        if self.empacado:
+            X[..., self.n // 2] = X[..., self.n // 2].real
+
+        if not self.empacado:
+            completo = np.zeros(X.shape[:-1] + (self.n,), dtype=self.dtype)
+            completo[..., :self.n_bins] = X
+            completo[..., self.n_bins:] = np.conj(X[..., self.n - self.n_bins:0:-1])
+            x = self.plan_completo.inverse(completo).real
+            if out is None:
+                return x.astype(real)
+            out[...] = x
+            return out
+
+        h = self.n // 2
+        Xk = X[..., :h]
+        Xm = np.conj(X[..., h:0:-1])
+        pares = (Xk + Xm) / 2
+        impares = (Xk - Xm) / 2 * np.conj(self.giro[:h])
+        Z = pares + 1j * impares
+        z = self.plan_medio.inverse(Z)
+
+        x = np.empty(X.shape[:-1] + (self.n,), dtype=real) if out is None else out
+        x[..., 0::2] = z.real
+        x[..., 1::2] = z.imag
+        return x
+
+
+def _crear_plan(n, dtype, real):
+    if real:
+        return RealFFTPlan(n, dtype)
+    return FFTPlan(n, dtype)
+
+
+_plan_cacheado = functools.lru_cache(maxsize=PLAN_CACHE_SIZE)(_crear_plan)
+
+
+def get_plan(n, dtype=np.complex128, real=False):
+    """
+    Plan para n puntos y tipo dtype, desde el caché LRU si ya existe.
+
+    Parámetros:
+    n (int): Número de puntos.
+    dtype: np.complex64 o np.complex128.
+    real (bool): True para un RealFFTPlan (entrada real, medio espectro).
+
+    Retorna:
+    FFTPlan o RealFFTPlan: Plan listo para execute().
+    """
+    return _plan_cacheado(int(n), np.dtype(dtype), bool(real))
+
+
+def plan_cache_info():
+    """
+    Estadísticas del caché de planes.
+
+    Retorna:
+    namedtuple: (hits, misses, maxsize, currsize), como functools.lru_cache.
+    """
+    return _plan_cacheado.cache_info()
+
+
+def clear_plan_cache():
+    """Elimina todos los planes y reinicia los contadores."""
+    _plan_cacheado.cache_clear()
+
+
+def set_plan_cache_size(maxsize):
+    """
+    Cambia el número máximo de planes en el caché (vacía el caché actual).
+
+    Parámetros:
+    maxsize (int): Número de planes; None para un caché sin límite.
+    """
+    global _plan_cacheado
+    _plan_cacheado = functools.lru_cache(maxsize=maxsize)(_crear_plan)
+
+
+def _tipo_complejo(a):
+    """complex64 para entradas de precisión simple, complex128 en otro caso."""
+    if a.dtype in (np.float32, np.complex64, np.float16):
+        return np.dtype(np.complex64)
+    return np.dtype(np.complex128)
+
+
+def _ajustar(a, n, dtype):
+    """Copia a con tipo dtype y el último eje rellenado o recortado a n."""
+    if a.shape[-1] == n:
+        return a.astype(dtype, copy=True)
+    salida = np.zeros(a.shape[:-1] + (n,), dtype=dtype)
+    m = min(n, a.shape[-1])
+    salida[..., :m] = a[..., :m]
+    return salida
+
+
+def _preparar(x, n, axis):
+    """
+    Convierte a complejo, mueve el eje a transformar al final y lo ajusta
+    (rellena o recorta) a n puntos.
+    """
+    a = np.asarray(x)
+    if a.ndim == 0:
+        raise ValueError("La entrada debe tener al menos una dimensión")
+    a = np.moveaxis(a, axis, -1)
+    dtype = _tipo_complejo(a)
+    if n is None:
+        n = a.shape[-1]
+    n = int(n)
+    if n < 1:
+        raise ValueError(f"Número de puntos no válido: {n}")
+    return _ajustar(a, n, dtype)
+
+
+def _buffer_salida(out, forma, dtype, axis):
+    """
+    Valida el buffer del usuario y retorna una vista con el eje transformado
+    al final (o None si no hay buffer).
+    """
+    if out is None:
+        return None
+    if not isinstance(out, np.ndarray):
+        raise TypeError("out debe ser un np.ndarray")
+    vista = np.moveaxis(out, axis, -1)
+    if vista.shape != forma:
+        raise ValueError(f"out tiene forma {out.shape}; se esperaba {np.moveaxis(np.empty(forma), -1, axis).shape}")
+    if vista.dtype != dtype:
+        raise ValueError(f"out debe ser de tipo {dtype}, no {out.dtype}")
+    return vista
+
+
+def fft(x, n=None, axis=-1, out=None):
+    """
+    Transformada rápida de Fourier.
+
+    Parámetros:
+    x (array): Señal de entrada; con N-D se transforman todas las filas
+        (o columnas) en una sola llamada.
+    n (int): Número de puntos. Si es mayor que la señal se rellena con
+        ceros; si es menor se recorta. Por defecto, la longitud de x.
+    axis (int): Eje a transformar (por defecto el último).
+    out (np.ndarray): Buffer preasignado para el resultado (complejo, con
+        la forma de la salida).
+
+    Retorna:
+    np.ndarray: Coeficientes X[k], complejos.
+    """
+    a = _preparar(x, n, axis)
+    vista = _buffer_salida(out, a.shape, a.dtype, axis)
+    X = get_plan(a.shape[-1], a.dtype).execute(a, vista)
+    return out if out is not None else np.moveaxis(X, -1, axis)
+
+
+def ifft(X, n=None, axis=-1, out=None):
+    """
+    Transformada inversa: x = conj(FFT(conj(X))) / n.
+
+    Parámetros:
+    X (array): Espectro (1-D o N-D).
+    n (int): Número de puntos (relleno o recorte como en fft).
+    axis (int): Eje a transformar (por defecto el último).
+    out (np.ndarray): Buffer preasignado para el resultado.
+
+    Retorna:
+    np.ndarray: Señal en el tiempo, compleja.
+    """
+    a = _preparar(X, n, axis)
+    vista = _buffer_salida(out, a.shape, a.dtype, axis)
+    x = get_plan(a.shape[-1], a.dtype).inverse(a, vista)
+    return out if out is not None else np.moveaxis(x, -1, axis)
+
+
+def rfft(x, n=None, axis=-1, out=None):
+    """
+    FFT de una señal real: solo los n//2 + 1 bins de frecuencia no negativa.
+
+    Parámetros:
+    x (array): Señal real (1-D o N-D).
+    n (int): Número de puntos (relleno o recorte como en fft).
+    axis (int): Eje a transformar (por defecto el último).
+    out (np.ndarray): Buffer preasignado para el medio espectro.
+
+    Retorna:
+    np.ndarray: Medio espectro complejo, n//2 + 1 bins.
+    """
+    a = np.asarray(x)
+    if a.ndim == 0:
+        raise ValueError("La entrada debe tener al menos una dimensión")
+    if np.iscomplexobj(a):
+        raise TypeError("rfft requiere una señal real; use fft para señales complejas")
+    a = np.moveaxis(a, axis, -1)
+    dtype = _tipo_complejo(a)
+    n = a.shape[-1] if n is None else int(n)
+    if n < 1:
+        raise ValueError(f"Número de puntos no válido: {n}")
+
+    real = np.float32 if dtype == np.complex64 else np.float64
+    vista = _buffer_salida(out, a.shape[:-1] + (n // 2 + 1,), dtype, axis)
+    X = get_plan(n, dtype, real=True).execute(_ajustar(a, n, real), vista)
+    return out if out is not None else np.moveaxis(X, -1, axis)
+
+
+def irfft(X, n=None, axis=-1, out=None):
+    """
+    Inversa de rfft: reconstruye la señal real a partir del medio espectro.
+
+    Parámetros:
+    X (array): Medio espectro (n//2 + 1 bins).
+    n (int): Longitud de la señal de salida. Por defecto 2*(len(X) - 1).
+    axis (int): Eje a transformar (por defecto el último).
+    out (np.ndarray): Buffer real preasignado de n muestras por fila.
+
+    Retorna:
+    np.ndarray: Señal real de n muestras.
+    """
+    A = np.asarray(X)
+    if A.ndim == 0:
+        raise ValueError("La entrada debe tener al menos una dimensión")
+    A = np.moveaxis(A, axis, -1)
+    dtype = _tipo_complejo(A)
+    n = 2 * (A.shape[-1] - 1) if n is None else int(n)
+    if n < 1:
+        raise ValueError(f"Número de puntos no válido: {n}")
+
+    real = np.float32 if dtype == np.complex64 else np.float64
+    vista = _buffer_salida(out, A.shape[:-1] + (n,), np.dtype(real), axis)
+    x = get_plan(n, dtype, real=True).inverse(_ajustar(A, n // 2 + 1, dtype), vista)
+    return out if out is not None else np.moveaxis(x, -1, axis)
+
+
+def main():
+    """Compara fft, ifft, rfft e irfft contra NumPy con longitudes de los tres algoritmos."""
+    rng = np.random.default_rng(0)
+    longitudes = [1, 2, 3, 5, 6, 8, 12, 97, 100, 360, 1000, 1024, 2048, 4099, 8000, 65536]
+
+    print(f"{'N':>7} {'algoritmo':<12} {'error máx':>10} {'1a vez':>9} {'con plan':>9} {'numpy':>9}")
+    for n in longitudes:
+        x = rng.standard_normal(n) + 1j * rng.standard_normal(n)
+
+        t0 = time.perf_counter()
+        X = fft(x)
+        t1 = time.perf_counter()
+        fft(x)
+        t2 = time.perf_counter()
+        X_ref = np.fft.fft(x)
+        t3 = time.perf_counter()
+
+        error = np.max(np.abs(X - X_ref)) / max(1.0, np.max(np.abs(X_ref)))
+        error = max(error, np.max(np.abs(ifft(X) - x)))
+        error = max(error, np.max(np.abs(rfft(x.real) - np.fft.rfft(x.real))) / max(1.0, np.max(np.abs(X_ref))))
+        error = max(error, np.max(np.abs(irfft(rfft(x.real), n) - x.real)))
+        print(f"{n:>7} {get_plan(n).algoritmo:<12} {error:>10.1e} "
+              f"{(t1 - t0) * 1e3:>7.2f}ms {(t2 - t1) * 1e3:>7.2f}ms {(t3 - t2) * 1e3:>7.2f}ms")
+
+    print("\nCaché de planes:", plan_cache_info())
+
+
+if __name__ == "__main__":
+    main()
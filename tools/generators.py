@@ -0,0 +1,299 @@
+# Generadores de señales de prueba vectorizados y por trozos
+# Autor: Adrián Silva Palafox
+#
+# Cada generador se usa de dos formas con el mismo resultado:
+#   x = MultiTone([697, 1209]).array(2.0)             # arreglo completo
+#   for trozo in MultiTone([697, 1209]).chunks(3600):  # una hora, por trozos
+#       ...
+# Las señales deterministas (tonos, barridos, AM, DTMF) se calculan a partir
+# del índice absoluto de cada muestra, así que la fase es continua entre
+# trozos y la concatenación de los trozos es idéntica al arreglo completo.
+# El ruido conserva el estado del generador aleatorio (y del filtro en el
+# ruido rosa) de un trozo al siguiente.
+#
+# Los generadores se suman con '+': MultiTone([1000]) + WhiteNoise(0.1).
+
+import numpy as np
+from scipy import signal
+
+from tools.dtmf_synth import dtmf_tones, render, tone_schedule
+from tools.goertzel import FS
+
+CHUNK_SIZE = 1 << 16  # muestras por trozo por defecto
+
+# Filtro 1/f de ruido rosa (Kellet), error < 0.05 dB de 0.0009·fs a 0.45·fs
+_ROSA_B = np.array([0.049922035, -0.095993537, 0.050612699, -0.004408786])
+_ROSA_A = np.array([1.0, -2.494956002, 2.017265875, -0.522189400])
+
+
+def _fase(f, n, fs):
+    """2π·f·n/fs reducido a un ciclo antes de multiplicar por 2π (precisión en flujos largos)."""
+    ciclos = np.multiply.outer(n, np.asarray(f, dtype=float)) / fs
+    return 2 * np.pi * (ciclos - np.floor(ciclos))
+
+
+class Generator:
+    """
+    Base de los generadores. Las subclases implementan _generar(n0, n),
+    que produce las muestras [n0, n0 + n); las que tienen estado
+    implementan además _reiniciar().
+    """
+
+    n_samples = None  # None = señal sin fin
+
+    def __init__(self, fs=FS):
+        self.fs = fs
+        self._pos = 0
+
+    def _generar(self, n0, n):
+        raise NotImplementedError
+
+    def _reiniciar(self):
+        pass
+
+    def reset(self):
+        """Vuelve al inicio de la señal."""
+        self._pos = 0
+        self._reiniciar()
+
+    def _muestras(self, duration_s):
+        """Muestras pedidas, acotadas por la longitud de la señal."""
+        if duration_s is None:
+            if self.n_samples is None:
+                raise ValueError("La señal no tiene fin: indique duration_s")
+            return self.n_samples
+        n = int(round(duration_s * self.fs))
+        return n if self.n_samples is None else min(n, self.n_samples)
+
+    def read(self, n):
+        """
+        Siguientes n muestras (menos si la señal termina antes).
+
+        Retorna:
+        np.ndarray: Muestras flotantes.
+        """
+        if self.n_samples is not None:
+            n = max(0, min(n, self.n_samples - self._pos))
+        y = self._generar(self._pos, n)
+        self._pos += n
+        return y
+
+    def array(self, duration_s=None):
+        """
+        Señal completa desde el inicio, en un solo arreglo.
+
+        Parámetros:
+        duration_s (float): Duración en segundos (None = toda la señal,
+            solo para señales finitas como DTMF).
+        """
+        self.reset()
+        return self.read(self._muestras(duration_s))
+
+    def chunks(self, duration_s=None, chunk_size=CHUNK_SIZE):
+        """
+        Iterador de trozos de chunk_size muestras desde el inicio (el último
+        puede ser más corto). Con duration_s None y una señal sin fin, el
+        iterador no termina.
+        """
+        self.reset()
+        total = None if duration_s is None and self.n_samples is None else self._muestras(duration_s)
+        while total is None or self._pos < total:
+            n = chunk_size if total is None else min(chunk_size, total - self._pos)
+            yield self.read(n)
+
+    def __add__(self, otro):
+        return Mix(self, otro)
+
+
+class Mix(Generator):
+    """Suma de varios generadores con la misma fs."""
+
+    def __init__(self, *generadores):
+        fs = {g.fs for g in generadores}
+        if len(fs) != 1:
+            raise ValueError(f"Los generadores tienen distinta fs: {sorted(fs)}")
+        super().__init__(fs.pop())
+        self.generators = []
+        for g in generadores:
+            self.generators += g.generators if isinstance(g, Mix) else [g]
+        finitas = [g.n_samples for g in self.generators if g.n_samples is not None]
+        self.n_samples = max(finitas) if finitas else None
+
+    def _reiniciar(self):
+        for g in self.generators:
+            g.reset()
+
+    def _generar(self, n0, n):
+        y = np.zeros(n)
+        for g in self.generators:
+            parte = g.read(n)
+            y[:len(parte)] += parte
+        return y
+
+
+class MultiTone(Generator):
+    """Suma de senoidales: Σ a_i·sin(2π·f_i·t + φ_i)."""
+
+    def __init__(self, freqs, amplitudes=1.0, phases=0.0, fs=FS):
+        """
+        Parámetros:
+        freqs (array): Frecuencias en Hz.
+        amplitudes (float o array): Amplitud de cada tono.
+        phases (float o array): Fase inicial de cada tono (rad).
+        fs (float): Frecuencia de muestreo (Hz).
+        """
+        super().__init__(fs)
+        self.freqs = np.atleast_1d(np.asarray(freqs, dtype=float))
+        self.amplitudes = np.broadcast_to(np.asarray(amplitudes, dtype=float), self.freqs.shape)
+        self.phases = np.broadcast_to(np.asarray(phases, dtype=float), self.freqs.shape)
+
+    def _generar(self, n0, n):
+        fase = _fase(self.freqs, np.arange(n0, n0 + n), self.fs) + self.phases
+        return np.sin(fase) @ self.amplitudes
+
+
+class Chirp(Generator):
+    """
+    Barrido de f0 a f1 en sweep_s segundos que se repite sin saltos de fase.
+
+    method: 'linear' o 'logarithmic' (f0 y f1 > 0).
+    """
+
+    def __init__(self, f0, f1, sweep_s, method='linear', amplitude=1.0, fs=FS):
+        super().__init__(fs)
+        if method not in ('linear', 'logarithmic'):
+            raise ValueError(f"Método de barrido no soportado: {method}")
+        if method == 'logarithmic' and (f0 <= 0 or f1 <= 0 or f0 == f1):
+            raise ValueError("El barrido logarítmico requiere 0 < f0 != f1")
+        self.f0, self.f1 = float(f0), float(f1)
+        self.sweep_s = float(sweep_s)
+        self.method = method
+        self.amplitude = amplitude
+
+    def _ciclos(self, t):
+        """Ciclos acumulados desde el inicio de un barrido."""
+        T = self.sweep_s
+        if self.method == 'linear':
+            return self.f0 * t + (self.f1 - self.f0) * t ** 2 / (2 * T)
+        k = np.log(self.f1 / self.f0) / T
+        return self.f0 * np.expm1(k * t) / k
+
+    def _generar(self, n0, n):
+        t = np.arange(n0, n0 + n) / self.fs
+        periodo, t_local = np.divmod(t, self.sweep_s)
+        # Cada barrido completo suma un número fijo de ciclos
+        por_barrido = self._ciclos(self.sweep_s)
+        ciclos = self._ciclos(t_local) + np.mod(periodo * por_barrido, 1.0)
+        return self.amplitude * np.sin(2 * np.pi * (ciclos - np.floor(ciclos)))
+
+
+class AM(Generator):
+    """Portadora modulada en amplitud: A·(1 + m·cos(2π·fm·t))·sin(2π·fc·t)."""
+
+    def __init__(self, fc, fm, m=0.5, amplitude=1.0, fs=FS):
+        super().__init__(fs)
+        self.fc, self.fm = fc, fm
+        self.m = m
+        self.amplitude = amplitude
+
+    def _generar(self, n0, n):
+        fases = _fase([self.fc, self.fm], np.arange(n0, n0 + n), self.fs)
+        return self.amplitude * (1 + self.m * np.cos(fases[:, 1])) * np.sin(fases[:, 0])
+
+
+class WhiteNoise(Generator):
+    """Ruido blanco gaussiano de desviación estándar sigma."""
+
+    def __init__(self, sigma=1.0, seed=None, fs=FS):
+        super().__init__(fs)
+        self.sigma = sigma
+        self.seed = seed
+        self._reiniciar()
+
+    def _reiniciar(self):
+        self._rng = np.random.default_rng(self.seed)
+
+    def _generar(self, n0, n):
+        return self._rng.normal(0.0, self.sigma, n)
+
+
+class PinkNoise(WhiteNoise):
+    """
+    Ruido rosa (densidad 1/f): ruido blanco por un filtro IIR de 3 polos.
+    El estado del filtro pasa de un trozo al siguiente; sigma es la
+    desviación estándar de la salida.
+    """
+
+    def __init__(self, sigma=1.0, seed=None, fs=FS):
+        # Ganancia de potencia del filtro para normalizar la salida
+        impulso = np.zeros(1 << 16)
+        impulso[0] = 1.0
+        self._ganancia = np.sqrt(np.sum(signal.lfilter(_ROSA_B, _ROSA_A, impulso) ** 2))
+        super().__init__(sigma, seed, fs)
+
+    def _reiniciar(self):
+        super()._reiniciar()
+        self._zi = np.zeros(len(_ROSA_A) - 1)
+
+    def _generar(self, n0, n):
+        blanco = self._rng.normal(0.0, self.sigma / self._ganancia, n)
+        y, self._zi = signal.lfilter(_ROSA_B, _ROSA_A, blanco, zi=self._zi)
+        return y
+
+
+class DTMF(Generator):
+    """Secuencia fija de teclas DTMF (finita), como tools.dtmf_synth.dtmf_tones."""
+
+    def __init__(self, keys, tone_s, pause_s=0.0, amplitude=0.5, twist_db=0.0, fs=FS):
+        super().__init__(fs)
+        self.schedule = tone_schedule(keys, tone_s, pause_s, fs, amplitude, twist_db)
+        self.n_samples = self.schedule['n_samples']
+
+    def _generar(self, n0, n):
+        return render(self.schedule, n0, n0 + n, self.fs)
+
+
+def main():
+    import time
+
+    # Consistencia: trozos concatenados == arreglo completo
+    casos = {
+        'multitono': MultiTone([697, 1209, 3000.5], [1.0, 0.5, 0.1]),
+        'barrido lineal': Chirp(100, 3500, 0.37),
+        'barrido log': Chirp(50, 3900, 1.1, method='logarithmic'),
+        'AM': AM(1000, 7.5, m=0.8),
+        'ruido blanco': WhiteNoise(0.1, seed=1),
+        'ruido rosa': PinkNoise(0.1, seed=1),
+        'DTMF': DTMF('159*0#', 0.08, 0.06),
+        'tono + ruido': MultiTone([440]) + PinkNoise(0.05, seed=2),
+    }
+    print(f"{'generador':16s} {'muestras':>9s} {'máx |trozos - arreglo|':>24s} {'Mmuestras/s':>12s}")
+    for nombre, g in casos.items():
+        duracion = None if g.n_samples is not None else 3.0
+        x = g.array(duracion)
+        y = np.concatenate(list(g.chunks(duracion, chunk_size=1001)))
+        t0 = time.perf_counter()
+        for _ in g.chunks(60.0 if duracion else None):
+            pass
+        t = time.perf_counter() - t0
+        n = g._muestras(60.0 if duracion else None)
+        print(f"{nombre:16s} {len(x):9d} {np.max(np.abs(x - y)):24.2e} {n / t / 1e6:12.1f}")
+
+    # DTMF coincide con dtmf_synth.dtmf_tones
+    print(f"\nDTMF vs. dtmf_tones: {np.max(np.abs(casos['DTMF'].array() - dtmf_tones('159*0#', 0.08, 0.06))):.1e}")
+
+    # Pendiente del ruido rosa: -10 dB por década (-3 dB por octava)
+    x = PinkNoise(seed=0).array(60.0)
+    f, P = signal.welch(x, FS, nperseg=4096)
+    banda = (f > 20) & (f < 2000)
+    pendiente = np.polyfit(np.log10(f[banda]), 10 * np.log10(P[banda]), 1)[0]
+    print(f"Ruido rosa: pendiente {pendiente:.2f} dB/década, sigma {np.std(x):.3f}")
+
+    # Una hora a 8 kHz sin guardar la señal completa
+    t0 = time.perf_counter()
+    total = sum(len(trozo) for trozo in (MultiTone([697, 1209]) + WhiteNoise(0.1, seed=3)).chunks(3600))
+    print(f"Una hora de tono + ruido: {total} muestras en {time.perf_counter() - t0:.2f} s")
+
+
+if __name__ == "__main__":
+    main()
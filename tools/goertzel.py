@@ -0,0 +1,328 @@
+# Banco de Goertzel vectorizado para detección DTMF
+# Autor: Adrián Silva Palafox
+#
+# Equivalente en NumPy de applyGoertzel() y processBuffer() del firmware
+# (proyectos_finales/detector_secuencias/detector/src/main.cpp): bloques de
+# 256 muestras a 8 kHz, 8 frecuencias DTMF, energía
+# sqrt(q1² + q2² - q1·q2·coeff) y umbral de 30. La recursión se hace en
+# float32, como el float de 32 bits del AVR, para todas las frecuencias y
+# todos los bloques a la vez: el ciclo de Python es de 256 iteraciones sin
+# importar cuántos bloques haya.
+
+import glob
+import os
+import time
+
+import numpy as np
+from scipy.io import wavfile
+
+# --- Constantes del firmware ---
+FS = 8000
+BLOCK_SIZE = 256
+DETECTION_THRESHOLD = 30.0
+DTMF_LOW = (697, 770, 852, 941)
+DTMF_HIGH = (1209, 1336, 1477, 1633)
+DTMF_FREQS = DTMF_LOW + DTMF_HIGH
+DTMF_KEYS = ('123A',
+             '456B',
+             '789C',
+             '*0#D')
+
+# Media escala del ADC de 10 bits (analogRead() - 512)
+_ADC_MEDIA_ESCALA = 512
+
+
+def goertzel_coefficients(freqs=DTMF_FREQS, fs=FS, dtype=np.float32):
+    """
+    coeff = 2·cos(2π·f/fs) para cada frecuencia, calculado en dtype.
+    """
+    omega = (2.0 * np.pi * np.asarray(freqs, dtype=dtype) / dtype(fs)).astype(dtype)
+    return (2.0 * np.cos(omega)).astype(dtype)
+
+
+def goertzel_energy(blocks, freqs=DTMF_FREQS, fs=FS, dtype=np.float32):
+    """
+    Energía de Goertzel de cada bloque en cada frecuencia.
+
+    Para cada fila aplica q0 = coeff·q1 - q2 + x[n] sobre todo el bloque y
+    retorna sqrt(q1² + q2² - q1·q2·coeff), igual que applyGoertzel().
+
+    Parámetros:
+    blocks (array): Bloques de muestras, forma (B, N) o (N,). Para
+        reproducir el firmware deben estar en cuentas del ADC centradas
+        (ver to_adc_counts()).
+    freqs (tuple): Frecuencias a analizar (Hz).
+    fs (float): Frecuencia de muestreo (Hz).
+    dtype: float32 reproduce la aritmética del AVR; float64 da más
+        precisión.
+
+    Retorna:
+    np.ndarray: Energías, forma (B, len(freqs)) (o (len(freqs),) si la
+    entrada era un solo bloque).
+    """
+    blocks = np.asarray(blocks)
+    un_bloque = blocks.ndim == 1
+    blocks = np.atleast_2d(blocks).astype(dtype, copy=False)
+    if blocks.ndim != 2:
+        raise ValueError("Los bloques deben tener forma (B, N)")
+
+    coeff = goertzel_coefficients(freqs, fs, dtype)
+    q1 = np.zeros((blocks.shape[0], len(coeff)), dtype=dtype)
+    q2 = np.zeros_like(q1)
+    q1, q2 = _recursion(blocks, coeff, q1, q2)
+
+    energia = _energia(q1, q2, coeff)
+    return energia[0] if un_bloque else energia
+
+
+def _recursion(muestras, coeff, q1, q2):
+    """
+    q0 = coeff·q1 - q2 + x[n] sobre el último eje de muestras (R, L),
+    partiendo del estado (q1, q2) de forma (R, K). Retorna el estado final.
+    """
+    # Columnas contiguas: cada iteración lee una muestra de todas las filas
+    columnas = np.ascontiguousarray(muestras.T)[:, :, None]
+    for x in columnas:
+        q0 = coeff * q1 - q2 + x
+        q2 = q1
+        q1 = q0
+    return q1, q2
+
+
+def _energia(q1, q2, coeff):
+    """sqrt(q1² + q2² - q1·q2·coeff), como al final de applyGoertzel()."""
+    return np.sqrt(q1 * q1 + q2 * q2 - q1 * q2 * coeff)
+
+
+class GoertzelBank:
+    """
+    Banco de Goertzel con estado para flujos continuos.
+
+    Las muestras pueden llegar en bloques de cualquier tamaño: el estado
+    (q1, q2) de cada frecuencia se conserva entre llamadas y la energía se
+    calcula cada block_size muestras, exactamente como si el flujo se
+    hubiera partido con frame_blocks(). Procesa S flujos a la vez.
+
+    Ejemplo:
+        banco = GoertzelBank(n_streams=4)
+        energias, bloques = banco.process(trozo)   # trozo: (4, L)
+    """
+
+    def __init__(self, freqs=DTMF_FREQS, fs=FS, block_size=BLOCK_SIZE, n_streams=1,
+                 dtype=np.float32):
+        """
+        Parámetros:
+        freqs (tuple): Frecuencias a analizar (Hz).
+        fs (float): Frecuencia de muestreo (Hz).
+        block_size (int): Muestras por bloque de análisis.
+        n_streams (int): Número de flujos independientes.
+        dtype: float32 (como el firmware) o float64.
+        """
+        self.freqs = tuple(freqs)
+        self.fs = fs
+        self.block_size = int(block_size)
+        self.n_streams = int(n_streams)
+        self.dtype = dtype
+        self.coeff = goertzel_coefficients(self.freqs, fs, dtype)
+        self.reset()
+
+    def reset(self):
+        """Reinicia el estado y el contador de bloques."""
+        forma = (self.n_streams, len(self.freqs))
+        self._q1 = np.zeros(forma, dtype=self.dtype)
+        self._q2 = np.zeros(forma, dtype=self.dtype)
+        self._n = 0             # muestras acumuladas en el bloque actual
+        self.blocks_done = 0    # bloques completados desde reset()
+
+    def process(self, chunk):
+        """
+        Agrega muestras y calcula la energía de los bloques completados.
+
+        Parámetros:
+        chunk (array): (L,) si hay un solo flujo, o (S, L).
+
+        Retorna:
+        tuple: (energías, índices) con energías de forma (nb, S, K) y el
+        índice global de cada bloque completado (nb,).
+        """
+        chunk = np.asarray(chunk)
+        if chunk.ndim == 1 and self.n_streams == 1:
+            chunk = chunk[None]
+        if chunk.ndim != 2 or chunk.shape[0] != self.n_streams:
+            raise ValueError(f"Se esperaba un bloque de forma ({self.n_streams}, L)")
+        chunk = chunk.astype(self.dtype, copy=False)
+
+        B = self.block_size
+        energias = []
+        pos, L = 0, chunk.shape[1]
+        while pos < L:
+            if self._n == 0 and L - pos >= B:
+                # Bloques completos alineados: todos en una sola recursión
+                nb = (L - pos) // B
+                bloques = chunk[:, pos:pos + nb * B].reshape(self.n_streams * nb, B)
+                e = goertzel_energy(bloques, self.freqs, self.fs, self.dtype)
+                energias.append(e.reshape(self.n_streams, nb, -1).transpose(1, 0, 2))
+                pos += nb * B
+                continue
+
+            m = min(L - pos, B - self._n)
+            self._q1, self._q2 = _recursion(chunk[:, pos:pos + m], self.coeff, self._q1, self._q2)
+            self._n += m
+            pos += m
+            if self._n == B:
+                energias.append(_energia(self._q1, self._q2, self.coeff)[None])
+                self._q1 = np.zeros_like(self._q1)
+                self._q2 = np.zeros_like(self._q2)
+                self._n = 0
+
+        if energias:
+            energias = np.concatenate(energias)
+        else:
+            energias = np.zeros((0, self.n_streams, len(self.freqs)), dtype=self.dtype)
+        indices = self.blocks_done + np.arange(len(energias))
+        self.blocks_done += len(energias)
+        return energias, indices
+
+
+def decode_blocks(energies, threshold=DETECTION_THRESHOLD):
+    """
+    Tecla de cada bloque a partir de su matriz de energías (8 columnas).
+
+    Igual que processBuffer(): la frecuencia baja y la alta de mayor
+    energía deben superar el umbral.
+
+    Retorna:
+    np.ndarray: Tecla por bloque ('' si no hay tono).
+    """
+    energies = np.atleast_2d(energies)
+    baja = np.argmax(energies[:, :4], axis=1)
+    alta = np.argmax(energies[:, 4:], axis=1)
+    filas = np.arange(len(energies))
+    detectada = (energies[filas, baja] > threshold) & (energies[filas, 4 + alta] > threshold)
+
+    matriz = np.array([list(fila) for fila in DTMF_KEYS])
+    return np.where(detectada, matriz[baja, alta], '')
+
+
+def collapse_keys(block_keys):
+    """
+    Secuencia de teclas emitidas, como lastDetectedKey en el firmware: una
+    tecla se reporta al aparecer y se puede repetir solo después de un
+    bloque sin tono.
+    """
+    teclas = []
+    anterior = ''
+    for tecla in block_keys:
+        if tecla and tecla != anterior:
+            teclas.append(str(tecla))
+        anterior = tecla
+    return ''.join(teclas)
+
+
+def to_adc_counts(x):
+    """
+    Convierte una señal de audio a cuentas del ADC centradas en cero
+    (analogRead() - 512), suponiendo que la escala completa del audio
+    corresponde a la del ADC.
+
+    Parámetros:
+    x (array): Audio entero (p. ej. int16 de un WAV) o flotante en [-1, 1].
+
+    Retorna:
+    np.ndarray: Enteros en [-512, 511].
+    """
+    x = np.asarray(x)
+    if np.issubdtype(x.dtype, np.integer):
+        escala = float(np.iinfo(x.dtype).max) + 1
+    else:
+        escala = 1.0
+    cuentas = np.round(x / escala * _ADC_MEDIA_ESCALA)
+    return np.clip(cuentas, -_ADC_MEDIA_ESCALA, _ADC_MEDIA_ESCALA - 1).astype(np.int16)
+
+
+def frame_blocks(x, block_size=BLOCK_SIZE):
+    """
+    Parte la señal en bloques consecutivos de block_size muestras (vista,
+    sin copia). Las muestras finales que no completan un bloque se
+    descartan, porque el firmware solo procesa buffers llenos.
+    """
+    x = np.asarray(x)
+    n_bloques = len(x) // block_size
+    return x[:n_bloques * block_size].reshape(n_bloques, block_size)
+
+
+def decode_signal(x, threshold=DETECTION_THRESHOLD, block_size=BLOCK_SIZE, fs=FS):
+    """
+    Decodifica una señal completa en cuentas del ADC.
+
+    Retorna:
+    tuple: (teclas emitidas, energías por bloque (B, 8)).
+    """
+    energias = goertzel_energy(frame_blocks(x, block_size), DTMF_FREQS, fs)
+    return collapse_keys(decode_blocks(energias, threshold)), energias
+
+
+def read_wav_adc(path):
+    """Lee un WAV (mono) y lo convierte a cuentas del ADC; retorna (fs, x)."""
+    fs, x = wavfile.read(path)
+    if x.ndim > 1:
+        x = x[:, 0]
+    return fs, to_adc_counts(x)
+
+
+def _goertzel_firmware(bloque, indice):
+    """Traducción directa de applyGoertzel() (referencia escalar en float32)."""
+    f32 = np.float32
+    frecuencia = f32(DTMF_FREQS[indice])
+    omega = f32(f32(2.0 * np.pi) * frecuencia / f32(FS))
+    coeff = f32(2.0) * f32(np.cos(omega))
+    q0 = q1 = q2 = f32(0)
+    for muestra in bloque:
+        q0 = coeff * q1 - q2 + f32(muestra)
+        q2 = q1
+        q1 = q0
+    return np.sqrt(q1 * q1 + q2 * q2 - q1 * q2 * coeff)
+
+
+def main():
+    carpeta = os.path.join(os.path.dirname(__file__), '..', 'universidad', 'proyectos_finales',
+                           'tonos_sinteticos', 'tonos_teclas')
+    archivos = sorted(glob.glob(os.path.join(carpeta, '*.wav')))
+
+    señales = {}
+    for archivo in archivos:
+        fs, x = read_wav_adc(archivo)
+        if fs != FS:
+            raise ValueError(f"{archivo}: se esperaba fs = {FS} Hz, no {fs}")
+        señales[os.path.basename(archivo)] = x
+
+    # Comparación contra la traducción escalar del firmware
+    x = next(iter(señales.values()))
+    bloques = frame_blocks(x)
+    referencia = np.array([[_goertzel_firmware(b, i) for i in range(8)] for b in bloques[:2]])
+    error = np.max(np.abs(goertzel_energy(bloques[:2]) - referencia) / referencia)
+    print(f"Error relativo vs applyGoertzel(): {error:.1e}\n")
+
+    aciertos = 0
+    t0 = time.perf_counter()
+    resultados = {nombre: decode_signal(x)[0] for nombre, x in señales.items()}
+    t_total = time.perf_counter() - t0
+    for nombre, teclas in resultados.items():
+        esperada = nombre.rsplit('_', 1)[-1][:-4]
+        aciertos += teclas == esperada
+        print(f"{nombre:20s} -> {teclas or '-':4s} {'✓' if teclas == esperada else '✗'}")
+
+    duracion = sum(len(x) for x in señales.values()) / FS
+    print(f"\n{aciertos}/{len(resultados)} archivos correctos")
+    print(f"{duracion:.2f} s de audio en {t_total * 1e3:.1f} ms ({duracion / t_total:.0f}x tiempo real)")
+
+    # Todo el corpus como un solo arreglo de bloques
+    todos = np.concatenate([frame_blocks(x) for x in señales.values()] * 100)
+    t0 = time.perf_counter()
+    goertzel_energy(todos)
+    t_lote = time.perf_counter() - t0
+    print(f"{len(todos)} bloques por lote: {len(todos) * BLOCK_SIZE / FS / t_lote:.0f}x tiempo real")
+
+
+if __name__ == "__main__":
+    main()
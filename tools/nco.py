@@ -0,0 +1,306 @@
+# Banco de osciladores controlados numéricamente (NCO)
+# Autor: Adrián Silva Palafox
+#
+# Cada tono tiene un acumulador de fase de 32 bits que avanza un incremento
+# entero por muestra (f·2^32/fs). Los bits altos de la fase indexan una
+# tabla de un ciclo de seno y los bajos interpolan linealmente entre dos
+# entradas. Así se hace en un DDS por hardware o en el ESP32, y en NumPy
+# evita evaluar np.sin sobre vectores de tiempo cada vez más largos:
+# - la fase es exacta entre trozos (aritmética entera módulo 2^32),
+# - un cambio de frecuencia solo cambia el incremento, sin saltos de fase;
+#   con glide_s el incremento se desliza muestra a muestra (barridos),
+# - los cambios de amplitud se hacen con una rampa corta para no generar
+#   clics.
+
+import time
+
+import numpy as np
+
+from tools.generators import Generator, MultiTone
+from tools.goertzel import FS
+
+BITS_FASE = 32
+BITS_TABLA = 10  # 1024 entradas: error de interpolación ~5e-6 en float32 (-105 dB)
+BITS_TABLA_SIN_INTERPOLAR = 16  # 65536 entradas: error ~1e-4 (-80 dB)
+RAMPA_AMPLITUD_S = 0.005
+
+
+class NCOBank(Generator):
+    """
+    Banco de K osciladores con fase continua.
+
+    Ejemplo:
+        nco = NCOBank([697, 1209], amplitudes=[0.5, 0.35], fs=8000)
+        y = nco.read(160)                       # 20 ms, suma de los tonos
+        nco.set_frequencies([770, 1336])        # sin clic
+        nco.sweep(0, 100, 3900, 10.0, 'log')    # barrido del tono 0 en 10 s
+
+    También es un Generator: array(duración) y chunks(duración) empiezan
+    desde las frecuencias y amplitudes iniciales.
+    """
+
+    def __init__(self, freqs, amplitudes=1.0, phases=0.0, fs=FS, table_bits=None, interpolate=True,
+                 amplitude_ramp_s=RAMPA_AMPLITUD_S, dtype=np.float32):
+        """
+        Parámetros:
+        freqs (array): Frecuencia inicial de cada tono (Hz, 0 <= f < fs).
+        amplitudes (float o array): Amplitud inicial de cada tono.
+        phases (float o array): Fase inicial (rad).
+        fs (float): Frecuencia de muestreo (Hz).
+        table_bits (int): log2 del tamaño de la tabla de seno (por defecto
+            10 con interpolación y 16 sin ella).
+        interpolate (bool): Interpolación lineal entre entradas. Sin ella
+            la tabla es más grande y la lectura unas 4 veces más rápida.
+        amplitude_ramp_s (float): Duración de la rampa al cambiar amplitudes.
+        dtype: Tipo de la tabla y de la salida.
+        """
+        super().__init__(fs)
+        if table_bits is None:
+            table_bits = BITS_TABLA if interpolate else BITS_TABLA_SIN_INTERPOLAR
+        self.table_bits = int(table_bits)
+        self.interpolate = interpolate
+        self.amplitude_ramp_s = amplitude_ramp_s
+        self.dtype = np.dtype(dtype)
+        self._corrimiento = np.uint32(BITS_FASE - self.table_bits)
+        self._mascara = np.uint32((1 << (BITS_FASE - self.table_bits)) - 1)
+        self._escala_frac = self.dtype.type(1.0 / (1 << (BITS_FASE - self.table_bits)))
+
+        # Un ciclo más una entrada de guarda para interpolar sin módulo
+        n = 1 << self.table_bits
+        self._tabla = np.sin(2 * np.pi * np.arange(n + 1) / n).astype(self.dtype)
+        self._pendiente = np.diff(self._tabla)
+
+        self._freqs0 = np.atleast_1d(np.asarray(freqs, dtype=float))
+        K = len(self._freqs0)
+        self._amplitudes0 = np.broadcast_to(np.asarray(amplitudes, dtype=float), (K,)).copy()
+        self._fases0 = np.broadcast_to(np.asarray(phases, dtype=float), (K,)).copy()
+        self.reset()
+
+    @property
+    def n_tones(self):
+        return len(self._freqs0)
+
+    def _incremento(self, f):
+        """Incremento de fase (entero de 32 bits) para la frecuencia f."""
+        f = np.asarray(f, dtype=float)
+        if np.any(f < 0) or np.any(f >= self.fs):
+            raise ValueError(f"Las frecuencias deben estar en [0, {self.fs})")
+        return np.round(f / self.fs * 2.0 ** BITS_FASE).astype(np.int64)
+
+    def _reiniciar(self):
+        K = self.n_tones
+        self._fase = (np.round(np.mod(self._fases0 / (2 * np.pi), 1.0) * 2.0 ** BITS_FASE)
+                      .astype(np.uint64) & 0xFFFFFFFF).astype(np.uint32)
+        self._inc = self._incremento(self._freqs0).astype(float)
+        self._amp = self._amplitudes0.copy()
+        # Deslizamientos pendientes: incremento o amplitud objetivo, forma y
+        # muestras restantes de cada tono
+        self._inc_inicio = self._inc.copy()
+        self._inc_fin = self._inc.copy()
+        self._inc_log = np.zeros(K, dtype=bool)
+        self._inc_total = np.zeros(K, dtype=int)
+        self._inc_hecho = np.zeros(K, dtype=int)
+        self._amp_inicio = self._amp.copy()
+        self._amp_fin = self._amp.copy()
+        self._amp_total = np.zeros(K, dtype=int)
+        self._amp_hecho = np.zeros(K, dtype=int)
+        self._rampa = None  # n·inc de un trozo con incrementos constantes
+
+    @property
+    def frequencies(self):
+        """Frecuencia actual de cada tono (Hz), cuantizada a fs/2^32."""
+        return self._inc * self.fs / 2.0 ** BITS_FASE
+
+    @property
+    def amplitudes(self):
+        return self._amp.copy()
+
+    def _indices(self, tonos):
+        return np.arange(self.n_tones) if tonos is None else np.atleast_1d(tonos)
+
+    def set_frequencies(self, freqs, tones=None, glide_s=0.0, shape='linear'):
+        """
+        Cambia la frecuencia de uno o varios tonos sin salto de fase.
+
+        Parámetros:
+        freqs (float o array): Nuevas frecuencias (Hz).
+        tones (int o array): Tonos a cambiar (None = todos, en orden).
+        glide_s (float): Tiempo para llegar a la nueva frecuencia (0 = al
+            instante, lo que ya es continuo en fase).
+        shape (str): 'linear' o 'log' (frecuencia exponencial en el tiempo).
+        """
+        tonos = self._indices(tones)
+        fin = np.broadcast_to(self._incremento(freqs).astype(float), tonos.shape)
+        n = int(round(glide_s * self.fs))
+        if shape not in ('linear', 'log'):
+            raise ValueError(f"Forma de deslizamiento no soportada: {shape}")
+        if shape == 'log' and n > 0 and (np.any(fin <= 0) or np.any(self._inc[tonos] <= 0)):
+            raise ValueError("El deslizamiento logarítmico requiere frecuencias positivas")
+        self._inc_inicio[tonos] = self._inc[tonos]
+        self._inc_fin[tonos] = fin
+        self._inc_log[tonos] = shape == 'log'
+        self._inc_total[tonos] = n
+        self._inc_hecho[tonos] = 0
+        self._rampa = None
+        if n == 0:
+            self._inc[tonos] = fin
+
+    def sweep(self, tone, f0, f1, duration_s, shape='log'):
+        """Barrido del tono tone de f0 a f1 en duration_s segundos."""
+        self.set_frequencies(f0, tone)
+        self.set_frequencies(f1, tone, glide_s=duration_s, shape=shape)
+
+    def set_amplitudes(self, amplitudes, tones=None, ramp_s=None):
+        """
+        Cambia amplitudes con una rampa lineal (por defecto amplitude_ramp_s).
+        Amplitud 0 apaga el tono sin clic.
+        """
+        tonos = self._indices(tones)
+        n = int(round((self.amplitude_ramp_s if ramp_s is None else ramp_s) * self.fs))
+        self._amp_inicio[tonos] = self._amp[tonos]
+        self._amp_fin[tonos] = np.broadcast_to(np.asarray(amplitudes, dtype=float), tonos.shape)
+        self._amp_total[tonos] = n
+        self._amp_hecho[tonos] = 0
+        if n == 0:
+            self._amp[tonos] = self._amp_fin[tonos]
+
+    def _trayectoria(self, inicio, fin, total, hecho, log, n):
+        """
+        Valores por muestra (n, K) de un deslizamiento en curso, y valor
+        final tras n muestras (llamar solo con deslizamientos pendientes).
+        """
+        activos = hecho < total
+        k = np.arange(1, n + 1)[:, None] + hecho  # muestra del deslizamiento
+        u = np.minimum(k / np.maximum(total, 1), 1.0)
+        lineal = inicio + (fin - inicio) * u
+        if np.any(log):
+            with np.errstate(divide='ignore', invalid='ignore'):
+                exponencial = inicio * (fin / inicio) ** u
+            lineal = np.where(log, exponencial, lineal)
+        return np.where(activos, lineal, fin)
+
+    def _generar(self, n0, n):
+        return self._leer(n, mezclar=True)
+
+    def read_tones(self, n):
+        """
+        Siguientes n muestras de cada tono por separado.
+
+        Retorna:
+        np.ndarray: (n, K).
+        """
+        return self._leer(n, mezclar=False)
+
+    def _leer(self, n, mezclar):
+        K = self.n_tones
+        if n == 0:
+            return np.zeros(0 if mezclar else (0, K), dtype=self.dtype)
+
+        # Incrementos por muestra (constantes o deslizándose)
+        incs = None
+        if np.any(self._inc_hecho < self._inc_total):
+            incs = self._trayectoria(self._inc_inicio, self._inc_fin, self._inc_total,
+                                     self._inc_hecho, self._inc_log, n)
+        if incs is None:
+            if self._rampa is None or len(self._rampa) != n:
+                inc = self._inc.astype(np.int64).astype(np.uint32)
+                self._rampa = np.arange(1, n + 1, dtype=np.uint32)[:, None] * inc  # módulo 2^32
+            fases = self._rampa + self._fase  # fases de las muestras 1..n
+            self._fase = fases[-1]
+            fases = fases - self._rampa[0]
+        else:
+            pasos = np.round(incs).astype(np.int64)
+            # Fase de cada muestra = fase inicial + pasos anteriores
+            acumulado = np.cumsum(pasos, axis=0)
+            fases = (self._fase.astype(np.int64) + acumulado - pasos) & 0xFFFFFFFF
+            self._fase = ((self._fase.astype(np.int64) + acumulado[-1]) & 0xFFFFFFFF).astype(np.uint32)
+            fases = fases.astype(np.uint32)
+            self._inc = incs[-1].copy()
+            self._rampa = None
+            self._inc_hecho = np.minimum(self._inc_hecho + n, self._inc_total)
+
+        # Tabla (con interpolación lineal entre entradas)
+        indice = fases >> self._corrimiento
+        if self.interpolate:
+            y = (fases & self._mascara).astype(self.dtype)
+            y *= self._escala_frac
+            y *= np.take(self._pendiente, indice)
+            y += np.take(self._tabla, indice)
+        else:
+            y = np.take(self._tabla, indice)
+
+        # Amplitudes: con la mezcla, producto y suma en un solo paso
+        if np.any(self._amp_hecho < self._amp_total):
+            amps = self._trayectoria(self._amp_inicio, self._amp_fin, self._amp_total,
+                                     self._amp_hecho, np.zeros(K, dtype=bool), n)
+            self._amp = amps[-1].copy()
+            self._amp_hecho = np.minimum(self._amp_hecho + n, self._amp_total)
+            y *= amps.astype(self.dtype)
+            return y.sum(axis=1) if mezclar else y
+        amp = self._amp.astype(self.dtype)
+        if mezclar:
+            return y @ amp
+        y *= amp
+        return y
+
+
+def main():
+    fs, K, trozo = 8000, 8, 160
+
+    # Precisión contra np.sin con la fase exacta, a lo largo de una hora
+    freqs = [697, 770, 852, 941, 1209, 1336, 1477, 1633]
+    nco = NCOBank(freqs, fs=fs)
+    total = 3600 * fs
+    for _ in nco.chunks((total - trozo) / fs):  # avanza una hora menos un trozo
+        pass
+    y = nco.read_tones(trozo)
+    n = np.arange(total - trozo, total)
+    inc = np.round(np.array(freqs) / fs * 2.0 ** 32)
+    ref = np.sin(2 * np.pi * np.mod(np.outer(n, inc), 2.0 ** 32) / 2.0 ** 32)
+    print(f"Error máximo tras una hora: {np.max(np.abs(y - ref)):.2e}")
+
+    # Cambio de frecuencia: la derivada no debe saltar
+    nco = NCOBank([1000], fs=fs)
+    a = nco.read(100)
+    nco.set_frequencies([1300])
+    b = nco.read(100)
+    salto = np.max(np.abs(np.diff(np.concatenate((a, b)))))
+    print(f"Máx |x[n] - x[n-1]| al cambiar 1000 -> 1300 Hz: {salto:.3f} "
+          f"(cota 2π·1300/fs = {2 * np.pi * 1300 / fs:.3f})")
+
+    # Trozos == arreglo completo, con barrido logarítmico incluido
+    nco = NCOBank([100, 1000], fs=fs)
+    nco.sweep(0, 100, 3900, 2.0)
+    x = nco.read(3 * fs)
+    nco.reset()
+    nco.sweep(0, 100, 3900, 2.0)
+    y = np.concatenate([nco.read(trozo) for _ in range(3 * fs // trozo)])
+    print(f"Barrido por trozos vs. de una vez: {np.max(np.abs(x - y)):.1e}")
+
+    # Rendimiento: K tonos durante 60 s en trozos de 20 ms y de 4096 muestras
+    duracion = 60
+    for n_trozo in (trozo, 4096):
+        print(f"\n{K} tonos, trozos de {n_trozo} muestras, {duracion} s a {fs} Hz:")
+        for nombre, fabrica in [
+            ("np.sin(2π·f·t) por tono", None),
+            ("MultiTone (tools.generators)", lambda: MultiTone(freqs, fs=fs)),
+            ("NCOBank, tabla interpolada", lambda: NCOBank(freqs, fs=fs)),
+            ("NCOBank, tabla de 2^16 sin interpolar", lambda: NCOBank(freqs, fs=fs, interpolate=False)),
+        ]:
+            t0 = time.perf_counter()
+            if fabrica is None:
+                # Como generate_test_signal: vector de tiempo y np.sin por tono
+                for inicio in range(0, duracion * fs, n_trozo):
+                    t = np.arange(inicio, inicio + n_trozo) / fs
+                    x = np.zeros(n_trozo)
+                    for f in freqs:
+                        x += np.sin(2 * np.pi * f * t)
+            else:
+                for _ in fabrica().chunks(duracion, chunk_size=n_trozo):
+                    pass
+            t = time.perf_counter() - t0
+            print(f"  {nombre:38s} {duracion / t:8.0f}x tiempo real")
+
+
+if __name__ == "__main__":
+    main()
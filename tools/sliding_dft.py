@@ -0,0 +1,188 @@
+# DFT deslizante (sliding DFT) para seguir pocos bins muestra a muestra
+# Autor: Adrián Silva Palafox
+
+import time
+
+import numpy as np
+
+# Longitud máxima de los sub-bloques de process(); se reduce si r**-S crece
+# demasiado (ver _longitud_sub_bloque)
+_SUB_BLOQUE_MAX = 1024
+_CRECIMIENTO_MAX = 1e4
+
+
+class SlidingDFT:
+    """
+    DFT deslizante de N puntos restringida a K bins.
+
+    Cada muestra nueva actualiza los K bins en O(K) con la recurrencia
+
+        X_k[n] = r·e^{j2πk/N} · (X_k[n-1] + x[n] - r^N · x[n-N])
+
+    en lugar de recalcular una FFT de N puntos. Con r = 1 el resultado es
+    exactamente la DFT de las últimas N muestras (la más antigua en n = 0);
+    el factor de amortiguamiento r < 1 evita que el error de redondeo se
+    acumule sin límite en flujos largos, a cambio de un sesgo de ~(1 - r^N).
+
+    Ejemplo:
+        sdft = SlidingDFT(256, bins=[22, 25, 27, 30])
+        for bloque in bloques:
+            X = sdft.process(bloque)   # bins después de la última muestra
+    """
+
+    def __init__(self, N, bins, r=0.99999):
+        """
+        Parámetros:
+        N (int): Longitud de la ventana (puntos de la DFT).
+        bins (array): Índices k de los bins a seguir, enteros en [0, N).
+        r (float): Factor de amortiguamiento en (0, 1].
+        """
+        self.N = int(N)
+        if self.N < 1:
+            raise ValueError(f"Longitud de ventana no válida: {N}")
+        bins = np.atleast_1d(np.asarray(bins))
+        if bins.ndim != 1 or len(bins) == 0:
+            raise ValueError("Se requiere al menos un bin")
+        if not np.all(np.equal(np.mod(bins, 1), 0)) or bins.min() < 0 or bins.max() >= self.N:
+            raise ValueError(f"Los bins deben ser enteros en [0, {self.N})")
+        if not 0 < r <= 1:
+            raise ValueError(f"El factor de amortiguamiento debe estar en (0, 1], no {r}")
+
+        self.bins = bins.astype(int)
+        self.r = float(r)
+        self.K = len(self.bins)
+
+        # Polo de cada resonador y peso de la muestra que sale de la ventana
+        self._polo = self.r * np.exp(2j * np.pi * self.bins / self.N)
+        self._r_N = self.r ** self.N
+
+        # Potencias del polo para actualizar un sub-bloque completo de golpe
+        self.S = self._longitud_sub_bloque()
+        m = np.arange(self.S + 1)[:, None]
+        self._potencias = self._polo ** m[1:]   # a^(m+1), forma (S, K)
+        self._inversas = self._polo ** -m[:-1]  # a^(-m), forma (S, K)
+
+        self.reset()
+
+    def _longitud_sub_bloque(self):
+        """Sub-bloque más largo con |a^-S| = r^-S acotado."""
+        if self.r == 1:
+            return _SUB_BLOQUE_MAX
+        S = int(np.log(_CRECIMIENTO_MAX) / -np.log(self.r))
+        return max(1, min(_SUB_BLOQUE_MAX, S))
+
+    def reset(self):
+        """Vacía la ventana (todas las muestras en cero)."""
+        self.X = np.zeros(self.K, dtype=complex)
+        self._ventana = np.zeros(self.N)  # buffer circular de entrada
+        self._pos = 0                     # índice de la muestra más antigua
+
+    @property
+    def spectrum(self):
+        """Copia de los K bins actuales."""
+        return self.X.copy()
+
+    def frequencies(self, fs):
+        """Frecuencia en Hz de cada bin seguido."""
+        return self.bins * fs / self.N
+
+    def update(self, sample):
+        """
+        Agrega una sola muestra.
+
+        Parámetros:
+        sample (float): Muestra nueva.
+
+        Retorna:
+        np.ndarray: Los K bins actualizados (vista del estado interno).
+        """
+        saliente = self._ventana[self._pos]
+        self._ventana[self._pos] = sample
+        self._pos = (self._pos + 1) % self.N
+
+        self.X += sample - self._r_N * saliente
+        self.X *= self._polo
+        return self.X
+
+    def _ventana_ordenada(self):
+        """Últimas N muestras de la más antigua a la más reciente."""
+        return np.roll(self._ventana, -self._pos)
+
+    def process(self, chunk, full=False):
+        """
+        Agrega un bloque de muestras.
+
+        El costo sigue siendo O(K) por muestra, pero el bloque se actualiza
+        por sub-bloques con la forma cerrada de la recurrencia
+        y[m] = a^(m+1)·(X0 + Σ_{j≤m} a^(-j)·d[j]), sin un ciclo de Python
+        por muestra.
+
+        Parámetros:
+        chunk (array): Nuevas muestras (cualquier tamaño).
+        full (bool): Si es True retorna los bins después de cada muestra.
+
+        Retorna:
+        np.ndarray: Bins después de la última muestra, forma (K,), o la
+        trayectoria completa, forma (len(chunk), K), si full es True.
+        """
+        chunk = np.asarray(chunk, dtype=float)
+        if chunk.ndim != 1:
+            raise ValueError("Los bloques deben ser unidimensionales")
+        L = len(chunk)
+        if L == 0:
+            return np.zeros((0, self.K), dtype=complex) if full else self.spectrum
+
+        # Muestra que entra menos la que sale de la ventana, para cada n
+        ext = np.concatenate((self._ventana_ordenada(), chunk))
+        d = chunk - self._r_N * ext[:L]
+        self._ventana = ext[-self.N:].copy()
+        self._pos = 0
+
+        trayectoria = np.empty((L, self.K), dtype=complex) if full else None
+        for inicio in range(0, L, self.S):
+            sub = d[inicio:inicio + self.S, None]
+            s = len(sub)
+            y = self._potencias[:s] * (self.X + np.cumsum(self._inversas[:s] * sub, axis=0))
+            self.X = y[-1].copy()
+            if full:
+                trayectoria[inicio:inicio + s] = y
+
+        return trayectoria if full else self.spectrum
+
+
+def main():
+    # Comparación contra la FFT de las últimas N muestras y rendimiento a 8 kHz
+    fs = 8000
+    N = 256
+    bins = np.array([22, 25, 27, 30, 39, 43, 47, 52])  # ~DTMF con N = 256
+    rng = np.random.default_rng(0)
+    x = rng.standard_normal(fs)
+
+    sdft = SlidingDFT(N, bins, r=1.0)
+    traza = sdft.process(x[:1000], full=True)
+    referencia = np.fft.fft(x[1000 - N:1000])[bins]
+    print(f"Error vs FFT (r = 1): {np.max(np.abs(traza[-1] - referencia)):.2e}")
+
+    for n in range(1000, 1100):
+        sdft.update(x[n])
+    referencia = np.fft.fft(x[1100 - N:1100])[bins]
+    print(f"Error tras update() : {np.max(np.abs(sdft.spectrum - referencia)):.2e}")
+
+    sdft = SlidingDFT(N, bins)
+    t0 = time.perf_counter()
+    for inicio in range(0, len(x), 64):
+        sdft.process(x[inicio:inicio + 64], full=True)
+    t_bloques = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    for muestra in x[:2000]:
+        sdft.update(muestra)
+    t_muestras = (time.perf_counter() - t0) * len(x) / 2000
+
+    print(f"\n{len(bins)} bins, N = {N}, fs = {fs} Hz")
+    print(f"  process (bloques de 64): {len(x) / t_bloques:12.0f} muestras/s  ({len(x) / t_bloques / fs:.0f}x tiempo real)")
+    print(f"  update (muestra a muestra): {len(x) / t_muestras:9.0f} muestras/s  ({len(x) / t_muestras / fs:.0f}x tiempo real)")
+
+
+if __name__ == "__main__":
+    main()
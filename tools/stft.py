@@ -0,0 +1,263 @@
+# STFT incremental sobre un buffer circular e ISTFT por solapamiento y suma
+# Autor: Adrián Silva Palafox
+#
+# STFT recibe muestras conforme llegan y entrega las tramas nuevas cada vez
+# que se junta un salto (hop) de datos. Las muestras se guardan en un buffer
+# circular de capacidad fija (nperseg + max_batch·hop); las tramas listas
+# se leen del buffer con un solo índice (m x nperseg) y se transforman con
+# una FFT real por lotes. El costo de cada actualización es proporcional a
+# las muestras nuevas, no a la longitud total de la captura.
+#
+# ISTFT invierte las tramas en flujo continuo: cada trama pasa por la IFFT,
+# se multiplica por la ventana de síntesis y se suma en su posición. Cada
+# muestra se divide entre Σw² de las tramas que la cubren, así que la
+# reconstrucción es exacta con cualquier ventana y solapamiento mientras
+# esa suma no sea cero.
+
+import numpy as np
+
+from tools.fft import rfft, irfft
+from tools.windows import get_window
+
+MAX_BATCH = 64  # tramas por lote (fija la capacidad del buffer circular)
+
+
+def _ventana(window, nperseg):
+    nombre, *params = (window,) if isinstance(window, str) else window
+    return get_window(nombre, nperseg, *params, sym=False)
+
+
+class STFT:
+    """
+    Transformada de Fourier de tiempo corto en flujo continuo.
+
+    Ejemplo:
+        stft = STFT(nperseg=256, hop=128, fs=8000)
+        for trozo in captura:
+            X = stft.update(trozo)         # (tramas nuevas, nfft/2 + 1)
+            t = stft.frame_times(len(X))    # centro de cada trama nueva (s)
+    """
+
+    def __init__(self, nperseg=256, hop=None, window='hann', nfft=None, fs=1.0, max_batch=MAX_BATCH):
+        """
+        Parámetros:
+        nperseg (int): Muestras por trama.
+        hop (int): Salto entre tramas (por defecto nperseg/2).
+        window (str o tuple): Ventana de tools.windows (periódica).
+        nfft (int): Puntos de la FFT (por defecto nperseg).
+        fs (float): Frecuencia de muestreo (Hz).
+        max_batch (int): Tramas que se transforman juntas como máximo.
+        """
+        self.nperseg = int(nperseg)
+        self.hop = self.nperseg // 2 if hop is None else int(hop)
+        if not 0 < self.hop <= self.nperseg:
+            raise ValueError("hop debe estar en (0, nperseg]")
+        self.nfft = self.nperseg if nfft is None else int(nfft)
+        if self.nfft < self.nperseg:
+            raise ValueError("nfft no puede ser menor que nperseg")
+        self.fs = fs
+        self.window = _ventana(window, self.nperseg)
+        self.capacity = self.nperseg + int(max_batch) * self.hop
+        self._trama = np.arange(self.nperseg)
+        self.reset()
+
+    def reset(self):
+        """Vacía el buffer y reinicia la cuenta de tramas."""
+        self._buffer = np.zeros(self.capacity)
+        self.n_samples = 0       # muestras escritas desde reset()
+        self.frames_done = 0     # tramas entregadas desde reset()
+
+    @property
+    def frequencies(self):
+        return np.arange(self.nfft // 2 + 1) * self.fs / self.nfft
+
+    def frame_times(self, n_frames=None, first=None):
+        """
+        Centro (s) de las tramas [first, first + n_frames). Por defecto, las
+        últimas n_frames entregadas.
+        """
+        if first is None:
+            first = self.frames_done - (n_frames or 0)
+        k = np.arange(first, first + (n_frames or 0))
+        return (k * self.hop + self.nperseg / 2) / self.fs
+
+    def _escribir(self, datos):
+        """Copia datos al buffer circular (len(datos) <= capacidad)."""
+        inicio = self.n_samples % self.capacity
+        primero = min(len(datos), self.capacity - inicio)
+        self._buffer[inicio:inicio + primero] = datos[:primero]
+        self._buffer[:len(datos) - primero] = datos[primero:]
+        self.n_samples += len(datos)
+
+    def _tramas_listas(self):
+        """Tramas completas en el buffer, como arreglo (m x nperseg)."""
+        m = (self.n_samples - self.nperseg) // self.hop + 1 - self.frames_done
+        if self.n_samples < self.nperseg or m <= 0:
+            return np.zeros((0, self.nperseg))
+        inicios = (self.frames_done + np.arange(m)) * self.hop
+        indices = (inicios[:, None] + self._trama) % self.capacity
+        self.frames_done += m
+        return self._buffer[indices]
+
+    def update(self, chunk):
+        """
+        Agrega muestras y transforma las tramas que se completan.
+
+        Parámetros:
+        chunk (array): Muestras reales (cualquier tamaño).
+
+        Retorna:
+        np.ndarray: (tramas nuevas, nfft/2 + 1) complejos.
+        """
+        chunk = np.asarray(chunk, dtype=float).ravel()
+        # Se escribe a lo más (capacidad - nperseg + 1) muestras entre
+        # lecturas para no pisar una trama pendiente
+        paso = self.capacity - self.nperseg + 1
+        tramas = []
+        for i in range(0, len(chunk), paso):
+            self._escribir(chunk[i:i + paso])
+            tramas.append(self._tramas_listas())
+        if not tramas:
+            return np.zeros((0, self.nfft // 2 + 1), dtype=complex)
+        tramas = np.concatenate(tramas)
+        return rfft(tramas * self.window, self.nfft, axis=-1)
+
+    def power(self, X):
+        """
+        Densidad espectral de potencia de un lado de cada trama (V²/Hz),
+        como el espectrograma de scipy.signal.spectrogram.
+        """
+        P = (X.real ** 2 + X.imag ** 2) / (self.fs * np.sum(self.window ** 2))
+        fin = -1 if self.nfft % 2 == 0 else None
+        P[:, 1:fin] *= 2
+        return P
+
+
+class ISTFT:
+    """
+    STFT inversa en flujo continuo (solapamiento y suma ponderado).
+
+    Ejemplo:
+        istft = ISTFT(nperseg=256, hop=128)
+        y = istft.update(X)      # muestras completas hasta ahora
+        y = istft.flush()        # cola final
+    """
+
+    def __init__(self, nperseg=256, hop=None, window='hann', nfft=None):
+        self.nperseg = int(nperseg)
+        self.hop = self.nperseg // 2 if hop is None else int(hop)
+        if not 0 < self.hop <= self.nperseg:
+            raise ValueError("hop debe estar en (0, nperseg]")
+        self.nfft = self.nperseg if nfft is None else int(nfft)
+        self.window = _ventana(window, self.nperseg)
+        # Ventana rellenada a R saltos para sumar por bloques de hop
+        self._R = -(-self.nperseg // self.hop)
+        self._w = np.zeros(self._R * self.hop)
+        self._w[:self.nperseg] = self.window
+        self.reset()
+
+    def reset(self):
+        # Bloques de hop aún abiertos: (R - 1) x hop de señal y de Σw²
+        self._senal = np.zeros((self._R - 1, self.hop))
+        self._norma = np.zeros((self._R - 1, self.hop))
+
+    def _normalizar(self, senal, norma):
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.where(norma > 1e-10, senal / norma, 0.0).ravel()
+
+    def update(self, X):
+        """
+        Agrega tramas (m, nfft/2 + 1) y retorna las muestras que ya no
+        recibirán más tramas (m·hop muestras).
+        """
+        X = np.atleast_2d(X)
+        m = len(X)
+        if m == 0:
+            return np.zeros(0)
+        R, hop = self._R, self.hop
+        y = irfft(X, self.nfft, axis=-1)[:, :self.nperseg]
+        bloques = np.zeros((m, R * hop))
+        bloques[:, :self.nperseg] = y
+        bloques = (bloques * self._w).reshape(m, R, hop)
+        w2 = (self._w ** 2).reshape(R, hop)
+
+        # La trama k aporta su bloque r a la salida k + r
+        senal = np.zeros((m + R - 1, hop))
+        norma = np.zeros((m + R - 1, hop))
+        senal[:R - 1] = self._senal
+        norma[:R - 1] = self._norma
+        for r in range(R):
+            senal[r:r + m] += bloques[:, r]
+            norma[r:r + m] += w2[r]
+        self._senal, self._norma = senal[m:], norma[m:]
+        return self._normalizar(senal[:m], norma[:m])
+
+    def flush(self):
+        """Cola final ((R - 1)·hop muestras) y reinicio."""
+        y = self._normalizar(self._senal, self._norma)
+        self.reset()
+        return y
+
+
+def spectrogram(x, fs=1.0, nperseg=256, noverlap=None, window='hann', nfft=None):
+    """
+    Espectrograma de un arreglo completo (PSD de cada trama).
+
+    Retorna:
+    tuple: (frecuencias, tiempos del centro de cada trama, P (bins x tramas)).
+    """
+    hop = nperseg - (nperseg // 2 if noverlap is None else noverlap)
+    stft = STFT(nperseg, hop, window, nfft, fs)
+    X = stft.update(x)
+    return stft.frequencies, stft.frame_times(len(X), 0), stft.power(X).T
+
+
+def main():
+    import time
+    from scipy import signal
+    from tools.generators import Chirp, WhiteNoise
+
+    fs = 8000
+    rng = np.random.default_rng(0)
+    x = (Chirp(100, 3500, 2.0) + WhiteNoise(0.05, seed=1)).array(5.0)
+
+    # Trozos irregulares contra scipy.signal.spectrogram sobre todo el arreglo
+    stft = STFT(256, 64, fs=fs)
+    partes, pos = [], 0
+    while pos < len(x):
+        L = int(rng.integers(1, 3000))
+        partes.append(stft.update(x[pos:pos + L]))
+        pos += L
+    X = np.concatenate(partes)
+    f, t, P = signal.spectrogram(x, fs, 'hann', 256, 256 - 64, detrend=False)
+    print(f"STFT por trozos vs. scipy: {X.shape[0]} tramas, error relativo "
+          f"{np.max(np.abs(stft.power(X).T - P)) / P.max():.1e}, tiempos {np.max(np.abs(stft.frame_times(len(X), 0) - t)):.1e} s")
+
+    # Reconstrucción: STFT -> ISTFT en trozos
+    for ventana, nperseg, hop in [('hann', 256, 64), ('hamming', 256, 100), (('kaiser', 6.0), 200, 200)]:
+        stft, istft = STFT(nperseg, hop, ventana, fs=fs), ISTFT(nperseg, hop, ventana)
+        salida, pos = [], 0
+        while pos < len(x):
+            L = int(rng.integers(1, 3000))
+            salida.append(istft.update(stft.update(x[pos:pos + L])))
+            pos += L
+        salida.append(istft.flush())
+        y = np.concatenate(salida)
+        interior = slice(nperseg, len(y) - nperseg)
+        print(f"ISTFT {str(ventana):16s} nperseg={nperseg} hop={hop}: error {np.max(np.abs(y[interior] - x[interior])):.1e}")
+
+    # Costo por actualización: constante aunque la captura crezca
+    stft = STFT(256, 128, fs=fs)
+    trozo = np.zeros(128)
+    tiempos = []
+    for minuto in range(3):
+        t0 = time.perf_counter()
+        for _ in range(fs * 60 // 128):
+            stft.update(trozo)
+        tiempos.append((time.perf_counter() - t0) / (fs * 60 // 128))
+    print("µs por actualización de 128 muestras, minuto 1/2/3: "
+          + " / ".join(f"{1e6 * t:.1f}" for t in tiempos))
+
+
+if __name__ == "__main__":
+    main()
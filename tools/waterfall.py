@@ -0,0 +1,326 @@
+# Cascada (waterfall) en tiempo real con blitting
+# Autor: Adrián Silva Palafox
+#
+# Uso (desde la raíz del repositorio):
+#   python -m tools.waterfall                      # señal sintética a 8 kHz
+#   python -m tools.waterfall --port /dev/ttyACM0  # una lectura del ADC por línea
+#   python -m tools.waterfall --benchmark          # fps de dibujo sin ventana
+#
+# Tres etapas desacopladas:
+#   lector (hilo)  ->  cola acotada  ->  STFT (hilo)  ->  imagen  ->  animación
+# - El lector solo lee y encola trozos; si la cola se llena descarta el
+#   trozo más viejo y lo cuenta, nunca se bloquea esperando al dibujo.
+# - El hilo de STFT calcula las columnas nuevas (tools.stft) y las escribe
+#   en WaterfallImage.
+# - La animación (FuncAnimation con blit=True) solo copia la vista actual
+#   de la imagen al artista de imshow y redibuja ese artista.
+#
+# WaterfallImage guarda cada columna dos veces en un buffer de doble ancho;
+# la ventana visible es siempre una rebanada contigua, así que desplazar la
+# imagen cuesta O(columnas nuevas) y no O(ancho). Las columnas se guardan ya
+# cuantizadas a índices de color (uint8) y el dibujo solo consulta la tabla
+# RGBA del mapa de colores: imshow no normaliza ni aplica el colormap en cada
+# cuadro (~15 ms por cuadro contra ~25 ms con datos float en una figura de
+# 1000 x 500 px).
+
+import argparse
+import queue
+import threading
+import time
+
+import numpy as np
+import matplotlib.pyplot as plt
+from matplotlib import cm, colors
+from matplotlib.animation import FuncAnimation
+
+from tools.stft import STFT
+from tools.goertzel import FS
+
+NIVELES = 256  # índices de color (uint8)
+ESPERA_VACIA = 0.005  # s de espera cuando la fuente no trae muestras
+
+
+class WaterfallImage:
+    """
+    Imagen (n_bins x n_columnas) que se desplaza a la izquierda al agregar
+    columnas. La más reciente queda a la derecha.
+    """
+
+    def __init__(self, n_bins, n_columns, fill=0, dtype=np.uint8):
+        self.n_bins = int(n_bins)
+        self.n_columns = int(n_columns)
+        self._buffer = np.full((self.n_bins, 2 * self.n_columns), fill, dtype=dtype)
+        self._pos = 0  # índice de la próxima columna en [0, n_columns)
+        self.columns_done = 0
+        self._lock = threading.Lock()
+
+    def push(self, columnas):
+        """
+        Agrega columnas (m, n_bins), de la más vieja a la más nueva.
+        """
+        columnas = np.asarray(columnas)
+        if len(columnas) > self.n_columns:
+            columnas = columnas[-self.n_columns:]
+        W = self.n_columns
+        with self._lock:
+            for col in columnas:  # m es pequeño: unas pocas columnas por trozo
+                self._buffer[:, self._pos] = col
+                self._buffer[:, self._pos + W] = col
+                self._pos = (self._pos + 1) % W
+            self.columns_done += len(columnas)
+
+    def snapshot(self):
+        """
+        Copia de la imagen visible (n_bins x n_columnas). Se copia bajo el
+        candado para que el dibujo nunca vea una columna a medio escribir.
+        """
+        with self._lock:
+            return self._buffer[:, self._pos:self._pos + self.n_columns].copy()
+
+
+class GeneratorSource:
+    """Fuente sintética: trozos de un tools.generators.Generator al ritmo real."""
+
+    def __init__(self, generator, chunk_size=160, realtime=True):
+        self.generator = generator
+        self.chunk_size = int(chunk_size)
+        self.realtime = realtime
+        self._t0 = None
+        self._leidas = 0
+
+    def read(self):
+        if self.realtime:
+            if self._t0 is None:
+                self._t0 = time.perf_counter()
+            espera = self._t0 + (self._leidas + self.chunk_size) / self.generator.fs - time.perf_counter()
+            if espera > 0:
+                time.sleep(espera)
+        self._leidas += self.chunk_size
+        return self.generator.read(self.chunk_size)
+
+    def close(self):
+        pass
+
+
+class SerialSource:
+    """
+    Fuente serial: una lectura entera del ADC por línea (como el sketch de
+    spectral_analysis.py). Lee todo lo disponible de una vez y conserva la
+    línea incompleta para el siguiente trozo.
+    """
+
+    def __init__(self, port, baudrate=115200, offset=512):
+        import serial  # solo se necesita con un puerto real
+        self._serial = serial.Serial(port, baudrate, timeout=0.05)
+        self.offset = offset
+        self._resto = b''
+
+    def read(self):
+        datos = self._resto + self._serial.read(self._serial.in_waiting or 1)
+        lineas = datos.split(b'\n')
+        self._resto = lineas.pop()
+        valores = []
+        for linea in lineas:
+            try:
+                valores.append(int(linea) - self.offset)
+            except ValueError:
+                pass  # línea dañada
+        return np.array(valores, dtype=float)
+
+    def close(self):
+        self._serial.close()
+
+
+class WaterfallViewer:
+    """
+    Cascada en vivo de una fuente con read() -> trozo de muestras.
+
+    Ejemplo:
+        visor = WaterfallViewer(SerialSource('/dev/ttyACM0'), fs=8000)
+        visor.show()        # arranca los hilos y abre la ventana
+    """
+
+    def __init__(self, source, fs=FS, nperseg=256, hop=128, seconds=10.0, db_range=(-90.0, 0.0),
+                 fps=30, cmap='viridis', queue_size=256):
+        """
+        Parámetros:
+        source: Objeto con read() (trozo de muestras) y close().
+        fs (float): Frecuencia de muestreo (Hz).
+        nperseg, hop (int): Trama y salto de la STFT.
+        seconds (float): Historia visible.
+        db_range (tuple): Escala de colores (dB/Hz).
+        fps (float): Cuadros por segundo pedidos a la animación.
+        cmap (str): Mapa de colores.
+        queue_size (int): Trozos en espera entre el lector y la STFT.
+        """
+        self.source = source
+        self.fs = fs
+        self.fps = fps
+        self.db_range = db_range
+        self.stft = STFT(nperseg, hop, fs=fs)
+        n_columnas = max(1, int(round(seconds * fs / self.stft.hop)))
+        self.image = WaterfallImage(nperseg // 2 + 1, n_columnas)
+        self._norma = colors.Normalize(*db_range)
+        self._cmap = plt.get_cmap(cmap)
+        self._tabla = self._cmap(np.linspace(0, 1, NIVELES), bytes=True)  # (NIVELES, 4) uint8
+        self._cola = queue.Queue(maxsize=queue_size)
+        self._detener = threading.Event()
+        self._hilos = []
+        self._lock = threading.Lock()  # contadores del lector
+        self.dropped_chunks = 0
+        self.samples_read = 0
+        self.frames_drawn = 0
+
+    # --- etapas -----------------------------------------------------------
+    def _leer(self):
+        while not self._detener.is_set():
+            trozo = self.source.read()
+            if len(trozo) == 0:
+                # Fuente sin datos (p. ej. no bloqueante): esperar un poco
+                # en lugar de girar; wait() despierta de inmediato con stop()
+                self._detener.wait(ESPERA_VACIA)
+                continue
+            descartado = False
+            try:
+                self._cola.put_nowait(trozo)
+            except queue.Full:
+                # Se descarta el trozo más viejo: el lector nunca espera
+                try:
+                    self._cola.get_nowait()
+                    descartado = True
+                except queue.Empty:
+                    pass
+                self._cola.put_nowait(trozo)
+            with self._lock:
+                self.samples_read += len(trozo)
+                self.dropped_chunks += descartado
+
+    def _procesar(self):
+        while not self._detener.is_set():
+            try:
+                trozo = self._cola.get(timeout=0.1)
+            except queue.Empty:
+                continue
+            X = self.stft.update(trozo)
+            if len(X):
+                self.image.push(self._indices(10 * np.log10(self.stft.power(X) + 1e-20)))
+
+    def _indices(self, db):
+        """dB -> índice de color en [0, NIVELES)."""
+        nivel = np.clip(self._norma(db), 0.0, 1.0) * (NIVELES - 1)
+        return np.rint(nivel).astype(np.uint8)
+
+    def _rgba(self):
+        return self._tabla[self.image.snapshot()]
+
+    def start(self):
+        """Arranca los hilos de lectura y de STFT."""
+        self._detener.clear()
+        self._hilos = [threading.Thread(target=self._leer, daemon=True),
+                       threading.Thread(target=self._procesar, daemon=True)]
+        for hilo in self._hilos:
+            hilo.start()
+
+    def stop(self):
+        self._detener.set()
+        for hilo in self._hilos:
+            hilo.join(timeout=1.0)
+        self.source.close()
+
+    # --- dibujo -----------------------------------------------------------
+    def _figura(self):
+        fig, ax = plt.subplots(figsize=(10, 5))
+        historia = self.image.n_columns * self.stft.hop / self.fs
+        artista = ax.imshow(self._rgba(), origin='lower', aspect='auto', interpolation='nearest',
+                            extent=(-historia, 0, 0, self.fs / 2), animated=True)
+        ax.set_xlabel('Tiempo (s)')
+        ax.set_ylabel('Frecuencia (Hz)')
+        ax.set_title(f'Cascada en vivo (STFT de {self.stft.nperseg} puntos, fs = {self.fs} Hz)')
+        fig.colorbar(cm.ScalarMappable(self._norma, self._cmap), ax=ax, label='PSD (dB/Hz)')
+        fig.tight_layout()
+        return fig, artista
+
+    def _cuadro(self, _):
+        self._artista.set_data(self._rgba())
+        self.frames_drawn += 1
+        return (self._artista,)
+
+    def show(self):
+        """Arranca la adquisición y abre la ventana (bloquea hasta cerrarla)."""
+        fig, self._artista = self._figura()
+        self.start()
+        self._animacion = FuncAnimation(fig, self._cuadro, interval=1000 / self.fps, blit=True,
+                                        cache_frame_data=False)
+        try:
+            plt.show()
+        finally:
+            self.stop()
+
+    def benchmark(self, seconds=5.0):
+        """
+        Dibuja con blitting sin ventana (backend Agg) tan rápido como se
+        pueda mientras la adquisición corre.
+
+        Retorna:
+        dict: cuadros por segundo, columnas/s y trozos descartados.
+        """
+        fig, artista = self._figura()
+        lienzo = fig.canvas
+        lienzo.draw()
+        fondo = lienzo.copy_from_bbox(artista.axes.bbox)
+        self.start()
+        t0 = time.perf_counter()
+        cuadros = 0
+        while time.perf_counter() - t0 < seconds:
+            lienzo.restore_region(fondo)
+            artista.set_data(self._rgba())
+            artista.axes.draw_artist(artista)
+            lienzo.blit(artista.axes.bbox)
+            cuadros += 1
+        t = time.perf_counter() - t0
+        self.stop()
+        plt.close(fig)
+        with self._lock:
+            muestras, descartados = self.samples_read, self.dropped_chunks
+        return {
+            'fps': cuadros / t,
+            'columnas_s': self.image.columns_done / t,
+            'muestras_s': muestras / t,
+            'descartados': descartados,
+        }
+
+
+def main():
+    from tools.generators import Chirp, MultiTone, WhiteNoise
+
+    parser = argparse.ArgumentParser(description="Cascada (espectrograma) en vivo con blitting.")
+    parser.add_argument('--port', default=None, help="Puerto serial (sin él, señal sintética)")
+    parser.add_argument('--baud', type=int, default=115200)
+    parser.add_argument('--fs', type=float, default=FS)
+    parser.add_argument('--nperseg', type=int, default=256)
+    parser.add_argument('--hop', type=int, default=128)
+    parser.add_argument('--seconds', type=float, default=10.0, help="Historia visible (s)")
+    parser.add_argument('--fps', type=float, default=30)
+    parser.add_argument('--benchmark', action='store_true', help="Medir fps sin abrir ventana")
+    args = parser.parse_args()
+
+    if args.port:
+        fuente = SerialSource(args.port, args.baud)
+    else:
+        senal = Chirp(200, 3800, 4.0, fs=args.fs) + MultiTone([697, 1209], 0.3, fs=args.fs) \
+            + WhiteNoise(0.05, seed=0, fs=args.fs)
+        fuente = GeneratorSource(senal, chunk_size=int(args.fs // 50))
+
+    if args.benchmark:
+        plt.switch_backend('Agg')
+    visor = WaterfallViewer(fuente, args.fs, args.nperseg, args.hop, args.seconds, fps=args.fps)
+    if args.benchmark:
+        r = visor.benchmark()
+        print(f"{r['fps']:.0f} cuadros/s con blitting, {r['columnas_s']:.1f} columnas STFT/s, "
+              f"{r['muestras_s']:.0f} muestras/s leídas, {r['descartados']} trozos descartados")
+    else:
+        visor.show()
+
+
+if __name__ == "__main__":
+    main()
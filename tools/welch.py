@@ -0,0 +1,188 @@
+# Estimador de Welch en flujo continuo con memoria constante
+# Autor: Adrián Silva Palafox
+#
+# WelchAccumulator recibe trozos de cualquier tamaño. Conserva solo la cola
+# que todavía no completa un segmento (menos de nperseg muestras) y el
+# promedio de los periodogramas, así que una captura serial de varias horas
+# o el micrófono en vivo se analizan sin guardar la señal.
+#
+# Con average='mean' el resultado coincide con scipy.signal.welch sobre la
+# señal completa. Con average='exponential' cada segmento nuevo pesa alpha
+# y los anteriores decaen por (1 - alpha): la estimación sigue cambios en el
+# espectro con una memoria de ~1/alpha segmentos.
+
+import numpy as np
+
+from tools.fft import rfft
+from tools.windows import get_window
+
+
+class WelchAccumulator:
+    """
+    PSD de Welch acumulada por trozos.
+
+    Ejemplo:
+        acc = WelchAccumulator(fs=8000, nperseg=512)
+        for trozo in captura:
+            acc.update(trozo)
+            f, Pxx = acc.psd()       # estimación actual en cualquier momento
+    """
+
+    def __init__(self, fs=1.0, nperseg=256, noverlap=None, window='hann', nfft=None,
+                 detrend='constant', average='mean', alpha=0.1, scaling='density'):
+        """
+        Parámetros:
+        fs (float): Frecuencia de muestreo (Hz).
+        nperseg (int): Muestras por segmento.
+        noverlap (int): Solapamiento entre segmentos (por defecto nperseg/2).
+        window (str o tuple): Nombre de ventana de tools.windows, o
+            (nombre, parámetro), p. ej. ('kaiser', 8.6). Se usa periódica,
+            como scipy.signal.welch.
+        nfft (int): Puntos de la FFT (por defecto nperseg).
+        detrend (str): 'constant' (quita la media de cada segmento) o None.
+        average (str): 'mean' (media acumulada) o 'exponential'.
+        alpha (float): Peso de cada segmento nuevo en el promedio exponencial.
+        scaling (str): 'density' (V²/Hz) o 'spectrum' (V²).
+        """
+        self.fs = fs
+        self.nperseg = int(nperseg)
+        self.noverlap = self.nperseg // 2 if noverlap is None else int(noverlap)
+        if not 0 <= self.noverlap < self.nperseg:
+            raise ValueError("noverlap debe estar en [0, nperseg)")
+        self.step = self.nperseg - self.noverlap
+        self.nfft = self.nperseg if nfft is None else int(nfft)
+        if self.nfft < self.nperseg:
+            raise ValueError("nfft no puede ser menor que nperseg")
+        if detrend not in ('constant', None):
+            raise ValueError(f"detrend no soportado: {detrend}")
+        if average not in ('mean', 'exponential'):
+            raise ValueError(f"Promedio no soportado: {average}")
+        if not 0 < alpha <= 1:
+            raise ValueError("alpha debe estar en (0, 1]")
+        if scaling not in ('density', 'spectrum'):
+            raise ValueError(f"Escala no soportada: {scaling}")
+        self.detrend = detrend
+        self.average = average
+        self.alpha = alpha
+        self.scaling = scaling
+
+        nombre, *params = (window,) if isinstance(window, str) else window
+        self.window = get_window(nombre, self.nperseg, *params, sym=False)
+        if scaling == 'density':
+            escala = 1.0 / (fs * np.sum(self.window ** 2))
+        else:
+            escala = 1.0 / np.sum(self.window) ** 2
+        # Espectro de un lado: se duplican los bins que no son DC ni Nyquist
+        self._escala = np.full(self.nfft // 2 + 1, 2 * escala)
+        self._escala[0] = escala
+        if self.nfft % 2 == 0:
+            self._escala[-1] = escala
+        self.reset()
+
+    def reset(self):
+        """Descarta la cola y el promedio."""
+        self._cola = np.zeros(0)
+        self._promedio = np.zeros(self.nfft // 2 + 1)
+        self.n_segments = 0
+        self.n_samples = 0
+
+    @property
+    def frequencies(self):
+        return np.arange(self.nfft // 2 + 1) * self.fs / self.nfft
+
+    def _periodogramas(self, segmentos):
+        if self.detrend == 'constant':
+            segmentos = segmentos - segmentos.mean(axis=-1, keepdims=True)
+        X = rfft(segmentos * self.window, self.nfft, axis=-1)
+        return (X.real ** 2 + X.imag ** 2) * self._escala
+
+    def update(self, chunk):
+        """
+        Agrega muestras y promedia los segmentos que se completan.
+
+        Parámetros:
+        chunk (array): Muestras reales (cualquier tamaño).
+
+        Retorna:
+        int: Segmentos nuevos promediados.
+        """
+        chunk = np.asarray(chunk, dtype=float).ravel()
+        self.n_samples += len(chunk)
+        datos = np.concatenate((self._cola, chunk))
+        m = (len(datos) - self.nperseg) // self.step + 1 if len(datos) >= self.nperseg else 0
+        if m == 0:
+            self._cola = datos
+            return 0
+
+        segmentos = np.lib.stride_tricks.sliding_window_view(datos, self.nperseg)[::self.step][:m]
+        P = self._periodogramas(segmentos)
+        if self.average == 'mean':
+            # Media acumulada: cada segmento pesa 1/(total de segmentos)
+            total = self.n_segments + m
+            self._promedio = self._promedio * (self.n_segments / total) + P.sum(axis=0) / total
+        else:
+            inicio = 0
+            if self.n_segments == 0:
+                self._promedio = P[0]  # el primer segmento inicia el promedio
+                inicio = 1
+            pesos = self.alpha * (1 - self.alpha) ** np.arange(m - inicio - 1, -1, -1)
+            self._promedio = (1 - self.alpha) ** (m - inicio) * self._promedio + pesos @ P[inicio:]
+        self.n_segments += m
+        self._cola = datos[m * self.step:]
+        return m
+
+    def psd(self):
+        """
+        Estimación actual.
+
+        Retorna:
+        tuple: (frecuencias, Pxx). Pxx es cero mientras no haya segmentos.
+        """
+        return self.frequencies, self._promedio.copy()
+
+
+def main():
+    import time
+    from scipy import signal
+    from tools.generators import MultiTone, WhiteNoise, PinkNoise
+
+    fs = 8000
+    rng = np.random.default_rng(0)
+    x = (MultiTone([697, 1209], [1.0, 0.5]) + PinkNoise(0.1, seed=1)).array(30.0)
+
+    # Trozos de tamaño irregular contra scipy.signal.welch sobre todo el arreglo
+    for ventana, nperseg, noverlap, nfft in [('hann', 512, None, None), ('hamming', 256, 64, 1024),
+                                             (('kaiser', 8.6), 1000, 500, None)]:
+        acc = WelchAccumulator(fs, nperseg, noverlap, ventana, nfft)
+        pos = 0
+        while pos < len(x):
+            L = int(rng.integers(1, 5000))
+            acc.update(x[pos:pos + L])
+            pos += L
+        f, P = acc.psd()
+        f_ref, P_ref = signal.welch(x, fs, ventana, nperseg, noverlap, nfft)
+        print(f"{str(ventana):16s} nperseg={nperseg:5d}: {acc.n_segments:4d} segmentos, "
+              f"error relativo {np.max(np.abs(P - P_ref) / P_ref.max()):.1e}")
+
+    # Promedio exponencial: sigue un cambio de tono
+    acc = WelchAccumulator(fs, 512, average='exponential', alpha=0.2)
+    for f0 in (1000, 2000):
+        for trozo in (MultiTone([f0]) + WhiteNoise(0.1, seed=2)).chunks(2.0, chunk_size=800):
+            acc.update(trozo)
+        f, P = acc.psd()
+        print(f"Exponencial tras 2 s de {f0} Hz: pico en {f[np.argmax(P)]:.0f} Hz")
+
+    # Una hora de señal con memoria constante
+    acc = WelchAccumulator(fs, 1024)
+    t0 = time.perf_counter()
+    for trozo in (MultiTone([697, 1209]) + PinkNoise(0.1, seed=3)).chunks(3600.0):
+        acc.update(trozo)
+    t = time.perf_counter() - t0
+    f, P = acc.psd()
+    potencia = np.sum(P) * fs / acc.nfft
+    print(f"Una hora: {acc.n_segments} segmentos en {t:.1f} s ({3600 / t:.0f}x tiempo real), "
+          f"cola de {len(acc._cola)} muestras, potencia {potencia:.3f}")
+
+
+if __name__ == "__main__":
+    main()
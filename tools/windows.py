@@ -0,0 +1,146 @@
+# Ventanas con caché LRU compartido
+# Autor: Adrián Silva Palafox
+#
+# get_window('hann', 1024) construye la ventana una vez y después la
+# entrega desde un caché LRU con llave (nombre, N, parámetros, dtype, sym).
+# Los arreglos son de solo lectura para que nadie modifique la copia
+# compartida; multiplicar por la ventana (x * w) no necesita escribir en ella.
+#
+# Con cada ventana se guardan sus métricas:
+# - ganancia coherente: Σw/N, la amplitud de un tono centrado en su bin;
+# - ENBW: N·Σw²/(Σw)², el ancho de banda equivalente de ruido en bins.
+
+import collections
+import functools
+
+import numpy as np
+from scipy import signal
+
+WINDOW_CACHE_SIZE = 64
+
+# Nombre -> (constructor, número de parámetros)
+_VENTANAS = {
+    'rectangle': (lambda N, sym: signal.windows.boxcar(N, sym=sym), 0),
+    'hann': (lambda N, sym: signal.windows.hann(N, sym=sym), 0),
+    'hamming': (lambda N, sym: signal.windows.hamming(N, sym=sym), 0),
+    'blackman': (lambda N, sym: signal.windows.blackman(N, sym=sym), 0),
+    'kaiser': (lambda N, sym, beta: signal.windows.kaiser(N, beta, sym=sym), 1),
+    'dpss': (lambda N, sym, NW: signal.windows.dpss(N, NW, sym=sym), 1),
+}
+_ALIAS = {'rectangular': 'rectangle', 'boxcar': 'rectangle', 'hanning': 'hann'}
+
+WindowInfo = collections.namedtuple('WindowInfo', ('coherent_gain', 'enbw'))
+WindowInfo.__doc__ = "Ganancia coherente (Σw/N) y ENBW en bins (N·Σw²/(Σw)²)."
+
+
+def _nombre(name):
+    nombre = name.lower()
+    nombre = _ALIAS.get(nombre, nombre)
+    if nombre not in _VENTANAS:
+        raise ValueError(f"Ventana no soportada: {name}. Opciones: {', '.join(sorted(_VENTANAS))}")
+    return nombre
+
+
+def _crear_ventana(nombre, N, params, dtype, sym):
+    constructor, n_params = _VENTANAS[nombre]
+    if len(params) != n_params:
+        raise ValueError(f"La ventana '{nombre}' requiere {n_params} parámetro(s), se dieron {len(params)}")
+    w = np.asarray(constructor(N, sym, *params), dtype=np.float64)
+    suma = np.sum(w)
+    info = WindowInfo(suma / N, N * np.sum(w ** 2) / suma ** 2)
+    w = w.astype(dtype)
+    w.flags.writeable = False
+    return w, info
+
+
+_ventana_cacheada = functools.lru_cache(maxsize=WINDOW_CACHE_SIZE)(_crear_ventana)
+
+
+def _llave(name, N, params, dtype, sym):
+    if int(N) < 1:
+        raise ValueError(f"Longitud de ventana no válida: {N}")
+    return _nombre(name), int(N), tuple(float(p) for p in params), np.dtype(dtype), bool(sym)
+
+
+def get_window(name, N, *params, dtype=np.float64, sym=True):
+    """
+    Ventana de N puntos desde el caché (de solo lectura).
+
+    Parámetros:
+    name (str): 'rectangle', 'hann', 'hamming', 'blackman', 'kaiser' o
+        'dpss' (también 'rectangular', 'boxcar' y 'hanning').
+    N (int): Longitud.
+    params: beta para 'kaiser'; NW (ancho de banda medio) para 'dpss'.
+    dtype: Tipo del arreglo.
+    sym (bool): True para diseño de filtros (simétrica, como
+        signal.windows); False para análisis espectral (periódica).
+
+    Retorna:
+    np.ndarray: Ventana de solo lectura (usar .copy() para modificarla).
+    """
+    return _ventana_cacheada(*_llave(name, N, params, dtype, sym))[0]
+
+
+def window_info(name, N, *params, dtype=np.float64, sym=True):
+    """
+    Ganancia coherente y ENBW de la ventana (la construye si no está en caché).
+
+    Retorna:
+    WindowInfo: (coherent_gain, enbw en bins). En Hz, enbw·fs/N.
+    """
+    return _ventana_cacheada(*_llave(name, N, params, dtype, sym))[1]
+
+
+def window_cache_info():
+    """
+    Estadísticas del caché de ventanas.
+
+    Retorna:
+    namedtuple: (hits, misses, maxsize, currsize), como functools.lru_cache.
+    """
+    return _ventana_cacheada.cache_info()
+
+
+def clear_window_cache():
+    """Elimina todas las ventanas y reinicia los contadores."""
+    _ventana_cacheada.cache_clear()
+
+
+def set_window_cache_size(maxsize):
+    """
+    Cambia el número máximo de ventanas en el caché (vacía el caché actual).
+
+    Parámetros:
+    maxsize (int): Número de ventanas; None para un caché sin límite.
+    """
+    global _ventana_cacheada
+    _ventana_cacheada = functools.lru_cache(maxsize=maxsize)(_crear_ventana)
+
+
+def main():
+    import time
+
+    N = 1024
+    print(f"{'ventana':16s} {'ganancia coherente':>19s} {'ENBW (bins)':>12s}")
+    for nombre, params in [('rectangle', ()), ('hann', ()), ('hamming', ()), ('blackman', ()),
+                           ('kaiser', (8.6,)), ('dpss', (3.0,))]:
+        info = window_info(nombre, N, *params, sym=False)
+        etiqueta = nombre + (f"({params[0]})" if params else "")
+        print(f"{etiqueta:16s} {info.coherent_gain:19.4f} {info.enbw:12.4f}")
+
+    # Costo de reconstruir contra tomar del caché
+    repeticiones = 2000
+    t0 = time.perf_counter()
+    for _ in range(repeticiones):
+        signal.windows.kaiser(N, 8.6)
+    t_directo = (time.perf_counter() - t0) / repeticiones
+    t0 = time.perf_counter()
+    for _ in range(repeticiones):
+        get_window('kaiser', N, 8.6)
+    t_cache = (time.perf_counter() - t0) / repeticiones
+    print(f"\nkaiser({N}): {t_directo * 1e6:.1f} µs por construcción, {t_cache * 1e6:.2f} µs desde el caché")
+    print("Caché de ventanas:", window_cache_info())
+
+
+if __name__ == "__main__":
+    main()
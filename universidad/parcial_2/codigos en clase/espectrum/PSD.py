@@ -14,10 +14,17 @@ Finalmente, se grafican las PSD obtenidas por ambos métodos para comparar los r
 """
 # Autor: Adrián Silva Palafox
 # Fecha: 2025-4-4
+import os
+import sys
 import numpy as np
 import matplotlib.pyplot as plt
 from scipy.signal import welch
 
+# Raíz del repositorio para importar tools
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..', '..')))
+from tools.fft import rfft
+from tools.welch import WelchAccumulator
+
 # Parámetros de la señal
 f0 = 100      # Frecuencia de la señal (Hz)
 fs = 1000     # Frecuencia de muestreo (Hz)
@@ -30,8 +37,8 @@ x = np.cos(2 * np.pi * f0 * n / fs)
 #Nfft = 1024   # Sin zero-padding
 Nfft = 512    # Sin zero-padding
 #Nfft = 256    # Sin zero-padding
-X = np.fft.fft(x, Nfft)
-f = np.fft.fftfreq(Nfft, 1/fs)
+X = rfft(x, Nfft)   # Señal real: solo frecuencias no negativas
+f = np.fft.rfftfreq(Nfft, 1/fs)
 Sxx_period = (1/(fs*N)) * np.abs(X)**2
 f_pos = f[:Nfft//2]
 Sxx_period = Sxx_period[:Nfft//2]
@@ -40,6 +47,12 @@ Sxx_period = Sxx_period[:Nfft//2]
 #    Segmentos de 256 muestras, 50% overlap, ventana Hann
 f_welch, Sxx_welch = welch(x, fs=fs, window='hann', nperseg=256, noverlap=128, nfft=Nfft, scaling='density')
 
+#    Lo mismo por trozos (p. ej. una captura serial que no cabe en memoria)
+acumulador = WelchAccumulator(fs, nperseg=256, noverlap=128, window='hann', nfft=Nfft)
+for inicio in range(0, N, 100):
+    acumulador.update(x[inicio:inicio + 100])
+_, Sxx_welch_trozos = acumulador.psd()
+
 # 3) Cálculo de potencia: integrar PSD
 power_period = np.trapz(Sxx_period, f_pos)
 power_welch = np.trapz(Sxx_welch, f_welch)
@@ -48,6 +61,7 @@ power_time = np.mean(x**2)
 print(f"Potencia vía promedio en tiempo: {power_time:.4f}")
 print(f"Potencia integrando PSD (Periodograma): {power_period:.4f}")
 print(f"Potencia integrando PSD (Welch):      {power_welch:.4f}")
+print(f"Diferencia máxima Welch por trozos:    {np.max(np.abs(Sxx_welch_trozos - Sxx_welch)):.2e}")
 
 # —— Gráficas ——————————————————————————————————————————
 
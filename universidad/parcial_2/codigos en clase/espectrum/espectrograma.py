@@ -1,8 +1,14 @@
+import os
+import sys
 import numpy as np
 import matplotlib.cm as cm
 import matplotlib.pyplot as plt
 from scipy import signal
 
+# Raíz del repositorio para importar tools
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..', '..')))
+from tools.stft import spectrogram
+
 # Parámetros de las señales
 f0 = 2   # Frecuencia de la primera señal (Hz)
 f1 = 20   # Frecuencia de la segunda señal (Hz)
@@ -69,21 +75,25 @@ plt.legend()
 plt.show()
 
 # Gráfica del espectrograma de la señal sumada
+# STFT por lotes (tools.stft), tramas de 256 con 128 de solapamiento
+f_sg, t_sg, P_sg = spectrogram(x1, fs, nperseg=256, noverlap=128)
 plt.figure(figsize=(10, 5))
-plt.specgram(x1, Fs=fs, NFFT=256, noverlap=128, cmap=cm.viridis)  # Ajuste de NFFT y noverlap
+plt.pcolormesh(t_sg, f_sg, 10 * np.log10(P_sg + 1e-12), shading='nearest', cmap=cm.viridis)
 plt.title("Espectrograma de la Señal Sumada")
 plt.xlabel("Tiempo (s)")
 plt.ylabel("Frecuencia (Hz)")
-plt.colorbar(label="Magnitud")
+plt.colorbar(label="PSD (dB/Hz)")
 plt.grid()
 plt.show()
 
 # Gráfica del espectrograma de la señal concatenada
+# STFT por lotes (tools.stft), tramas de 256 con 128 de solapamiento
+f_sg, t_sg, P_sg = spectrogram(x2, fs, nperseg=256, noverlap=128)
 plt.figure(figsize=(10, 5))
-plt.specgram(x2, Fs=fs, NFFT=256, noverlap=128, cmap=cm.viridis)  # Ajuste de NFFT y noverlap
+plt.pcolormesh(t_sg, f_sg, 10 * np.log10(P_sg + 1e-12), shading='nearest', cmap=cm.viridis)
 plt.title("Espectrograma de la Señal Concatenada")
 plt.xlabel("Tiempo (s)")
 plt.ylabel("Frecuencia (Hz)")
-plt.colorbar(label="Magnitud")
+plt.colorbar(label="PSD (dB/Hz)")
 plt.grid()
 plt.show()
\ No newline at end of file
@@ -13,6 +13,8 @@ It also explores the effects of applying different window functions to signals.
 2. **Spectrum Analysis**:
     - Computes and plots the spectrum of the signals using FFT.
     - Visualizes the frequency components of the signals.
+    - Zooms into the 90-115 Hz band with the chirp-Z transform (tools.czt)
+      instead of zero-padding the whole FFT.
 
 3. **Window Functions**:
     - Defines and visualizes common window functions (Rectangular, Hamming, Hanning, Blackman) in the time domain.
@@ -32,10 +34,17 @@ It also explores the effects of applying different window functions to signals.
 - Observe the impact of windowing on the frequency spectrum.
 """
 
+import os
+import sys
+
 import numpy as np
 import matplotlib.pyplot as plt
 from scipy import signal
 
+# Repository root, to import tools
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..')))
+from tools.czt import zoom_fft
+
 # Parameters
 fs = 1000  # Sampling frequency (Hz)
 T = 1      # Signal duration (seconds)
@@ -85,10 +94,41 @@ def plot_spectrum(x, title, N_fft=None):
     plt.axvline(0, color='black', lw=0.5)
     plt.show()
 
+# Function to zoom into a narrow band of the spectrum
+def plot_zoom_spectrum(x, title, f_low=90, f_high=115, M=501):
+    """
+    Plot M high-resolution bins over [f_low, f_high] using the chirp-Z
+    transform, without zero-padding the whole spectrum.
+
+    Parameters:
+    x (array): Input signal
+    title (str): Title of the plot
+    f_low, f_high (float): Band limits (Hz)
+    M (int): Number of bins in the band
+    """
+    f, X = zoom_fft(x, f_low, f_high, M, fs)
+    X_mag = 2 * np.abs(X) / len(x)  # Multiply by 2 for amplitude
+
+    plt.figure(figsize=(10, 6))
+    plt.plot(f, X_mag)
+    plt.title(title)
+    plt.xlabel('Frequency (Hz)')
+    plt.ylabel('Magnitude')
+    plt.grid()
+    plt.xlim(f_low, f_high)
+    plt.ylim(0, 1.1)
+    for f0 in (f1, f2):
+        plt.axvline(f0, color='r', linestyle='--', lw=0.8)
+    plt.show()
+
 # Plot spectra of the signals without windowing
 plot_spectrum(x1, "Spectrum: Close Frequencies")
 plot_spectrum(x2, "Spectrum: Different Amplitudes")
 
+# Zoom into 90-115 Hz (0.05 Hz per bin)
+plot_zoom_spectrum(x1, "Zoom (chirp-Z): Close Frequencies")
+plot_zoom_spectrum(x2, "Zoom (chirp-Z): Different Amplitudes")
+
 # Define window functions
 windows = {
     'Rectangular': np.ones(N),
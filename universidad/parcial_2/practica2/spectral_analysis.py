@@ -23,6 +23,17 @@ import matplotlib.pyplot as plt
 from scipy import signal
 from time import sleep
 import os
+import sys
+
+# Raíz del repositorio para importar tools
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..')))
+from tools.fft import rfft
+from tools.windows import get_window
+
+# Windows known to tools.windows; the parametric ones need a tuple,
+# ('kaiser', beta) or ('dpss', NW)
+_PLAIN_WINDOWS = ('rectangle', 'rectangular', 'boxcar', 'hann', 'hanning', 'hamming', 'blackman')
+_PARAMETRIC_WINDOWS = ('kaiser', 'dpss')
 
 # 128 256 512 1024
 
@@ -59,6 +70,33 @@ def daq(port='/dev/ttyACM0', buffer_size=1024):
         print(f"Error connection to mcu: {e}")
         return None
     
+def window_matrix(N, window_types):
+    """
+    Function to build the window functions stacked as rows.
+    The windows come from the shared cache in tools.windows.
+    Args:
+        N (int): Window length.
+        window_types (list): Window names ('rectangle', 'hann'/'hanning', 'hamming', 'blackman')
+            or (name, parameter) tuples such as ('kaiser', 8.6) or ('dpss', 3.0).
+    Returns:
+        np.ndarray: (W x N) array, one window per row.
+    Raises:
+        ValueError: 'kaiser'/'dpss' without a parameter, wrong parameters
+        or invalid N. Unknown names fall back to a rectangle window.
+    """
+    rows = []
+    for window_type in window_types:
+        name, *params = (window_type,) if isinstance(window_type, str) else window_type
+        # Only an unknown name falls back to a rectangle; bad parameters or
+        # lengths raise from get_window
+        if name.lower() in _PARAMETRIC_WINDOWS and not params:
+            raise ValueError(f"Window '{name}' needs a parameter: ('kaiser', beta) or ('dpss', NW)")
+        if name.lower() not in _PLAIN_WINDOWS + _PARAMETRIC_WINDOWS:
+            print(f"Unknown window type: {window_type}. Using rectangle window.")
+            name, params = 'rectangle', []
+        rows.append(get_window(name, N, *params))
+    return np.array(rows).reshape(len(window_types), N)
+
 def windos(data, window_type='rectangle'):
     """
     Function to apply a window function to the data.
@@ -68,67 +106,72 @@ def windos(data, window_type='rectangle'):
     Returns:
         np.ndarray: Windowed data.
     """
-    N = len(data)
+    return data * window_matrix(len(data), [window_type])[0]
 
-    if window_type.lower() == 'rectangle':
-        return data  # Rectangle window does not change the data
-    elif window_type.lower() == 'hann':  # Updated from 'hanning' to 'hann'
-        return data * signal.windows.hann(N)
-    elif window_type.lower() == 'hamming':
-        return data * signal.windows.hamming(N)
-    elif window_type.lower() == 'blackman':
-        return data * signal.windows.blackman(N)
-    else:
-        print(f"Unknown window type: {window_type}. Using rectangle window.")
-        return data
-    
-def espectra_analysis(data, fs, window_type='rectangle'):
+def espectra_analysis_multi(data, fs, window_types):
     """
-    Function to perform spectral analysis on the given data.
+    Function to perform spectral analysis with several windows in one pass.
+    The mean is removed once, the windowed copies are stacked into a
+    (W x N) array and a single batched real FFT transforms all of them.
     Args:
         data (np.ndarray): The data to analyze.
         fs (int): Sampling frequency.
-        window_type (str): Type of window to apply ('rectangle', 'hanning', 'hamming', 'blackman').
+        window_types (list): Windows to apply ('rectangle', 'hann', 'hamming', 'blackman').
     Returns:
-        tuple: Frequencies and corresponding FFT magnitudes.
+        tuple: Shared frequency axis (N//2,) and magnitudes (W x N//2).
     """
+    data = np.asarray(data, dtype=float)
     data = data - np.mean(data) # remove dc component
+    N = len(data)
 
-    # Apply window function
-    windowed_data = windos(data, window_type)
-
-    # Compute the FFT
-    N = len(windowed_data)
-    fft_result = np.fft.fft(windowed_data)
-    fft_magnitude = np.abs(fft_result)/N  # Take the positive frequencies and normalize
+    # One row per window, one batched FFT along the rows
+    windowed_data = window_matrix(N, window_types) * data
+    fft_magnitude = np.abs(rfft(windowed_data, axis=-1))/N  # Normalize
 
     # Frequency axis
-    freq = np.fft.fftfreq(N, 1/fs)
+    freq = np.fft.rfftfreq(N, 1/fs)
 
-    return freq[:N//2], 2*fft_magnitude[:N//2]  # Return only the positive frequencies
+    return freq[:N//2], 2*fft_magnitude[:, :N//2]  # Return only the positive frequencies
 
-def safe_rslt (data, fs, name_file = 'espectra_results'):
-    if not os.path.exists('results'):
-        os.makedirs('results')
-    
-    # Apply different window types and save results
-    window_types = ['rectangle', 'hanning', 'hamming', 'blackman']
+def espectra_analysis(data, fs, window_type='rectangle'):
+    """
+    Function to perform spectral analysis on the given data.
+    Args:
+        data (np.ndarray): The data to analyze.
+        fs (int): Sampling frequency.
+        window_type (str): Type of window to apply ('rectangle', 'hanning', 'hamming', 'blackman').
+    Returns:
+        tuple: Frequencies and corresponding FFT magnitudes.
+    """
+    freq, fft_magnitude = espectra_analysis_multi(data, fs, [window_type])
+    return freq, fft_magnitude[0]
 
+def plot_spectra(freq, magnitudes, window_types):
+    """
+    Function to plot one spectrum per window in a 2 x 2 grid.
+    """
     plt.figure(figsize=(10, 6))
 
-    for i, window in  enumerate(window_types,1):
-        # spectral analysis for each window type
-        freq, fft_magnitude = espectra_analysis(data, fs, window)
-
-        # Plotting
+    for i, (window, fft_magnitude) in enumerate(zip(window_types, magnitudes), 1):
         plt.subplot(2, 2, i)
         plt.plot(freq, fft_magnitude)
         plt.title(f'FFT with {window} window')
         plt.xlabel('Frequency (Hz)')
         plt.ylabel('Magnitude')
         plt.grid()
-    
+
     plt.tight_layout()
+
+def safe_rslt (data, fs, name_file = 'espectra_results'):
+    if not os.path.exists('results'):
+        os.makedirs('results')
+    
+    # Apply different window types and save results
+    window_types = ['rectangle', 'hanning', 'hamming', 'blackman']
+
+    # All windows in a single pass
+    freq, magnitudes = espectra_analysis_multi(data, fs, window_types)
+    plot_spectra(freq, magnitudes, window_types)
     plt.savefig(f'results/{name_file}.png')
     plt.close()
 
@@ -143,20 +186,8 @@ def plot_spectral_analysis(data, fs, window_types, save_path=None):
         window_types (list): List of window types to analyze.
         save_path (str): Path to save the plot (optional).
     """
-    plt.figure(figsize=(10, 6))
-
-    for i, window in enumerate(window_types, 1):
-        freq, fft_magnitude = espectra_analysis(data, fs, window)
-
-        # Plotting
-        plt.subplot(2, 2, i)
-        plt.plot(freq, fft_magnitude)
-        plt.title(f'FFT with {window} window')
-        plt.xlabel('Frequency (Hz)')
-        plt.ylabel('Magnitude')
-        plt.grid()
-
-    plt.tight_layout()
+    freq, magnitudes = espectra_analysis_multi(data, fs, window_types)
+    plot_spectra(freq, magnitudes, window_types)
 
     if save_path:
         plt.savefig(save_path)
@@ -1,8 +1,14 @@
 # Importación de librerías necesarias
+import os
+import sys
 import numpy as np
 import matplotlib.pyplot as plt
 from scipy import signal
 
+# Raíz del repositorio para importar tools
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..', '..', '..')))
+from tools.dconv import dconv_bank
+
 # Parámetros de simulación
 fs = 1000  # Frecuencia de muestreo (Hz)
 fc = 100   # Frecuencia de corte (Hz)
@@ -107,6 +113,10 @@ t = np.arange(0, 1, 1/fs)
 f1, f2, f3 = 50, 150, 300  # Frecuencias de componentes (Hz)
 x = np.sin(2*np.pi*f1*t) + 0.5*np.sin(2*np.pi*f2*t) + 0.25*np.sin(2*np.pi*f3*t)
 
+# Filtrar la señal con todo el banco de una vez (una FFT por señal y por
+# filtro); se recorta a len(x) para obtener lo mismo que lfilter(h, 1, x)
+salidas = dict(zip(filtros, dconv_bank(x, np.array(list(filtros.values())))[0, :, :len(x)]))
+
 # Graficar la señal original en el dominio del tiempo
 plt.figure(figsize=(12, 6))
 plt.subplot(3, 1, 1)
@@ -117,10 +127,9 @@ plt.ylabel('Amplitud')
 plt.grid(True)
 
 # Aplicar diferentes filtros y comparar resultados en el dominio del tiempo
-for i, (nombre, h) in enumerate(filtros.items(), 2):
+for i, (nombre, y) in enumerate(salidas.items(), 2):
     if i > 3:  # Mostrar solo dos filtros por claridad
         break
-    y = signal.lfilter(h, 1, x)
     plt.subplot(3, 1, i)
     plt.plot(t[:200], y[:200])
     plt.title(f'Señal Filtrada con Ventana {nombre}')
@@ -146,10 +155,9 @@ plt.grid(True)
 plt.xlim([0, fs/2])
 
 # FFT de las señales filtradas
-for i, (nombre, h) in enumerate(filtros.items(), 2):
+for i, (nombre, y) in enumerate(salidas.items(), 2):
     if i > 3:  # Mostrar solo dos filtros por claridad
         break
-    y = signal.lfilter(h, 1, x)
     Y = np.fft.fft(y)
     plt.subplot(3, 1, i)
     plt.plot(freq[:len(freq)//2], np.abs(Y[:len(Y)//2])/len(Y))
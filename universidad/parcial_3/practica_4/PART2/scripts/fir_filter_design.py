@@ -3,6 +3,11 @@ import numpy as np
 import pandas as pd
 from scipy import signal
 import os
+import sys
+
+# Raíz del repositorio para importar tools
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..', '..', '..')))
+from tools.windows import get_window
 
 
 # Funciones para diseño de filtros FIR
@@ -30,21 +35,12 @@ def ideal_lp_filter(cutoff, M):
 def apply_window(h, window_type='rectangular'):
     """
     Aplica una ventana específica a los coeficientes del filtro
+    (la ventana se toma del caché de tools.windows)
     """
-    M = len(h) - 1
-
-    if window_type.lower() == 'rectangular':
-        window = np.ones(M + 1)
-    elif window_type.lower() == 'hanning':
-        window = signal.windows.hann(M + 1)
-    elif window_type.lower() == 'hamming':
-        window = signal.windows.hamming(M + 1)
-    elif window_type.lower() == 'blackman':
-        window = signal.windows.blackman(M + 1)
-    else:
+    if window_type.lower() not in ('rectangular', 'hanning', 'hamming', 'blackman'):
         raise ValueError(f"Tipo de ventana '{window_type}' no reconocido")
 
-    return h * window
+    return h * get_window(window_type, len(h))
 
 
 def freqz_normalized(h, fs=1.0, nfft=4096):
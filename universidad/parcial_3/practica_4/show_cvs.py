@@ -1,9 +1,15 @@
 # Importación de librerías necesarias
+import os
+import sys
 import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
 from scipy import signal
 
+# Raíz del repositorio para importar tools
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..')))
+from tools.dconv import dconv_bank
+
 # Rutas de los archivos CSV
 file_paths = [
     '/media/adrian/sd_linux/sem8/DSP/parcial_3/practica_4/PART1/sampled_signals/Senoidal_100Hz.csv',
@@ -74,6 +80,12 @@ for i, file_path in enumerate(file_paths):
     n_samples = data['Muestra'].values  # Índices de las muestras
     signal_values = data['Valor'].values  # Valores de la señal
 
+    # Filtrar con los 15 filtros en una sola operación (equivale a lfilter(h, 1, x))
+    claves = [(tipo, nombre) for tipo, filtros_tipo in filtros.items() for nombre in filtros_tipo]
+    banco = np.array([filtros[tipo][nombre] for tipo, nombre in claves])
+    salidas = dconv_bank(signal_values, banco)[0, :, :len(signal_values)]
+    filtradas = dict(zip(claves, salidas))
+
     # Crear mosaico para señales originales y filtradas
     num_filtros = max(len(filtros['Pasa-Bajas']), len(filtros['Pasa-Altas']), len(filtros['Pasa-Bandas']))
     fig, axs = plt.subplots(4, num_filtros, figsize=(15, 10))
@@ -90,7 +102,7 @@ for i, file_path in enumerate(file_paths):
     # Aplicar filtros y graficar señales filtradas
     for j, (tipo, filtros_tipo) in enumerate(filtros.items()):
         for k, (nombre, h) in enumerate(filtros_tipo.items()):
-            filtered_signal = signal.lfilter(h, 1, signal_values)
+            filtered_signal = filtradas[(tipo, nombre)]
             axs[j + 1, k].plot(n_samples, filtered_signal, label=f'{tipo} con {nombre}', alpha=0.7)
             axs[j + 1, k].set_title(f'{tipo} ({nombre})')
             axs[j + 1, k].set_xlabel('Muestras')
@@ -118,7 +130,7 @@ for i, file_path in enumerate(file_paths):
     # FFT de las señales filtradas
     for j, (tipo, filtros_tipo) in enumerate(filtros.items()):
         for k, (nombre, h) in enumerate(filtros_tipo.items()):
-            filtered_signal = signal.lfilter(h, 1, signal_values)
+            filtered_signal = filtradas[(tipo, nombre)]
             Y = np.fft.fft(filtered_signal)
             axs[j + 1, k].plot(freq[:len(freq)//2], 20 * np.log10(np.abs(Y[:len(Y)//2]) + 1e-10), label=f'{tipo} con {nombre}', alpha=0.7)
             axs[j + 1, k].set_title(f'{tipo} ({nombre})')
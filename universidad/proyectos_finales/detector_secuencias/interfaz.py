@@ -4,19 +4,26 @@ import matplotlib.pyplot as plt
 from matplotlib.animation import FuncAnimation
 import time
 
+from lector import SerialReader
+
 # === CONFIGURACIÓN SERIAL ===
 PUERTO = '/dev/ttyACM0'   # Cambiar si es diferente
 BAUDIOS = 115200
 
 # === Conexión serial ===
 try:
-    ser = serial.Serial(PUERTO, BAUDIOS, timeout=1)
+    # Timeout corto para que el hilo lector pueda detenerse al cerrar
+    ser = serial.Serial(PUERTO, BAUDIOS, timeout=0.1)
     print(f"Conectado a {PUERTO}")
     time.sleep(2)
 except Exception as e:
     print(f"Error al conectar: {e}")
     exit()  # Salir si no se puede conectar al puerto serial
 
+# Lectura, tramas y máquina de comandos en su propio hilo
+lector = SerialReader(ser, eco=True)
+lector.start()
+
 # === DTMF FRECUENCIAS ===
 low_freq = [697, 770, 852, 941]
 high_freq = [1209, 1336, 1477, 1633]
@@ -46,58 +53,21 @@ texto_comando = axs[2].text(0.5, 0.5, "", fontsize=20, ha='center', va='center',
 axs[2].axis('off')
 axs[2].set_title('Acción / Comando')
 
-# Estado
-comando_actual = ""
-
 # === Función de actualización ===
 def actualizar(frame):
-    global comando_actual
-    global energias
-
-    if ser and ser.in_waiting:
-        try:
-            # Leer línea del puerto serial
-            linea = ser.readline().decode(errors='ignore').strip()
-            print(f"Datos recibidos: {linea}")  # Depuración
-
-            # Procesar "Tecla detectada"
-            if linea.startswith("Tecla detectada:"):
-                partes = linea.split(": ")
-                if len(partes) > 1:
-                    tecla = partes[1]
-                    texto_tecla.set_text(tecla)
+    # Solo consume el estado más reciente; la lectura ocurre en el hilo
+    estado = lector.snapshot()
 
-                    # Actualizar comando actual
-                    if tecla == '*':
-                        comando_actual = ""
-                    elif tecla == '#':
-                        texto_comando.set_text(f"Secuencia completa: {comando_actual}")
-                    else:
-                        comando_actual += tecla
-
-            # Procesar "Energía de filtros"
-            elif linea.startswith("Energía de filtros:"):
-                for i in range(8):
-                    e_line = ser.readline().decode(errors='ignore').strip()
-                    partes = e_line.split(" Hz: ")
-                    if len(partes) > 1:
-                        try:
-                            energias[i] = float(partes[1])
-                        except ValueError:
-                            energias[i] = 0
-                # Actualizar las barras de energía
-                for i, bar in enumerate(barras):
-                    bar.set_height(energias[i])
-
-            # Procesar otros comandos (LED, ACCESO, etc.)
-            elif "LED" in linea or "ACCESO" in linea:
-                texto_comando.set_text(linea)
-
-        except Exception as e:
-            print(f"Error al leer: {e}")
-    else:
+    if estado['error']:
+        print(f"Error al leer: {estado['error']}")
+    if estado['last_rx'] is None or time.time() - estado['last_rx'] > 2:
         print("No se están recibiendo datos del Arduino.")  # Advertencia si no hay datos
 
+    for bar, energia in zip(barras, estado['energies']):
+        bar.set_height(energia)
+    texto_tecla.set_text(estado['key'])
+    texto_comando.set_text(estado['message'])
+
     return list(barras) + [texto_tecla, texto_comando]
 
 # Animación
@@ -110,6 +80,7 @@ try:
 except KeyboardInterrupt:
     print("Interfaz cerrada")
 finally:
+    lector.stop()
     if ser and ser.is_open:
         ser.close()
         print("Puerto cerrado")
\ No newline at end of file
@@ -0,0 +1,229 @@
+# Lector serial del detector DTMF en su propio hilo
+# Autor: Adrián Silva Palafox
+#
+# Separa la lectura del puerto de la interfaz gráfica:
+# - FrameParser convierte líneas del Arduino en eventos tipados
+#   (KeyDetected, FilterEnergies, Action). La trama de energías ocupa 9
+#   líneas y se arma línea por línea, sin bloquear en readline().
+# - CommandStateMachine acumula el comando entre '*' y '#'.
+# - SerialReader corre ambos en un hilo que lee el puerto sin pausa y
+#   publica el estado más reciente. La animación solo llama a snapshot(),
+#   así que la lectura ya no depende de la tasa de redibujado.
+
+import threading
+import time
+from collections import deque
+
+N_FILTROS = 8
+
+
+class KeyDetected:
+    """Línea 'Tecla detectada: <tecla>'."""
+
+    __slots__ = ('key', 'time')
+
+    def __init__(self, key, time):
+        self.key = key
+        self.time = time
+
+    def __repr__(self):
+        return f"KeyDetected({self.key!r}, t={self.time:.3f})"
+
+
+class FilterEnergies:
+    """Trama 'Energía de filtros:' seguida de 8 líneas '<f> Hz: <energía>'."""
+
+    __slots__ = ('freqs', 'energies', 'time')
+
+    def __init__(self, freqs, energies, time):
+        self.freqs = freqs
+        self.energies = energies
+        self.time = time
+
+    def __repr__(self):
+        return f"FilterEnergies({self.energies}, t={self.time:.3f})"
+
+
+class Action:
+    """Mensaje de acción del firmware (líneas con LED o ACCESO)."""
+
+    __slots__ = ('text', 'time')
+
+    def __init__(self, text, time):
+        self.text = text
+        self.time = time
+
+    def __repr__(self):
+        return f"Action({self.text!r}, t={self.time:.3f})"
+
+
+class FrameParser:
+    """
+    Convierte líneas de texto en eventos. Conserva el estado de una trama de
+    energías incompleta entre llamadas.
+    """
+
+    def __init__(self, n_filtros=N_FILTROS):
+        self.n_filtros = n_filtros
+        self._energias = None  # trama de energías en curso
+        self._freqs = None
+
+    def feed(self, linea, t=None):
+        """
+        Parámetros:
+        linea (str): Línea sin el salto final.
+        t (float): Instante de llegada (por defecto time.time()).
+
+        Retorna:
+        list: Eventos completados por esta línea (0 o 1).
+        """
+        t = time.time() if t is None else t
+        linea = linea.strip()
+
+        if self._energias is not None:
+            partes = linea.split(" Hz: ")
+            if len(partes) == 2:
+                try:
+                    self._freqs.append(float(partes[0]))
+                    self._energias.append(float(partes[1]))
+                except ValueError:
+                    self._freqs.append(0.0)
+                    self._energias.append(0.0)
+                if len(self._energias) < self.n_filtros:
+                    return []
+                evento = FilterEnergies(self._freqs, self._energias, t)
+                self._energias = self._freqs = None
+                return [evento]
+            # Trama truncada: se descarta y la línea se procesa normalmente
+            self._energias = self._freqs = None
+
+        if linea.startswith("Tecla detectada:"):
+            partes = linea.split(": ", 1)
+            if len(partes) > 1 and partes[1]:
+                return [KeyDetected(partes[1], t)]
+        elif linea.startswith("Energía de filtros:"):
+            self._energias, self._freqs = [], []
+        elif "LED" in linea or "ACCESO" in linea:
+            return [Action(linea, t)]
+        return []
+
+
+class CommandStateMachine:
+    """
+    Secuencia de teclas entre '*' (inicio) y '#' (fin), como commandBuffer
+    en el firmware.
+    """
+
+    def __init__(self):
+        self.current = ""     # comando en captura
+        self.completed = ""   # último comando terminado con '#'
+
+    def apply(self, tecla):
+        """
+        Avanza con una tecla.
+
+        Retorna:
+        str: El comando completo si la tecla fue '#', si no None.
+        """
+        if tecla == '*':
+            self.current = ""
+        elif tecla == '#':
+            self.completed = self.current
+            return self.completed
+        else:
+            self.current += tecla
+        return None
+
+
+class SerialReader(threading.Thread):
+    """
+    Hilo que lee el puerto, interpreta las tramas y mantiene el estado.
+
+    Ejemplo:
+        lector = SerialReader(serial.Serial(PUERTO, BAUDIOS, timeout=0.1))
+        lector.start()
+        estado = lector.snapshot()   # desde la animación
+        lector.stop()
+    """
+
+    def __init__(self, puerto, historial=100, eco=False):
+        """
+        Parámetros:
+        puerto: Objeto con readline() (p. ej. serial.Serial con timeout).
+        historial (int): Eventos recientes que se conservan.
+        eco (bool): Imprime cada línea recibida (depuración).
+        """
+        super().__init__(daemon=True)
+        self.puerto = puerto
+        self.eco = eco
+        self.parser = FrameParser()
+        self.comandos = CommandStateMachine()
+        self._lock = threading.Lock()
+        self._detener = threading.Event()
+        self._eventos = deque(maxlen=historial)
+        self._estado = {
+            'energies': [0.0] * N_FILTROS,
+            'key': "",
+            'command': "",
+            'message': "",
+            'lines': 0,
+            'frames': 0,
+            'last_rx': None,
+            'error': "",
+        }
+
+    def handle_line(self, linea, t=None):
+        """Procesa una línea y actualiza el estado (también sirve sin hilo)."""
+        eventos = self.parser.feed(linea, t)
+        with self._lock:
+            self._estado['lines'] += 1
+            self._estado['last_rx'] = time.time() if t is None else t
+            self._estado['error'] = ""
+            for ev in eventos:
+                self._eventos.append(ev)
+                if isinstance(ev, KeyDetected):
+                    self._estado['key'] = ev.key
+                    completo = self.comandos.apply(ev.key)
+                    self._estado['command'] = self.comandos.current
+                    if completo is not None:
+                        self._estado['message'] = f"Secuencia completa: {completo}"
+                elif isinstance(ev, FilterEnergies):
+                    self._estado['energies'] = list(ev.energies)
+                    self._estado['frames'] += 1
+                else:
+                    self._estado['message'] = ev.text
+        return eventos
+
+    def run(self):
+        while not self._detener.is_set():
+            try:
+                crudo = self.puerto.readline()
+            except Exception as e:
+                with self._lock:
+                    self._estado['error'] = f"{type(e).__name__}: {e}"
+                time.sleep(0.1)
+                continue
+            if not crudo:
+                continue  # timeout sin datos
+            linea = crudo.decode(errors='ignore').strip()
+            if self.eco:
+                print(f"Datos recibidos: {linea}")
+            self.handle_line(linea)
+
+    def stop(self, timeout=1.0):
+        """Detiene el hilo (espera a que termine la lectura en curso)."""
+        self._detener.set()
+        if self.is_alive():
+            self.join(timeout)
+
+    def snapshot(self):
+        """Copia del estado más reciente."""
+        with self._lock:
+            estado = dict(self._estado)
+            estado['energies'] = list(estado['energies'])
+            return estado
+
+    def recent_events(self):
+        """Eventos recientes, del más antiguo al más nuevo."""
+        with self._lock:
+            return list(self._eventos)
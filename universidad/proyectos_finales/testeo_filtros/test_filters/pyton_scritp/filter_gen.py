@@ -2,8 +2,14 @@ import numpy as np
 import matplotlib.pyplot as plt
 from scipy import signal
 import os
+import sys
 from datetime import datetime
 
+# Raíz del repositorio para importar tools
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..', '..', '..')))
+from tools.czt import zoom_freqz
+from tools.channelizer import dtmf_channelizer, band_isolation
+
 class DTMFFilterGenerator:
     """Generador de filtros digitales para detección DTMF en PlatformIO"""
     
@@ -13,6 +19,8 @@ class DTMFFilterGenerator:
             'low': [697, 770, 852, 941],      # Frecuencias bajas
             'high': [1209, 1336, 1477, 1633] # Frecuencias altas
         }
+        self.zoom_span = 200     # Hz alrededor de la frecuencia central
+        self.zoom_points = 512   # Puntos de la respuesta con zoom (CZT)
     
     def design_fir_bandpass(self, center_freq, bandwidth, order=101, window='hamming'):
         """
@@ -44,7 +52,8 @@ class DTMFFilterGenerator:
         b = signal.firwin(order, [low_cutoff, high_cutoff], 
                          window=window, pass_zero=False)
         
-        # Calcular respuesta en frecuencia
+        # Respuesta de banda completa (magnitud lineal y en dB); la fase
+        # alrededor del tono se calcula aparte con zoom_response()
         w, h = signal.freqz(b, 1, worN=8000, fs=self.fs)
         
         return b, (w, h)
@@ -83,14 +92,47 @@ class DTMFFilterGenerator:
         else:
             raise ValueError("Tipo de filtro no válido. Use: 'butter', 'cheby1', 'cheby2', 'ellip'")
         
-        # Calcular respuesta en frecuencia
+        # Respuesta de banda completa (magnitud lineal y en dB); la fase
+        # alrededor del tono se calcula aparte con zoom_response()
         w, h = signal.freqz(b, a, worN=8000, fs=self.fs)
         
         return b, a, (w, h)
     
-    def analyze_filter_response(self, freq_response, center_freq, title="Filtro"):
-        """Analiza y grafica la respuesta en frecuencia del filtro"""
+    def zoom_response(self, b, a, center_freq, span=None, points=None):
+        """
+        Respuesta en frecuencia solo en center_freq ± span (transformada chirp-Z)
+        
+        Args:
+            b, a: Coeficientes del filtro (a = 1 para FIR)
+            center_freq: Frecuencia central en Hz
+            span: Semiancho de la banda en Hz (por defecto self.zoom_span)
+            points: Número de puntos (por defecto self.zoom_points)
+        
+        Returns:
+            tuple: (frecuencias, respuesta_compleja)
+        """
+        span = self.zoom_span if span is None else span
+        points = self.zoom_points if points is None else points
+        f1 = max(0.0, center_freq - span)
+        f2 = min(self.fs / 2, center_freq + span)
+        return zoom_freqz(b, a, f1, f2, points, fs=self.fs)
+    
+    def analyze_filter_response(self, freq_response, center_freq, title="Filtro", coeffs=None):
+        """
+        Analiza y grafica la respuesta en frecuencia del filtro
+        
+        Args:
+            freq_response: (w, h) de banda completa
+            center_freq: Frecuencia central en Hz
+            title: Título de las gráficas
+            coeffs: (b, a) opcional; si se da, la fase alrededor del tono
+                se grafica con zoom_response() en lugar de freq_response
+        """
         w, h = freq_response
+        if coeffs is not None:
+            w_zoom, h_zoom = self.zoom_response(coeffs[0], coeffs[1], center_freq)
+        else:
+            w_zoom, h_zoom = w, h
         
         # Crear figura con subplots
         fig, (ax1, ax2, ax3) = plt.subplots(3, 1, figsize=(12, 10))
@@ -117,7 +159,7 @@ class DTMFFilterGenerator:
         ax2.set_ylim(-80, 5)
         
         # Respuesta en fase
-        ax3.plot(w, np.unwrap(np.angle(h)), 'g-', linewidth=2)
+        ax3.plot(w_zoom, np.unwrap(np.angle(h_zoom)), 'g-', linewidth=2)
         ax3.set_title(f'{title} - Respuesta en Fase')
         ax3.set_xlabel('Frecuencia (Hz)')
         ax3.set_ylabel('Fase (radianes)')
@@ -237,6 +279,7 @@ const float b_coeffs[IIR_ORDER + 1] = {
         if filter_type.lower() == 'fir':
             # Generar filtro FIR
             coeffs, freq_resp = self.design_fir_bandpass(center_freq, bandwidth, order, window)
+            filter_coeffs = (coeffs, 1)
             
             # Generar archivo header
             header_content = self.generate_fir_header(coeffs, center_freq, order, window)
@@ -248,6 +291,7 @@ const float b_coeffs[IIR_ORDER + 1] = {
         elif filter_type.lower() == 'iir':
             # Generar filtro IIR
             b_coeffs, a_coeffs, freq_resp = self.design_iir_bandpass(center_freq, bandwidth, order, iir_type)
+            filter_coeffs = (b_coeffs, a_coeffs)
             
             # Generar archivo header
             header_content = self.generate_iir_header(b_coeffs, a_coeffs, center_freq, order, iir_type)
@@ -268,7 +312,7 @@ const float b_coeffs[IIR_ORDER + 1] = {
         
         # Mostrar análisis si se solicita
         if show_plot:
-            fig = self.analyze_filter_response(freq_resp, center_freq, title)
+            fig = self.analyze_filter_response(freq_resp, center_freq, title, filter_coeffs)
             plot_filename = os.path.join(output_dir, f"{filter_type}_{center_freq}hz_response.png")
             fig.savefig(plot_filename, dpi=300, bbox_inches='tight')
             print(f"✓ Gráfica guardada: {plot_filename}")
@@ -283,7 +327,8 @@ const float b_coeffs[IIR_ORDER + 1] = {
         
         Args:
             bandwidth: Ancho de banda en Hz
-            filter_type: 'fir', 'iir', o 'both'
+            filter_type: 'fir', 'iir', 'both' o 'channelizer' (un solo
+                canalizador polifásico en lugar de 8 pasabanda)
             order: Orden del filtro
             window: Ventana para FIR
             iir_type: Tipo de filtro IIR
@@ -307,22 +352,27 @@ const float b_coeffs[IIR_ORDER + 1] = {
         all_frequencies = self.dtmf_frequencies['low'] + self.dtmf_frequencies['high']
         generated_files = []
         
-        for freq in all_frequencies:
-            print(f"Procesando {freq} Hz...")
-            
-            if filter_type in ['fir', 'both']:
-                filepath = self.generate_single_filter(
-                    freq, bandwidth, 'fir', order, window, 
-                    output_dir=output_dir, show_plot=False
-                )
-                generated_files.append(filepath)
-            
-            if filter_type in ['iir', 'both']:
-                filepath = self.generate_single_filter(
-                    freq, bandwidth, 'iir', order, window, iir_type,
-                    output_dir=output_dir, show_plot=False
-                )
-                generated_files.append(filepath)
+        if filter_type == 'channelizer':
+            # Un solo canalizador reemplaza a los 8 pasabanda
+            self.compare_channelizer(bandwidth, order)
+            generated_files.append(self.generate_channelizer_header(output_dir=output_dir))
+        else:
+            for freq in all_frequencies:
+                print(f"Procesando {freq} Hz...")
+                
+                if filter_type in ['fir', 'both']:
+                    filepath = self.generate_single_filter(
+                        freq, bandwidth, 'fir', order, window, 
+                        output_dir=output_dir, show_plot=False
+                    )
+                    generated_files.append(filepath)
+                
+                if filter_type in ['iir', 'both']:
+                    filepath = self.generate_single_filter(
+                        freq, bandwidth, 'iir', order, window, iir_type,
+                        output_dir=output_dir, show_plot=False
+                    )
+                    generated_files.append(filepath)
         
         # Generar archivo de configuración
         config_file = self.generate_config_file(all_frequencies, filter_type, output_dir)
@@ -348,6 +398,9 @@ const float b_coeffs[IIR_ORDER + 1] = {
 
 """
         
+        if filter_type == 'channelizer':
+            config_content += '#include "dtmf_channelizer.h"  // Canalizador polifásico (8 canales DTMF)\n'
+        
         for freq in frequencies:
             if filter_type in ['fir', 'both']:
                 config_content += f'// #include "fir_{freq}hz.h"     // Filtro FIR para {freq} Hz\n'
@@ -370,6 +423,56 @@ const float b_coeffs[IIR_ORDER + 1] = {
         print(f"✓ Configuración generada: {config_filepath}")
         return config_filepath
     
+    def generate_channelizer_header(self, n_channels=256, taps_per_channel=4, decimation=128,
+                                    output_dir='filters'):
+        """
+        Genera el encabezado del canalizador polifásico DTMF
+        
+        Args:
+            n_channels: Canales del banco DFT (separación fs/n_channels)
+            taps_per_channel: Coeficientes por rama polifásica
+            decimation: Muestras de entrada por salida del canalizador
+            output_dir: Directorio de salida
+        """
+        canalizador = dtmf_channelizer(n_channels, taps_per_channel, decimation, fs=self.fs)
+        
+        os.makedirs(output_dir, exist_ok=True)
+        filepath = os.path.join(output_dir, 'dtmf_channelizer.h')
+        with open(filepath, 'w') as f:
+            f.write(canalizador.c_header())
+        
+        print(f"✓ Canalizador generado: {filepath}")
+        return filepath
+    
+    def compare_channelizer(self, bandwidth=30, order=101, n_channels=256, taps_per_channel=4,
+                            decimation=128):
+        """
+        Compara costo por muestra y aislamiento entre bandas del banco de 8
+        FIR pasabanda y el canalizador polifásico
+        
+        Returns:
+            dict: {'fir': (macs, ganancia propia dB, peor vecino dB), 'channelizer': ...}
+        """
+        frequencies = self.dtmf_frequencies['low'] + self.dtmf_frequencies['high']
+        banco = [self.design_fir_bandpass(f, bandwidth, order)[0] for f in frequencies]
+        canalizador = dtmf_channelizer(n_channels, taps_per_channel, decimation, fs=self.fs)
+        
+        def respuesta_fir(i, freqs):
+            return np.abs(signal.freqz(banco[i], 1, worN=freqs, fs=self.fs)[1])
+        
+        resultados = {}
+        for nombre, macs, respuesta in [('fir', 8 * order, respuesta_fir),
+                                         ('channelizer', canalizador.macs_per_sample(),
+                                          canalizador.channel_response)]:
+            propia, otras = band_isolation(respuesta, self.fs)
+            resultados[nombre] = (macs, propia.min(), otras.max())
+        
+        print(f"{'':14s} {'MACs/muestra':>12s} {'ganancia propia':>16s} {'peor vecino':>12s}")
+        for nombre, (macs, propia, otra) in resultados.items():
+            print(f"{nombre:14s} {macs:12.1f} {propia:14.1f}dB {otra:10.1f}dB")
+        print(f"Latencia del canalizador: {canalizador.latency / self.fs * 1e3:.1f} ms")
+        return resultados
+    
     def compare_filters(self, center_freq, bandwidth, fir_order=101, iir_order=2, 
                        window='hamming', iir_type='butter'):
         """Compara filtros FIR e IIR para una frecuencia dada"""
@@ -379,12 +482,16 @@ const float b_coeffs[IIR_ORDER + 1] = {
         fir_coeffs, fir_resp = self.design_fir_bandpass(center_freq, bandwidth, fir_order, window)
         iir_b, iir_a, iir_resp = self.design_iir_bandpass(center_freq, bandwidth, iir_order, iir_type)
         
+        # Detalle alrededor del tono con la transformada chirp-Z
+        fir_zoom = self.zoom_response(fir_coeffs, 1, center_freq)
+        iir_zoom = self.zoom_response(iir_b, iir_a, center_freq)
+        
         # Crear gráfica comparativa
         fig, ((ax1, ax2), (ax3, ax4)) = plt.subplots(2, 2, figsize=(15, 10))
         
         # Respuesta en magnitud
-        ax1.plot(fir_resp[0], np.abs(fir_resp[1]), 'b-', linewidth=2, label=f'FIR (Orden {fir_order})')
-        ax1.plot(iir_resp[0], np.abs(iir_resp[1]), 'r--', linewidth=2, label=f'IIR (Orden {iir_order})')
+        ax1.plot(fir_zoom[0], np.abs(fir_zoom[1]), 'b-', linewidth=2, label=f'FIR (Orden {fir_order})')
+        ax1.plot(iir_zoom[0], np.abs(iir_zoom[1]), 'r--', linewidth=2, label=f'IIR (Orden {iir_order})')
         ax1.set_title(f'Respuesta en Magnitud - {center_freq} Hz')
         ax1.set_xlabel('Frecuencia (Hz)')
         ax1.set_ylabel('Ganancia')
@@ -404,8 +511,8 @@ const float b_coeffs[IIR_ORDER + 1] = {
         ax2.set_ylim(-80, 5)
         
         # Respuesta en fase
-        ax3.plot(fir_resp[0], np.unwrap(np.angle(fir_resp[1])), 'b-', linewidth=2, label=f'FIR (Orden {fir_order})')
-        ax3.plot(iir_resp[0], np.unwrap(np.angle(iir_resp[1])), 'r--', linewidth=2, label=f'IIR (Orden {iir_order})')
+        ax3.plot(fir_zoom[0], np.unwrap(np.angle(fir_zoom[1])), 'b-', linewidth=2, label=f'FIR (Orden {fir_order})')
+        ax3.plot(iir_zoom[0], np.unwrap(np.angle(iir_zoom[1])), 'r--', linewidth=2, label=f'IIR (Orden {iir_order})')
         ax3.set_title(f'Respuesta en Fase - {center_freq} Hz')
         ax3.set_xlabel('Frecuencia (Hz)')
         ax3.set_ylabel('Fase (radianes)')
@@ -468,8 +575,12 @@ def generate_interactive():
     elif mode == '2':
         # Conjunto completo
         bandwidth = float(input("Ancho de banda (Hz) [30]: ") or "30")
-        filter_type = input("Tipo de filtro (fir/iir/both) [fir]: ").lower() or "fir"
-        order = int(input("Orden del filtro [101 para FIR, 2 para IIR]: ") or ("101" if filter_type == "fir" else "2"))
+        filter_type = input("Tipo de filtro (fir/iir/both/channelizer) [fir]: ").lower() or "fir"
+        # El canalizador se compara contra FIR del orden dado: 101 por defecto.
+        # 'both' usa el mismo orden en FIR e IIR, así que queda en 2 (un
+        # Butterworth de orden 101 es inestable)
+        order = int(input("Orden del filtro [101 para FIR/channelizer, 2 para IIR/both]: ")
+                    or ("101" if filter_type in ("fir", "channelizer") else "2"))
         
         generator.generate_dtmf_filter_set(bandwidth, filter_type, order)
     
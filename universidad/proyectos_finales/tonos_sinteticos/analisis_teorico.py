@@ -1,8 +1,15 @@
+import os
+import sys
+
 import numpy as np
 import matplotlib.pyplot as plt
 from scipy.fft import fft, fftfreq
 from scipy.io.wavfile import write
 
+# Raíz del repositorio para importar tools
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..')))
+from tools.dtmf_synth import dtmf_tones
+
 # -- Parámetros de la simulación --
 fs = 8000  # Frecuencia de muestreo en Hz (estándar para telefonía)
 duracion = 0.225  # Duración del tono en segundos
@@ -23,6 +30,9 @@ def generar_tono_dtmf(tecla, duracion, fs, amplitud):
     """
     Genera una señal DTMF para una tecla dada.
     La señal es la suma de dos ondas sinusoidales.
+
+    Para secuencias largas, ruido, twist o corpus completos, ver
+    tools/dtmf_synth.py (python -m tools.dtmf_synth).
     """
     if tecla not in freq_bajas or tecla not in freq_altas:
         raise ValueError("Tecla no válida. Use '0'-'9', '*', '#', 'A'-'D'.")
@@ -34,12 +44,8 @@ def generar_tono_dtmf(tecla, duracion, fs, amplitud):
     f1 = freq_bajas[tecla]
     f2 = freq_altas[tecla]
 
-    # Generación de las dos ondas sinusoidales
-    onda1 = amplitud * np.sin(2 * np.pi * f1 * t)
-    onda2 = amplitud * np.sin(2 * np.pi * f2 * t)
-
-    # Suma de las ondas para formar el tono DTMF
-    tono_dtmf = onda1 + onda2
+    # Suma de las dos ondas sinusoidales (generador vectorizado de tools)
+    tono_dtmf = dtmf_tones(tecla, duracion, fs=fs, amplitude=amplitud)
 
     # Normalización para evitar clipping al guardar en 16 bits
     tono_dtmf_normalizado = np.int16((tono_dtmf / tono_dtmf.max()) * 32767)